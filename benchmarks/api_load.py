@@ -0,0 +1,133 @@
+"""
+Load test of `epic serve`: concurrent keep-alive connections issuing a mix of
+`GET /events` pages and `GET /clients/<id>` reads for a fixed duration.
+
+The server runs in a subprocess on a temporary SQLite database with the
+performance profile, or on the database given with --database-url (for instance
+a PostgreSQL pool, which must already hold the tables).
+
+Run from the project root:
+    python -m benchmarks.api_load --events 100000 --connections 32
+"""
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import typer
+
+from benchmarks.index_latency import MODELS, populate
+from epic.models.models import PERMISSION_BITS, User, connect_database
+from epic.utils import Paginator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("The server did not start.")
+
+
+async def client(port, token, events, clients, deadline, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    while time.time() < deadline:
+        if random.random() < 0.5:
+            cursor = Paginator.encode_cursor(0, random.randrange(events))
+            target = f"/events?limit=50&after={cursor}"
+        else:
+            target = f"/clients/{1 + random.randrange(clients)}"
+        start = time.perf_counter()
+        writer.write(
+            f"GET {target} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Authorization: Bearer {token}\r\n\r\n".encode()
+        )
+        await writer.drain()
+        length = 0
+        await reader.readline()
+        while (line := await reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def load(port, token, events, clients, connections, duration):
+    latencies = []
+    deadline = time.time() + duration
+    await asyncio.gather(
+        *(
+            client(port, token, events, clients, deadline, latencies)
+            for _ in range(connections)
+        )
+    )
+    return latencies
+
+
+def main(
+    events: int = typer.Option(100_000, help="Number of events to generate"),
+    connections: int = typer.Option(32, help="Concurrent connections"),
+    workers: int = typer.Option(8, help="Worker threads of the server"),
+    duration: float = typer.Option(10.0, help="Duration of the test in seconds"),
+):
+    random.seed(12)
+    directory = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    database = connect_database(url, sqlite_profile="performance")
+    with database.bind_ctx(MODELS):
+        database.create_tables(MODELS)
+        typer.echo(f"Generating {events} events...")
+        populate(database, events)
+        admin = User.create(name="admin", email="admin@epic.com", password="-", role=1)
+        token = admin.generate_jwt_token(permissions=sum(PERMISSION_BITS.values()))
+    database.close()
+
+    port = free_port()
+    env = {
+        **os.environ,
+        "EPIC_DATABASE_URL": url,
+        "EPIC_SQLITE_PROFILE": "performance",
+        "PYTHONPATH": ROOT,
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "epic", "serve", "--port", str(port)]
+        + ["--workers", str(workers)],
+        cwd=directory,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_port(port)
+        latencies = asyncio.run(
+            load(port, token, events, max(events // 50, 1), connections, duration)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    typer.echo(f"{len(latencies)} requests in {duration:.0f}s")
+    typer.echo(f"{len(latencies) / duration:.0f} requests/s")
+    typer.echo(f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms")
+    typer.echo(f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    typer.run(main)
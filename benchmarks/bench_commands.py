@@ -0,0 +1,200 @@
+"""
+Query path of the commands on the synthetic dataset: authentication, list, read,
+update and delete of each entity.
+
+The query count of each command is asserted, so that an N+1 access pattern fails
+the suite whatever the speed of the machine.
+"""
+import itertools
+from types import SimpleNamespace
+
+import jwt
+
+from epic.cli import auth_cli
+from epic.models.models import Client, Contract, Event, User
+from epic.synthetic import FIRST_DAY
+
+
+def bench_check_auth(benchmark, bench_database, tmp_path, monkeypatch):
+    user = User.get(User.email.startswith("sales0@"))
+    token = user.generate_jwt_token(permissions=User.get_role_mask(user.role_id))
+    (tmp_path / "jwt_token.txt").write_text(token)
+    monkeypatch.chdir(tmp_path)
+    ctx = SimpleNamespace(info_name="client", invoked_subcommand="list")
+
+    benchmark(auth_cli.check_auth, ctx)
+
+    assert auth_cli.user_auth.id == user.id
+    assert benchmark.queries == 0
+    assert jwt.decode(token, options={"verify_signature": False})["user_id"]
+
+
+def bench_client_list(benchmark, login, invoke):
+    login("admin")
+
+    output = benchmark(invoke, "client", "list", "--limit", "50")
+
+    assert "Next page" in output
+    assert benchmark.queries <= 1
+
+
+def bench_client_read(benchmark, login, invoke):
+    login("sales")
+
+    benchmark(invoke, "client", "read")
+
+    # the clients, then the open contracts counters (table check and values)
+    assert benchmark.queries <= 3
+
+
+def bench_client_update(benchmark, login, invoke):
+    user = login("sales")
+    client = Client.get(Client.sales_contact == user.id)
+    companies = itertools.cycle(["Bench Corp", "Bench Group"])
+
+    def setup():
+        args = ("client", "update", "--id", str(client.id), "--company")
+        return args + (next(companies),), {}
+
+    benchmark.pedantic(invoke, setup=setup)
+
+    assert benchmark.queries <= 4
+
+
+def bench_client_delete(benchmark, login, invoke):
+    user = login("sales")
+    numbers = itertools.count()
+
+    def setup():
+        number = next(numbers)
+        client = Client.create(
+            name=f"Deleted {number}",
+            email=f"deleted{number}@example.com",
+            phone="0123456789",
+            company="Bench Corp",
+            sales_contact=user.id,
+        )
+        return ("client", "delete", "--id", str(client.id)), {}
+
+    benchmark.pedantic(invoke, setup=setup)
+
+    assert benchmark.queries <= 4
+
+
+def bench_contract_list(benchmark, login, invoke):
+    login("admin")
+
+    benchmark(invoke, "contract", "list", "--limit", "50")
+
+    assert benchmark.queries <= 1
+
+
+def bench_contract_read(benchmark, login, invoke):
+    login("sales")
+
+    benchmark(invoke, "contract", "read")
+
+    assert benchmark.queries <= 1
+
+
+def bench_contract_update(benchmark, login, invoke):
+    user = login("sales")
+    contract = Contract.select().join(Client).where(Client.sales_contact == user.id).get()
+    amounts = itertools.cycle(["0", "100"])
+
+    def setup():
+        args = ("contract", "update", "--id", str(contract.id), "--due-amount")
+        return args + (next(amounts),), {}
+
+    benchmark.pedantic(invoke, setup=setup)
+
+    assert benchmark.queries <= 4
+
+
+def bench_contract_delete(benchmark, login, invoke):
+    user = login("sales")
+    client = Client.get(Client.sales_contact == user.id)
+
+    def setup():
+        contract = Contract.create(name="Deleted contract", client=client)
+        return ("contract", "delete", "--id", str(contract.id)), {}
+
+    benchmark.pedantic(invoke, setup=setup)
+
+    assert benchmark.queries <= 4
+
+
+def bench_event_list(benchmark, login, invoke):
+    login("admin")
+
+    benchmark(invoke, "event", "list", "--limit", "50", "--sort", "date_start")
+
+    assert benchmark.queries <= 1
+
+
+def bench_event_read_support(benchmark, login, invoke):
+    login("support")
+
+    benchmark(invoke, "event", "read")
+
+    # the events, then the events counter (table check and value)
+    assert benchmark.queries <= 3
+
+
+def bench_event_read_sales(benchmark, login, invoke):
+    login("sales")
+
+    benchmark(invoke, "event", "read")
+
+    assert benchmark.queries <= 1
+
+
+def bench_event_update(benchmark, login, invoke):
+    user = login("support")
+    event = Event.get(Event.support_contact == user.id)
+    locations = itertools.cycle(["Lyon", "Paris"])
+
+    def setup():
+        args = ("event", "update", "--id", str(event.id), "--location")
+        return args + (next(locations),), {}
+
+    benchmark.pedantic(invoke, setup=setup)
+
+    assert benchmark.queries <= 6
+
+
+def bench_event_delete(benchmark, login, invoke):
+    user = login("sales")
+    contract = Contract.select().join(Client).where(Client.sales_contact == user.id).get()
+
+    def setup():
+        event = Event.create(
+            name="Deleted event",
+            contract=contract,
+            date_start=FIRST_DAY,
+            date_end=FIRST_DAY,
+            location="Paris",
+            attendees=10,
+            notes="",
+        )
+        return ("event", "delete", "--id", str(event.id)), {}
+
+    benchmark.pedantic(invoke, setup=setup)
+
+    assert benchmark.queries <= 6
+
+
+def bench_user_list(benchmark, login, invoke):
+    login("admin")
+
+    benchmark(invoke, "user", "list", "--limit", "50")
+
+    assert benchmark.queries <= 1
+
+
+def bench_search(benchmark, login, invoke):
+    login("sales")
+
+    benchmark(invoke, "search", "acme")
+
+    assert benchmark.queries <= 3
@@ -0,0 +1,251 @@
+"""
+Fixtures of the benchmark suite: a database filled by epic.synthetic at the scale
+given by --scale, the users the commands run as, and a `benchmark` fixture timing a
+function like pytest-benchmark, without its dependency.
+
+Each benchmark records the number of SQL queries of a call and the timings of the
+rounds. --benchmark-save writes them to a JSON file; --benchmark-compare fails the
+benchmarks which run more queries than in such a file, or whose median time
+regressed by more than --benchmark-max-regression.
+"""
+import json
+import logging
+import statistics
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from epic.cli import auth_cli
+from epic.cli.initialize_cli import create_permissions, initialize_roles
+from epic.main import app
+from epic.models import models
+from epic.models.models import (
+    Client,
+    Contract,
+    Event,
+    Permission,
+    Role,
+    RolePermission,
+    User,
+    connect_database,
+)
+from epic.counters import create_counters
+from epic.search import create_search_index
+from epic.synthetic import EMAIL_DOMAIN, SCALES, generate
+
+MODELS = [User, Client, Contract, Event, Role, Permission, RolePermission]
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark")
+    group.addoption(
+        "--scale", default="10k", choices=list(SCALES), help="Size of the dataset."
+    )
+    group.addoption(
+        "--benchmark-rounds", type=int, default=20, help="Timed calls of a function."
+    )
+    group.addoption("--benchmark-save", metavar="PATH", help="Save the results.")
+    group.addoption(
+        "--benchmark-compare", metavar="PATH", help="Compare with saved results."
+    )
+    group.addoption(
+        "--benchmark-max-regression",
+        type=float,
+        default=0.5,
+        help="Tolerated increase of the median time, 0.5 for 50%%.",
+    )
+
+
+def pytest_configure(config):
+    config.benchmark_results = {}
+    config.benchmark_baseline = {}
+    # the options are only registered when the benchmarks are run on their own
+    path = config.getoption("--benchmark-compare", None)
+    if path:
+        with open(path) as baseline_file:
+            config.benchmark_baseline = json.load(baseline_file)
+
+
+class QueryCounter(logging.Handler):
+    """Count the SQL queries logged by peewee"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def count_queries(function, *args, **kwargs):
+    """Call the function and return its result and the number of SQL queries"""
+    counter = QueryCounter()
+    logger = logging.getLogger("peewee")
+    level = logger.level
+    logger.addHandler(counter)
+    logger.setLevel(logging.DEBUG)
+    try:
+        result = function(*args, **kwargs)
+    finally:
+        logger.removeHandler(counter)
+        logger.setLevel(level)
+    return result, counter.count
+
+
+class Benchmark:
+    """Time a function over rounds, after a warm-up call counting its queries"""
+
+    def __init__(self, name: str, rounds: int):
+        self.name = name
+        self.rounds = rounds
+        self.timings = []
+        self.queries = None
+
+    def __call__(self, function, *args, **kwargs):
+        return self.pedantic(function, args, kwargs)
+
+    def pedantic(self, function, args=(), kwargs=None, setup=None, rounds=None):
+        """
+        Time the function. When given, setup is called before each call, untimed,
+        and returns the (args, kwargs) of the call.
+        """
+        kwargs = kwargs or {}
+        if setup is not None:
+            args, kwargs = setup()
+        result, self.queries = count_queries(function, *args, **kwargs)
+        for _ in range(rounds or self.rounds):
+            if setup is not None:
+                args, kwargs = setup()
+            start = time.perf_counter()
+            function(*args, **kwargs)
+            self.timings.append(time.perf_counter() - start)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "queries": self.queries,
+            "min_ms": min(self.timings) * 1000,
+            "median_ms": statistics.median(self.timings) * 1000,
+            "mean_ms": statistics.mean(self.timings) * 1000,
+            "rounds": len(self.timings),
+        }
+
+
+@pytest.fixture
+def benchmark(request):
+    config = request.config
+    name = f"{request.node.name}[{config.getoption('--scale')}]"
+    bench = Benchmark(name, config.getoption("--benchmark-rounds"))
+    yield bench
+    if not bench.timings:
+        return
+    stats = bench.stats()
+    config.benchmark_results[name] = stats
+    baseline = config.benchmark_baseline.get(name)
+    if baseline is None:
+        return
+    if stats["queries"] > baseline["queries"]:
+        pytest.fail(
+            f"{name}: {stats['queries']} queries instead of {baseline['queries']}."
+        )
+    limit = baseline["median_ms"] * (1 + config.getoption("--benchmark-max-regression"))
+    if stats["median_ms"] > limit:
+        pytest.fail(
+            f"{name}: median of {stats['median_ms']:.2f} ms instead of "
+            f"{baseline['median_ms']:.2f} ms."
+        )
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.benchmark_results
+    if not results:
+        return
+    terminalreporter.section(f"benchmarks ({config.getoption('--scale')})")
+    terminalreporter.write_line(
+        f"{'name':<44}{'queries':>8}{'min (ms)':>10}{'median (ms)':>13}{'mean (ms)':>11}"
+    )
+    for name, stats in results.items():
+        terminalreporter.write_line(
+            f"{name:<44}{stats['queries']:>8}{stats['min_ms']:>10.3f}"
+            f"{stats['median_ms']:>13.3f}{stats['mean_ms']:>11.3f}"
+        )
+    path = config.getoption("--benchmark-save")
+    if path:
+        saved = {}
+        try:
+            with open(path) as saved_file:
+                saved = json.load(saved_file)
+        except FileNotFoundError:
+            pass
+        saved.update(results)
+        with open(path, "w") as saved_file:
+            json.dump(saved, saved_file, indent=2)
+        terminalreporter.write_line(f"Results saved to {path}")
+
+
+@pytest.fixture(scope="session")
+def bench_database(request, tmp_path_factory):
+    """The database of the dataset, bound to the models for the whole session"""
+    scale = request.config.getoption("--scale")
+    path = tmp_path_factory.mktemp("benchmarks") / f"{scale}.db"
+    database = connect_database(f"sqlite:///{path}")
+    database.bind(MODELS)
+    rounds = models.BCRYPT_ROUNDS
+    models.BCRYPT_ROUNDS = 4
+    stamp_file = models.SESSIONS_STAMP_FILE
+    models.SESSIONS_STAMP_FILE = str(path.parent / "sessions.stamp")
+    database.create_tables(MODELS)
+    create_search_index(database)
+    create_counters(database)
+    initialize_roles()
+    create_permissions()
+    User.create(
+        name="Bench Admin",
+        email=f"admin@{EMAIL_DOMAIN}",
+        password="password",
+        role=Role.get(Role.name == "admin"),
+    )
+    generate(SCALES[scale])
+    database.execute_sql("ANALYZE")
+    yield database
+    database.close()
+    models.BCRYPT_ROUNDS = rounds
+    models.SESSIONS_STAMP_FILE = stamp_file
+    models.db.bind(MODELS)
+
+
+def dataset_user(role_name: str) -> User:
+    """Return the first user of the role in the dataset"""
+    email = {
+        "admin": f"admin@{EMAIL_DOMAIN}",
+        "sales": f"sales0@{EMAIL_DOMAIN}",
+        "support": f"support0@{EMAIL_DOMAIN}",
+    }[role_name]
+    return User.select(User, Role).join(Role).where(User.email == email).get()
+
+
+@pytest.fixture
+def login(bench_database, monkeypatch):
+    """Return a function authenticating the commands as the first user of a role"""
+
+    def login_as(role_name: str) -> User:
+        user = dataset_user(role_name)
+        monkeypatch.setattr(auth_cli, "session_provider", lambda: user)
+        return user
+
+    return login_as
+
+
+@pytest.fixture
+def invoke():
+    """Return a function running a command of the application, which must succeed"""
+    runner = CliRunner()
+
+    def run(*args):
+        result = runner.invoke(app, list(args))
+        assert result.exit_code == 0, result.output
+        assert "does not" not in result.output, result.output
+        return result.output
+
+    return run
@@ -0,0 +1,61 @@
+"""
+Peak memory and throughput of `epic export events --all` in each format.
+
+The peak memory is measured with tracemalloc while the whole event table is exported
+to a temporary file. It must stay flat when the number of events grows.
+
+Run from the project root:
+    python -m benchmarks.export_memory --events 5000000
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+import peewee
+import typer
+
+from benchmarks.index_latency import MODELS, populate
+from epic.cli.export_cli import ExportFormat, export_query, select_columns
+from epic.models.models import Event
+
+
+def main(
+    events: int = typer.Option(1_000_000, help="Number of events to generate"),
+):
+    random.seed(12)
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.db")
+    db = peewee.SqliteDatabase(path, pragmas={"foreign_keys": 1})
+    results = []
+    with db.bind_ctx(MODELS):
+        db.create_tables(MODELS)
+        typer.echo(f"Generating {events} events in {path}...")
+        populate(db, events)
+        for export_format in ExportFormat:
+            output = os.path.join(directory, f"events.{export_format.value}")
+            query = Event.select(*select_columns(Event)).order_by(Event.id)
+            start = time.perf_counter()
+            export_query(Event, query, output, export_format, 10000)
+            elapsed = time.perf_counter() - start
+            # second pass for the memory, tracemalloc slows the export down
+            tracemalloc.start()
+            export_query(Event, query, output, export_format, 10000)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append((export_format.value, elapsed, peak, os.path.getsize(output)))
+            os.remove(output)
+    db.close()
+    os.remove(path)
+
+    typer.echo(f"{'format':<10}{'time (s)':>10}{'rows/s':>12}{'peak (MB)':>12}{'size (MB)':>12}")
+    for name, elapsed, peak, size in results:
+        typer.echo(
+            f"{name:<10}{elapsed:>10.2f}{events / elapsed:>12.0f}"
+            f"{peak / 2**20:>12.1f}{size / 2**20:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,178 @@
+"""
+Per-query latency of the hot lookups before and after the model indexes.
+
+The database is filled with synthetic data, the queries are timed with the indexes
+of the previous schema (foreign keys and unique fields only), then the indexes
+declared on the models are created and the queries are timed again.
+
+Run from the project root:
+    python -m benchmarks.index_latency --events 1000000
+"""
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+import peewee
+import typer
+from peewee import chunked
+
+from epic.cli.initialize_cli import roles_perms
+from epic.models.models import (
+    User,
+    Client,
+    Contract,
+    Event,
+    Role,
+    Permission,
+    RolePermission,
+)
+
+MODELS = [User, Client, Contract, Event, Role, Permission, RolePermission]
+
+NEW_INDEXES = [
+    "event_date_start",
+    "event_support_contact_id_date_start",
+    "rolepermission_role_id_permission_id",
+]
+
+FIRST_DAY = date(2020, 1, 1)
+
+
+def populate(db, events: int, batch_size: int = 100):
+    """Fill the database with roles, permissions, users, clients, contracts and events"""
+    sales_count = 50
+    support_count = 200
+    clients_count = max(events // 50, 1)
+    contracts_count = max(events // 5, 1)
+    with db.atomic():
+        Role.insert_many(
+            [{"name": name} for name in ["admin", "sales", "support", "super_admin"]]
+        ).execute()
+        Permission.insert_many([{"name": f"perm-{i}"} for i in range(1, 27)]).execute()
+        RolePermission.insert_many(roles_perms).execute()
+        users = [
+            {"name": f"sales{i}", "email": f"sales{i}@epic.com", "password": "-", "role": 2}
+            for i in range(sales_count)
+        ] + [
+            {"name": f"support{i}", "email": f"support{i}@epic.com", "password": "-", "role": 3}
+            for i in range(support_count)
+        ]
+        User.insert_many(users).execute()
+        for batch in chunked(range(clients_count), batch_size):
+            Client.insert_many(
+                {
+                    "name": f"client{i}",
+                    "email": f"client{i}@example.com",
+                    "phone": "0123456789",
+                    "company": f"company{i}",
+                    "sales_contact": 1 + i % sales_count,
+                }
+                for i in batch
+            ).execute()
+        for batch in chunked(range(contracts_count), batch_size):
+            Contract.insert_many(
+                {"name": f"contract{i}", "client": 1 + i % clients_count}
+                for i in batch
+            ).execute()
+        for batch in chunked(range(events), batch_size):
+            rows = []
+            for i in batch:
+                start = FIRST_DAY + timedelta(days=random.randrange(1460))
+                rows.append(
+                    {
+                        "name": f"event{i}",
+                        "contract": 1 + i % contracts_count,
+                        "support_contact": sales_count + 1 + i % support_count,
+                        "date_start": start,
+                        "date_end": start + timedelta(days=random.randrange(3)),
+                        "location": "venue",
+                        "attendees": 100,
+                        "notes": "",
+                    }
+                )
+            Event.insert_many(rows).execute()
+    return sales_count, support_count
+
+
+def hot_queries(sales_count: int, support_count: int):
+    """Return the benchmarked queries as (label, function) pairs"""
+
+    def support_agenda():
+        support_id = sales_count + 1 + random.randrange(support_count)
+        start = FIRST_DAY + timedelta(days=random.randrange(1430))
+        query = Event.select(Event.id).where(
+            (Event.support_contact == support_id)
+            & (Event.date_start.between(start, start + timedelta(days=30)))
+        )
+        return list(query.tuples())
+
+    def events_of_day():
+        day = FIRST_DAY + timedelta(days=random.randrange(1460))
+        return list(Event.select(Event.id).where(Event.date_start == day).tuples())
+
+    def role_has_permission():
+        return (
+            RolePermission.select()
+            .where(
+                (RolePermission.role == random.randint(1, 4))
+                & (RolePermission.permission == random.randint(1, 26))
+            )
+            .exists()
+        )
+
+    def clients_of_sales():
+        sales_id = 1 + random.randrange(sales_count)
+        return list(Client.select(Client.id).where(Client.sales_contact == sales_id).tuples())
+
+    return [
+        ("events of a support contact in a month", support_agenda),
+        ("events starting on a day", events_of_day),
+        ("role/permission lookup", role_has_permission),
+        ("clients of a sales contact", clients_of_sales),
+    ]
+
+
+def measure(queries, repeat: int):
+    """Return the mean latency in milliseconds of each query"""
+    results = {}
+    for label, query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            query()
+        results[label] = (time.perf_counter() - start) * 1000 / repeat
+    return results
+
+
+def main(
+    events: int = typer.Option(100_000, help="Number of events to generate"),
+    repeat: int = typer.Option(50, help="Executions of each query"),
+):
+    random.seed(12)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db = peewee.SqliteDatabase(path, pragmas={"foreign_keys": 1})
+    with db.bind_ctx(MODELS):
+        db.create_tables(MODELS)
+        typer.echo(f"Generating {events} events in {path}...")
+        counts = populate(db, events)
+        for index in NEW_INDEXES:
+            db.execute_sql(f'DROP INDEX "{index}"')
+        db.execute_sql("ANALYZE")
+        queries = hot_queries(*counts)
+        before = measure(queries, repeat)
+
+        for model in MODELS:
+            model._schema.create_indexes(safe=True)
+        db.execute_sql("ANALYZE")
+        after = measure(queries, repeat)
+    db.close()
+    os.remove(path)
+
+    typer.echo(f"{'query':<42}{'before (ms)':>14}{'after (ms)':>14}")
+    for label, _ in queries:
+        typer.echo(f"{label:<42}{before[label]:>14.3f}{after[label]:>14.3f}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
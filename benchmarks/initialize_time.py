@@ -0,0 +1,52 @@
+"""
+Wall time of `epic init initialize` in a new database for bcrypt work factors, and
+of a second run on the initialized database.
+
+Run from the project root:
+    python -m benchmarks.initialize_time --rounds 10 --rounds 12 --scale 100k
+"""
+import contextlib
+import io
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+import typer
+
+from benchmarks.index_latency import MODELS
+from epic.cli import initialize_cli
+from epic.models import models
+from epic.models.models import connect_database
+
+
+def run_initialize(rounds: int, scale: Optional[str]):
+    """Return the wall time of an initialize in a new database, then of a rerun"""
+    models.BCRYPT_ROUNDS = rounds
+    path = tempfile.mktemp(suffix=".db")
+    database = connect_database(f"sqlite:///{path}")
+    database.bind(MODELS, bind_refs=False, bind_backrefs=False)
+    initialize_cli.db = database
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            initialize_cli.initialize(scale=scale)
+        timings.append(time.perf_counter() - start)
+    database.close()
+    os.remove(path)
+    return timings
+
+
+def main(
+    rounds: List[int] = typer.Option([10, 12], help="bcrypt work factors to time"),
+    scale: Optional[str] = typer.Option(None, help="Synthetic data to seed"),
+):
+    typer.echo(f"{'rounds':<8}{'new (s)':>10}{'rerun (s)':>12}")
+    for value in rounds:
+        first, rerun = run_initialize(value, scale)
+        typer.echo(f"{value:<8}{first:>10.3f}{rerun:>12.3f}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
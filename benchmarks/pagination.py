@@ -0,0 +1,83 @@
+"""
+Latency of a page of `event list` at increasing depths, with OFFSET and with the
+keyset pagination of the list commands.
+
+Run from the project root:
+    python -m benchmarks.pagination --events 1000000
+"""
+import os
+import random
+import tempfile
+import time
+
+import peewee
+import typer
+
+from benchmarks.index_latency import MODELS, populate
+from epic.models.models import Event
+from epic.utils import Paginator
+
+PAGE_SIZE = 50
+
+
+def offset_page(sort_field, depth: int):
+    query = Event.select().order_by(sort_field, Event.id)
+    return list(query.limit(PAGE_SIZE).offset(depth))
+
+
+def keyset_page(sort_field, cursor):
+    return list(Paginator(Event.select(), sort_field, PAGE_SIZE, cursor))
+
+
+def cursor_at(sort_field, depth: int):
+    """Return the cursor of the page starting at a depth"""
+    if not depth:
+        return None
+    query = Event.select().order_by(sort_field, Event.id)
+    row = list(query.limit(1).offset(depth - 1))[0]
+    return Paginator.encode_cursor(getattr(row, sort_field.name), row.id)
+
+
+def timed(function, *args, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(*args)
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(
+    events: int = typer.Option(1_000_000, help="Number of events to generate"),
+    repeat: int = typer.Option(20, help="Executions of each page query"),
+):
+    random.seed(12)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db = peewee.SqliteDatabase(path, pragmas={"foreign_keys": 1})
+    rows = []
+    with db.bind_ctx(MODELS):
+        db.create_tables(MODELS)
+        typer.echo(f"Generating {events} events in {path}...")
+        populate(db, events)
+        db.execute_sql("ANALYZE")
+        depths = [0, events // 10, events // 2, events - PAGE_SIZE]
+        for sort_field in [Event.id, Event.date_start]:
+            for depth in depths:
+                cursor = cursor_at(sort_field, depth)
+                assert offset_page(sort_field, depth) == keyset_page(sort_field, cursor)
+                rows.append(
+                    (
+                        sort_field.name,
+                        depth,
+                        timed(offset_page, sort_field, depth, repeat=repeat),
+                        timed(keyset_page, sort_field, cursor, repeat=repeat),
+                    )
+                )
+    db.close()
+    os.remove(path)
+
+    typer.echo(f"{'sort':<12}{'depth':>10}{'offset (ms)':>14}{'keyset (ms)':>14}")
+    for sort, depth, offset, keyset in rows:
+        typer.echo(f"{sort:<12}{depth:>10}{offset:>14.3f}{keyset:>14.3f}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
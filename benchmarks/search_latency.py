@@ -0,0 +1,79 @@
+"""
+Latency of `epic search` with the full-text index against a LIKE scan of the
+indexed columns.
+
+The database is filled with synthetic data, the index of the existing rows is built
+(as by `epic init upgrade`), then searches of a random client, company or event name
+are timed.
+
+Run from the project root:
+    python -m benchmarks.search_latency --events 1000000
+"""
+import os
+import random
+import tempfile
+import time
+
+import peewee
+import typer
+
+from benchmarks.index_latency import MODELS, populate
+from epic.models.models import Client, Contract, Event, Role, User
+from epic.search import create_search_index, search
+
+
+def like_scan(term: str):
+    """Search the indexed columns of the three tables with LIKE"""
+    pattern = f"%{term}%"
+    results = []
+    for model, fields in [
+        (Client, [Client.name, Client.email, Client.company]),
+        (Contract, [Contract.name]),
+        (Event, [Event.name, Event.location, Event.notes]),
+    ]:
+        condition = fields[0] ** pattern
+        for field in fields[1:]:
+            condition |= field**pattern
+        results += list(model.select(model.id).where(condition).limit(20).tuples())
+    return results
+
+
+def main(
+    events: int = typer.Option(100_000, help="Number of events to generate"),
+    repeat: int = typer.Option(50, help="Searches of each kind"),
+):
+    random.seed(12)
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db = peewee.SqliteDatabase(path, pragmas={"foreign_keys": 1})
+    admin = User(id=1, role=Role(id=1, name="admin"))
+    admin._permissions = -1
+    with db.bind_ctx(MODELS):
+        db.create_tables(MODELS)
+        typer.echo(f"Generating {events} events in {path}...")
+        populate(db, events)
+        start = time.perf_counter()
+        create_search_index(db)
+        typer.echo(f"Index built in {time.perf_counter() - start:.1f} s")
+
+        clients, contracts = max(events // 50, 1), max(events // 5, 1)
+        terms = {
+            "client name": lambda: f"client{random.randrange(clients)}",
+            "company": lambda: f"company{random.randrange(clients)}",
+            "contract name": lambda: f"contract{random.randrange(contracts)}",
+            "event name": lambda: f"event{random.randrange(events)}",
+        }
+        typer.echo(f"{'search':<16}{'LIKE scan (ms)':>16}{'index (ms)':>14}")
+        for label, term in terms.items():
+            timings = []
+            for function in [like_scan, lambda text: search(text, admin)]:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    function(term())
+                timings.append((time.perf_counter() - start) * 1000 / repeat)
+            typer.echo(f"{label:<16}{timings[0]:>16.2f}{timings[1]:>14.2f}")
+    db.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,132 @@
+"""
+Concurrent read and write throughput of the command query paths under each SQLite
+profile (see SQLITE_PROFILES in epic/models/models.py).
+
+Reader processes run the query of a page of `event list` and of `client read`,
+writer processes create an event and update a client in a transaction, like
+`event create` and `client update`. Operations failing with "database is locked"
+are counted as busy.
+
+Run from the project root:
+    python -m benchmarks.sqlite_profiles --events 100000 --readers 4 --writers 2
+"""
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import date
+
+import peewee
+import typer
+
+from benchmarks.index_latency import MODELS, populate
+from epic.models.models import (
+    SQLITE_PROFILES,
+    Client,
+    Contract,
+    Event,
+    User,
+    connect_database,
+)
+from epic.utils import Paginator
+
+
+def read_operation(events: int, sales_count: int):
+    cursor = Paginator.encode_cursor(0, random.randrange(events))
+    page = Paginator(
+        Event.select(Event, Contract, User)
+        .join(Contract)
+        .switch(Event)
+        .join(User, peewee.JOIN.LEFT_OUTER, on=Event.support_contact),
+        Event.id,
+        50,
+        cursor,
+    )
+    list(page)
+    sales_id = 1 + random.randrange(sales_count)
+    list(Client.select().where(Client.sales_contact == sales_id))
+
+
+def write_operation(events: int, clients: int):
+    with Event._meta.database.atomic():
+        Event.create(
+            name="bench",
+            contract=1,
+            date_start=date(2024, 1, 1),
+            date_end=date(2024, 1, 2),
+            location="venue",
+            attendees=10,
+            notes="",
+        )
+        Client.update(company=f"company{random.random()}").where(
+            Client.id == 1 + random.randrange(clients)
+        ).execute()
+
+
+def worker(path, profile, writer, deadline, counts, events, sales_count):
+    random.seed(os.getpid())
+    database = connect_database(f"sqlite:///{path}", sqlite_profile=profile)
+    done = busy = 0
+    with database.bind_ctx(MODELS):
+        while time.time() < deadline:
+            try:
+                if writer:
+                    write_operation(events, max(events // 50, 1))
+                else:
+                    read_operation(events, sales_count)
+                done += 1
+            except peewee.OperationalError:
+                busy += 1
+    database.close()
+    counts.put((writer, done, busy))
+
+
+def run_profile(profile, events, readers, writers, duration):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    database = connect_database(f"sqlite:///{path}", sqlite_profile="default")
+    with database.bind_ctx(MODELS):
+        database.create_tables(MODELS)
+        sales_count, _ = populate(database, events)
+    database.close()
+
+    context = multiprocessing.get_context("fork")
+    counts = context.Queue()
+    deadline = time.time() + 1 + duration
+    processes = [
+        context.Process(
+            target=worker,
+            args=(path, profile, writer, deadline, counts, events, sales_count),
+        )
+        for writer in [False] * readers + [True] * writers
+    ]
+    for process in processes:
+        process.start()
+    results = [counts.get() for _ in processes]
+    for process in processes:
+        process.join()
+    for suffix in ["", "-wal", "-shm"]:
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    reads = sum(done for writer, done, _ in results if not writer)
+    writes = sum(done for writer, done, _ in results if writer)
+    busy = sum(busy for _, _, busy in results)
+    return reads / duration, writes / duration, busy
+
+
+def main(
+    events: int = typer.Option(100_000, help="Number of events to generate"),
+    readers: int = typer.Option(4, help="Number of reader processes"),
+    writers: int = typer.Option(2, help="Number of writer processes"),
+    duration: float = typer.Option(5.0, help="Duration of each run in seconds"),
+):
+    random.seed(12)
+    typer.echo(f"{'profile':<14}{'reads/s':>10}{'writes/s':>10}{'busy':>8}")
+    for profile in SQLITE_PROFILES:
+        reads, writes, busy = run_profile(profile, events, readers, writers, duration)
+        typer.echo(f"{profile:<14}{reads:>10.0f}{writes:>10.0f}{busy:>8}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,346 @@
+"""
+JSON API of the CRM, served over HTTP by an asyncio server.
+
+The requests are authenticated with the token of `epic auth login`, given as an
+`Authorization: Bearer <token>` header, and authorized with the permissions of the
+commands. The records are validated and written by the same functions as the batch
+files of the commands.
+
+Routes, for each resource (clients, contracts, events, users, roles):
+    GET    /clients?limit=100&after=<cursor>&sort=name   list (permission client-list)
+    GET    /clients/1                                    read (client-read)
+    POST   /clients                                      create (client-create)
+    PATCH  /clients/1                                    update (client-update)
+    DELETE /clients/1                                    delete (client-delete)
+POST, PATCH and DELETE also accept an array of records, identified by their id.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+import jwt
+from peewee import DoesNotExist
+
+from epic.cli import client_cli, contract_cli, event_cli, role_cli, user_cli
+from epic.cli.export_cli import export_columns, select_columns
+from epic.models.models import Client, Contract, Event, Role, User
+from epic.utils import Paginator, insert_batch, validate_record
+
+# Number of records of a page when no limit is given, and the maximum limit
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class Resource:
+    """
+    Operations of a resource of the API.
+
+    Args:
+        entity (str): The name of the entity in the permissions.
+        model: The model of the resource.
+        sort_fields (dict): The sortable fields of the list.
+        get: Function(id, user) returning a record the user can read, raising
+            ValueError otherwise.
+        create, update, delete: (fields, function) pairs. The function is called
+            with the validated (row number, record) pairs and the user, and returns
+            the number of written records and the list of (row number, error).
+    """
+
+    def __init__(self, entity, model, sort_fields, get, create, update, delete):
+        self.entity = entity
+        self.model = model
+        self.sort_fields = sort_fields
+        self.get = get
+        self.operations = {"create": create, "update": update, "delete": delete}
+
+
+def get_by_id(model):
+    def get(record_id: int, user):
+        record = model.get_or_none(model.id == record_id)
+        if record is None:
+            raise ValueError(f"{model.__name__} with ID {record_id} does not exist.")
+        return record
+
+    return get
+
+
+RESOURCES = {
+    "clients": Resource(
+        "client",
+        Client,
+        client_cli.SORT_FIELDS,
+        client_cli.get_client,
+        (client_cli.CLIENT_FIELDS, client_cli.create_clients),
+        (client_cli.UPDATE_FIELDS, client_cli.update_clients),
+        ({"id": int}, client_cli.delete_clients),
+    ),
+    "contracts": Resource(
+        "contract",
+        Contract,
+        contract_cli.SORT_FIELDS,
+        contract_cli.get_contract,
+        (contract_cli.CREATE_FIELDS, contract_cli.create_contracts),
+        (contract_cli.UPDATE_FIELDS, contract_cli.update_contracts),
+        ({"id": int}, contract_cli.delete_contracts),
+    ),
+    "events": Resource(
+        "event",
+        Event,
+        event_cli.SORT_FIELDS,
+        event_cli.get_event,
+        (event_cli.CREATE_FIELDS, event_cli.create_events),
+        (event_cli.UPDATE_FIELDS, event_cli.update_events),
+        ({"id": int}, event_cli.delete_events),
+    ),
+    "users": Resource(
+        "user",
+        User,
+        user_cli.SORT_FIELDS,
+        get_by_id(User),
+        (user_cli.USER_FIELDS, lambda rows, user: user_cli.create_users(rows)),
+        (user_cli.UPDATE_FIELDS, lambda rows, user: user_cli.update_users(rows)),
+        ({"id": int}, lambda rows, user: user_cli.delete_users(rows)),
+    ),
+    "roles": Resource(
+        "role",
+        Role,
+        role_cli.SORT_FIELDS,
+        get_by_id(Role),
+        ({"name": str}, lambda rows, user: insert_batch(Role, rows)),
+        None,
+        ({"id": int}, lambda rows, user: role_cli.delete_roles(rows)),
+    ),
+}
+
+# past participle of the operations in the responses
+DONE = {"create": "created", "update": "updated", "delete": "deleted"}
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def serialize(model, record) -> dict:
+    """Return the exported fields of a record, foreign keys by id"""
+    return {
+        field.column_name: record.__data__.get(field.name)
+        for field in export_columns(model)
+    }
+
+
+def authenticate(headers: dict):
+    """Return the user of the bearer token of the request"""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise ApiError(HTTPStatus.UNAUTHORIZED, "Bearer token required.")
+    try:
+        user = User.from_token(token.strip())
+    except jwt.InvalidTokenError:
+        user = None
+    if user is None:
+        raise ApiError(HTTPStatus.UNAUTHORIZED, "Invalid or expired token.")
+    return user
+
+
+def parse_records(body: bytes, record_id: int = None) -> list:
+    """Return the records of a request body: a JSON object or an array of objects"""
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid JSON body.")
+    records = data if isinstance(data, list) else [data]
+    if not all(isinstance(record, dict) for record in records):
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Records must be JSON objects.")
+    if record_id is not None:
+        if len(records) != 1:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Expected a single record.")
+        records[0]["id"] = record_id
+    return records
+
+
+def list_records(resource: Resource, query: dict):
+    try:
+        limit = int(query.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid limit.")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    sort = query.get("sort", "id")
+    if sort not in resource.sort_fields:
+        raise ApiError(
+            HTTPStatus.BAD_REQUEST,
+            f"Invalid sort field. Choose from: {', '.join(resource.sort_fields)}.",
+        )
+    model = resource.model
+    try:
+        page = Paginator(
+            model.select(*select_columns(model)),
+            resource.sort_fields[sort],
+            limit,
+            query.get("after"),
+        )
+    except ValueError as e:
+        raise ApiError(HTTPStatus.BAD_REQUEST, str(e))
+    items = [serialize(model, record) for record in page]
+    return {"items": items, "next": page.next_cursor()}
+
+
+def write_records(resource: Resource, action: str, body: bytes, user, record_id=None):
+    operation = resource.operations[action]
+    if operation is None:
+        raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "Method not allowed.")
+    fields, apply = operation
+    required = ["id"] if action == "update" else None
+    rows, errors = [], []
+    for number, record in enumerate(parse_records(body, record_id), start=1):
+        try:
+            rows.append((number, validate_record(record, fields, required)))
+        except ValueError as e:
+            errors.append((number, str(e)))
+    count, apply_errors = apply(rows, user) if rows else (0, [])
+    errors = sorted(errors + apply_errors)
+    status = HTTPStatus.UNPROCESSABLE_ENTITY if errors and not count else HTTPStatus.OK
+    return status, {
+        DONE[action]: count,
+        "errors": [{"row": number, "error": error} for number, error in errors],
+    }
+
+
+def dispatch(method: str, target: str, headers: dict, body: bytes = b""):
+    """
+    Handle a request of the API.
+
+    Args:
+        method (str): The HTTP method.
+        target (str): The path and the query string.
+        headers (dict): The headers, by lower case name.
+        body (bytes): The body of the request.
+
+    Returns:
+        tuple: The HTTP status and the JSON payload of the response.
+    """
+    url = urlsplit(target)
+    query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+    parts = [part for part in url.path.split("/") if part]
+    try:
+        if not parts or parts[0] not in RESOURCES or len(parts) > 2:
+            raise ApiError(HTTPStatus.NOT_FOUND, "Not found.")
+        resource = RESOURCES[parts[0]]
+        record_id = None
+        if len(parts) == 2:
+            if not parts[1].isdigit():
+                raise ApiError(HTTPStatus.NOT_FOUND, "Not found.")
+            record_id = int(parts[1])
+        actions = {
+            ("GET", False): "list",
+            ("GET", True): "read",
+            ("POST", False): "create",
+            ("PATCH", True): "update",
+            ("PATCH", False): "update",
+            ("DELETE", True): "delete",
+            ("DELETE", False): "delete",
+        }
+        action = actions.get((method, record_id is not None))
+        if action is None:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, "Method not allowed.")
+        user = authenticate(headers)
+        permission = f"{resource.entity}-{action}"
+        if not user.has_perm(permission):
+            raise ApiError(
+                HTTPStatus.FORBIDDEN,
+                f"You don't have the permission ({permission}) to do this action",
+            )
+        if action == "list":
+            return HTTPStatus.OK, list_records(resource, query)
+        if action == "read":
+            try:
+                record = resource.get(record_id, user)
+            except (ValueError, DoesNotExist) as e:
+                raise ApiError(HTTPStatus.NOT_FOUND, str(e))
+            return HTTPStatus.OK, serialize(resource.model, record)
+        return write_records(resource, action, body, user, record_id)
+    except ApiError as e:
+        return e.status, {"error": str(e)}
+    except Exception as e:
+        from epic import telemetry
+
+        telemetry.capture_exception(e)
+        return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error."}
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """Return the method, target, version, headers and body of a HTTP request"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, target, version = request_line.decode("latin-1").split()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    body = await reader.readexactly(length) if length else b""
+    return method, target, version, headers, body
+
+
+async def handle_connection(reader, writer, executor):
+    """Serve the requests of a connection, kept alive between the requests"""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            request = await read_request(reader)
+            if request is None:
+                break
+            method, target, version, headers, body = request
+            # the queries are synchronous: they run in the worker threads so the
+            # event loop keeps accepting and reading requests meanwhile
+            status, payload = await loop.run_in_executor(
+                executor, dispatch, method, target, headers, body
+            )
+            data = json.dumps(payload, default=str).encode()
+            keep_alive = (
+                version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+            )
+            writer.write(
+                (
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                ).encode()
+                + data
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int, workers: int, ready=None):
+    """
+    Serve the API until cancelled.
+
+    Args:
+        workers (int): The number of threads running the queries. Each one keeps
+            its own database connection, a pool must allow as many connections.
+        ready: Function called with the server once it listens.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        server = await asyncio.start_server(
+            lambda reader, writer: handle_connection(reader, writer, executor),
+            host,
+            port,
+        )
+        if ready is not None:
+            ready(server)
+        async with server:
+            await server.serve_forever()
@@ -5,6 +5,31 @@ import os
 
 user_auth = None
 
+# Returns the authenticated user instead of reading the token again, set by the
+# shell to keep the session in memory between its commands
+session_provider = None
+
+# commands authorized by the permission of an existing action
+PERMISSION_ALIASES = {
+    "import-clients": "client-create",
+    "import-contracts": "contract-create",
+    "import-events": "event-create",
+    "export-clients": "client-read",
+    "export-contracts": "contract-read",
+    "export-events": "event-read",
+    "export-users": "user-list",
+    "export-roles": "role-list",
+    "event-conflicts": "event-list",
+    "event-assign": "event-update",
+    "report-outstanding": "contract-list",
+    "report-clients": "contract-list",
+    "report-events": "event-list",
+    "report-dashboard": "contract-list",
+    "report-summaries": "contract-list",
+    "maintenance-recount": "user-update",
+    "maintenance-check": "user-list",
+}
+
 
 def check_auth(ctx: typer.Context):
     """
@@ -18,23 +43,39 @@ def check_auth(ctx: typer.Context):
 
     """
     command = ctx.invoked_subcommand
-    print(ctx.invoked_subcommand)
     if command in ["login", "logout"]:
         return
-    global user_auth
-    user_auth = User.is_auth()
-    if user_auth is None:
-        exit()
+    get_user_auth()
 
     permission_to_check = f"{ctx.info_name}-{command}"
+    permission_to_check = PERMISSION_ALIASES.get(
+        permission_to_check, permission_to_check
+    )
     check_permissions(user_auth, permission_to_check)
 
 
+def check_admin(ctx: typer.Context):
+    """Check the permissions of the command like check_auth, for administrators only"""
+    check_auth(ctx)
+    if user_auth.role.name not in ["admin", "super_admin"]:
+        typer.echo("Only administrators can run this command.")
+        raise typer.Exit(code=1)
+
+
+def get_user_auth() -> User:
+    """Return the authenticated user and keep it in user_auth. Exit the app if none"""
+    global user_auth
+    user_auth = session_provider() if session_provider else User.is_auth()
+    if user_auth is None:
+        raise typer.Exit()
+    return user_auth
+
+
 def check_permissions(user: User, permission: str):
     """Check if the user have permission. Exit the app if not"""
     if not user.has_perm(permission):
         print(f"You don't have the permission ({permission}) to do this action")
-        exit()
+        raise typer.Exit()
 
 
 app = typer.Typer(callback=check_auth)
@@ -86,7 +127,7 @@ def logout():
 def authenticate(email: str, password: str):
     user = User.authenticate(email, password)
     if user:
-        return user.generate_jwt_token()
+        return user.generate_jwt_token(permissions=User.get_role_mask(user.role_id))
     else:
         typer.echo("Invalid credentials. Authentication failed.")
         return None
@@ -1,15 +1,41 @@
 import typer
+from typing import Optional
 from epic.models.models import Client, User
 from peewee import DoesNotExist
 from epic.cli.auth_cli import check_auth
-from epic.utils import get_input
+from epic.utils import (
+    get_input,
+    validate_records,
+    apply_batch,
+    insert_batch,
+    save_changes,
+    report_batch,
+    paginate,
+    echo_next_page,
+    LIMIT_HELP,
+    AFTER_HELP,
+)
 
 
 app = typer.Typer(callback=check_auth)
 
+CLIENT_FIELDS = {"name": str, "email": "email", "phone": "phone", "company": str}
+
+UPDATE_FIELDS = {"id": int, **CLIENT_FIELDS, "sales_contact_id": int}
+
+SORT_FIELDS = {"id": Client.id, "name": Client.name}
+
+FILE_HELP = "NDJSON or CSV file of records ('-' reads the standard input)."
+
 
 @app.command("create")
-def create_client():
+def create_client(
+    name: Optional[str] = typer.Option(None, help="Name of the client."),
+    email: Optional[str] = typer.Option(None, help="Email of the client."),
+    phone: Optional[str] = typer.Option(None, help="Phone of the client."),
+    company: Optional[str] = typer.Option(None, help="Company of the client."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Create a new client
 
     This function prompts the user to enter the client's name, email, phone, company, and sales contact ID, and then creates a new client with the provided information.
@@ -32,13 +58,20 @@ def create_client():
         Enter client company: ABC Corp
         Enter sales contact ID: 1
         Client John Doe created successfully.
+
+        The fields can be given as options, and many clients can be created from a file
+        with the fields name, email, phone and company:
+        $ python -m epic client create --file clients.csv
+        2 records created, 0 errors.
     """
     from epic.cli.auth_cli import user_auth
 
-    name = get_input("Enter client name", str)
-    email = get_input("Enter client email", "email")
-    phone = get_input("Enter client phone", "phone")
-    company = get_input("Enter client company:", str)
+    if file is not None:
+        return create_clients_batch(file, user_auth)
+    name = get_input("Enter client name", str, value=name)
+    email = get_input("Enter client email", "email", value=email)
+    phone = get_input("Enter client phone", "phone", value=phone)
+    company = get_input("Enter client company:", str, value=company)
     try:
         sales_contact = User.get(User.id == user_auth.id)
         client = Client.create(
@@ -54,7 +87,11 @@ def create_client():
 
 
 @app.command("list")
-def list_clients():
+def list_clients(
+    limit: Optional[int] = typer.Option(None, min=1, help=LIMIT_HELP),
+    after: Optional[str] = typer.Option(None, help=AFTER_HELP),
+    sort: str = typer.Option("id", help=f"Sort field: {', '.join(SORT_FIELDS)}."),
+):
     """Get a list of all clients in the system
 
     Args:
@@ -71,16 +108,27 @@ def list_clients():
     $ python -m epic client list_clients
     Client ID: 1, Name: Acme Corp, Email: <EMAIL>, Phone: <PHONE>, Company: Acme Corp, Sales Contact ID: 1
     Client ID: 2, Name: Globex Corp, Email: <EMAIL>, Phone: <PHONE>, Company: Globex Corp, Sales Contact ID: 2
-    ..."""
-    clients = Client.select()
+    ...
+
+    Pages are given with --limit, the next one with the --after cursor displayed at
+    the end of a page:
+    $ python -m epic client list --sort name --limit 50
+    """
+    clients = paginate(
+        Client.select(Client, User).join(User), SORT_FIELDS, sort, limit, after
+    )
     for client in clients:
         typer.echo(
             f"Client ID: {client.id}, Name: {client.name}, Email: {client.email}, Phone: {client.phone}, Company: {client.company}, Sales Contact ID: {client.sales_contact.id}"
         )
+    echo_next_page(clients)
 
 
 @app.command("delete")
-def delete_client():
+def delete_client(
+    client_id: Optional[int] = typer.Option(None, "--id", help="ID of the client."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Deletes an existing client.
 
     This function prompts the user to enter the ID of the client to delete, and then deletes the client if the user is the sales contact for the client or if they are an administrator.
@@ -99,10 +147,15 @@ def delete_client():
         $ python -m epic client delete
         1
         Client 1 deleted successfully.
+
+        Many clients can be deleted from a file with an id field:
+        $ python -m epic client delete --file clients.csv
     """
     from epic.cli.auth_cli import user_auth
 
-    client_id = get_input("Enter client ID to delete", int)
+    if file is not None:
+        return delete_clients_batch(file, user_auth)
+    client_id = get_input("Enter client ID to delete", int, value=client_id)
     try:
         client = Client.get(Client.id == client_id)
         if client.sales_contact.id == user_auth.id or user_auth.role.name in [
@@ -118,7 +171,17 @@ def delete_client():
 
 
 @app.command("update")
-def update_client():
+def update_client(
+    client_id: Optional[int] = typer.Option(None, "--id", help="ID of the client."),
+    name: Optional[str] = typer.Option(None, help="New name of the client."),
+    email: Optional[str] = typer.Option(None, help="New email of the client."),
+    phone: Optional[str] = typer.Option(None, help="New phone of the client."),
+    company: Optional[str] = typer.Option(None, help="New company of the client."),
+    sales_contact_id: Optional[int] = typer.Option(
+        None, help="ID of the new sales contact."
+    ),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """
     Updates an existing client.
 
@@ -145,10 +208,18 @@ def update_client():
         Enter new sales contact ID or press 'Enter':
         2
         Client John Doe updated successfully.
+
+        When the ID is given as an option, the fields which are not given keep their
+        value. Many clients can be updated from a file with an id field:
+        $ python -m epic client update --id 1 --company "ABC Corp"
+        $ python -m epic client update --file clients.csv
     """
     from epic.cli.auth_cli import user_auth
 
-    client_id = get_input("Enter client ID to update:", int)
+    if file is not None:
+        return update_clients_batch(file, user_auth)
+    interactive = client_id is None
+    client_id = get_input("Enter client ID to update:", int, value=client_id)
     try:
         client = Client.get(Client.id == client_id)
         try:
@@ -168,28 +239,61 @@ def update_client():
             return None
     except DoesNotExist:
         typer.echo(f"Client with ID {client_id} does not exist.")
-
-    name = get_input("Enter new name or press 'Enter'", str, default=client.name)
-    email = get_input("Enter new email or press 'Enter'", "email", default=client.email)
-    phone = get_input("Enter new phone or press 'Enter'", "phone", default=client.phone)
+        return None
+
+    name = get_input(
+        "Enter new name or press 'Enter'",
+        str,
+        value=name,
+        interactive=interactive,
+        default=client.name,
+    )
+    email = get_input(
+        "Enter new email or press 'Enter'",
+        "email",
+        value=email,
+        interactive=interactive,
+        default=client.email,
+    )
+    phone = get_input(
+        "Enter new phone or press 'Enter'",
+        "phone",
+        value=phone,
+        interactive=interactive,
+        default=client.phone,
+    )
     company = get_input(
-        "Enter new company or press 'Enter'", str, default=client.company
+        "Enter new company or press 'Enter'",
+        str,
+        value=company,
+        interactive=interactive,
+        default=client.company,
     )
     sales_contact_id = get_input(
         "Enter new sales contact ID or press 'Enter'",
         int,
+        value=sales_contact_id,
+        interactive=interactive,
         default=client.sales_contact.id,
     )
 
     try:
-        sales_contact = User.get(User.id == sales_contact_id)
-        client.name = name
-        client.email = email
-        client.phone = phone
-        client.company = company
-        client.sales_contact = sales_contact
-        client.save()
-        typer.echo(f"Client {client.name} updated successfully.")
+        if sales_contact_id != client.sales_contact_id:
+            User.get(User.id == sales_contact_id)
+        changed = save_changes(
+            client,
+            {
+                "name": name,
+                "email": email,
+                "phone": phone,
+                "company": company,
+                "sales_contact": sales_contact_id,
+            },
+        )
+        if changed:
+            typer.echo(f"Client {client.name} updated successfully.")
+        else:
+            typer.echo(f"Client {client.name} is unchanged.")
     except DoesNotExist:
         typer.echo(f"Sales contact with ID '{sales_contact_id}' does not exist.")
 
@@ -210,17 +314,102 @@ def my_clients():
     Example:
     To get a list of all clients where the user is the sales contact, you can run the following command:
     $ python -m epic client my_clients
-    Client ID: 1, Name: Acme Corp, Email: <EMAIL>, Phone: <PHONE>, Company: Acme Corp, Sales Contact ID: 1
-    Client ID: 2, Name: Globex Corp, Email: <EMAIL>, Phone: <PHONE>, Company: Globex Corp, Sales Contact ID: 1
+    Client ID: 1, Name: Acme Corp, Email: <EMAIL>, Phone: <PHONE>, Company: Acme Corp, Sales Contact ID: 1, Open contracts: 2
+    Client ID: 2, Name: Globex Corp, Email: <EMAIL>, Phone: <PHONE>, Company: Globex Corp, Sales Contact ID: 1, Open contracts: 0
     ...
+    2 clients.
     """
     from epic.cli.auth_cli import user_auth
+    from epic.counters import get_counts
 
-    clients = Client.select().where(Client.sales_contact == user_auth.id)
+    clients = list(
+        Client.select(Client, User)
+        .join(User)
+        .where(Client.sales_contact == user_auth.id)
+    )
+    open_contracts = get_counts("open_contracts", [client.id for client in clients])
     for client in clients:
         typer.echo(
-            f"Client ID: {client.id}, Name: {client.name}, Email: {client.email}, Phone: {client.phone}, Company: {client.company}, Sales Contact ID: {client.sales_contact.id}"
+            f"Client ID: {client.id}, Name: {client.name}, Email: {client.email}, Phone: {client.phone}, Company: {client.company}, Sales Contact ID: {client.sales_contact.id}, Open contracts: {open_contracts.get(client.id, 0)}"
         )
+    typer.echo(f"{len(clients)} clients.")
+
+
+def can_manage(client: Client, user) -> bool:
+    """Return True if the user is the sales contact of the client or an administrator"""
+    return client.sales_contact_id == user.id or user.role.name in [
+        "admin",
+        "super_admin",
+    ]
+
+
+def get_client(client_id: int, user) -> Client:
+    """Return the client if the user can manage it, raise ValueError otherwise"""
+    client = Client.get_or_none(Client.id == client_id)
+    if client is None:
+        raise ValueError(f"Client with ID {client_id} does not exist.")
+    if not can_manage(client, user):
+        raise ValueError(f"Client {client.name} does not belong to you.")
+    return client
+
+
+def create_clients_batch(file: str, user_auth):
+    """Create the clients of a batch file, the user is their sales contact"""
+    rows, errors = validate_records(file, CLIENT_FIELDS)
+    count, create_errors = create_clients(rows, user_auth)
+    report_batch("created", count, errors + create_errors)
+
+
+def create_clients(rows: list, user_auth):
+    """
+    Create validated clients, the user is their sales contact.
+
+    Returns:
+        tuple: The number of created clients and the list of (row number, error).
+    """
+    for _, record in rows:
+        record["sales_contact"] = user_auth.id
+    return insert_batch(Client, rows)
+
+
+def update_clients_batch(file: str, user_auth):
+    """Update the clients of a batch file, only the given fields are changed"""
+    rows, errors = validate_records(file, UPDATE_FIELDS, required=["id"])
+    count, update_errors = update_clients(rows, user_auth)
+    report_batch("updated", count, errors + update_errors)
+
+
+def update_clients(rows: list, user_auth):
+    """Update validated clients, only the given fields are changed"""
+
+    def update_row(record):
+        client = get_client(record.pop("id"), user_auth)
+        if "sales_contact_id" in record:
+            sales_contact_id = record.pop("sales_contact_id")
+            if not User.select().where(User.id == sales_contact_id).exists():
+                raise ValueError(
+                    f"Sales contact with ID '{sales_contact_id}' does not exist."
+                )
+            record["sales_contact"] = sales_contact_id
+        save_changes(client, record)
+
+    return apply_batch(Client, rows, update_row)
+
+
+def delete_clients_batch(file: str, user_auth):
+    """Delete the clients of a batch file"""
+    rows, errors = validate_records(file, {"id": int})
+    count, delete_errors = delete_clients(rows, user_auth)
+    report_batch("deleted", count, errors + delete_errors)
+
+
+def delete_clients(rows: list, user_auth):
+    """Delete clients given by id"""
+
+    def delete_row(record):
+        get_client(record["id"], user_auth).delete_instance()
+
+    return apply_batch(Client, rows, delete_row)
 
 
 if __name__ == "__main__":
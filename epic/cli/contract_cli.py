@@ -1,15 +1,49 @@
 import typer
+from typing import Optional
 from epic.models.models import Contract, Client
 from peewee import DoesNotExist
 from epic.cli.auth_cli import check_auth
-from epic.utils import get_input
-import sentry_sdk
+from epic.utils import (
+    get_input,
+    validate_records,
+    apply_batch,
+    insert_batch,
+    save_changes,
+    report_batch,
+    paginate,
+    echo_next_page,
+    LIMIT_HELP,
+    AFTER_HELP,
+)
+from epic import telemetry
 
 app = typer.Typer(callback=check_auth)
 
+CONTRACT_FIELDS = {
+    "name": str,
+    "signed": "status",
+    "total_amount": float,
+    "due_amount": float,
+}
+
+CREATE_FIELDS = {"client_id": int, **CONTRACT_FIELDS}
+
+UPDATE_FIELDS = {"id": int, **CONTRACT_FIELDS}
+
+SORT_FIELDS = {"id": Contract.id, "name": Contract.name}
+
+FILE_HELP = "NDJSON or CSV file of records ('-' reads the standard input)."
+
 
 @app.command("create")
-def create_contract():
+def create_contract(
+    client_id: Optional[int] = typer.Option(None, help="ID of the client."),
+    name: Optional[str] = typer.Option(None, help="Name of the contract."),
+    signed: Optional[str] = typer.Option(None, help="Signed status (True/False)."),
+    total_amount: Optional[float] = typer.Option(None, help="Total amount."),
+    due_amount: Optional[float] = typer.Option(None, help="Due amount."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """
     Creates a new contract.
 
@@ -34,18 +68,27 @@ def create_contract():
         Enter due amount: 500
         Is the contract signed? (True/False): True
         Contract Contract 1 created successfully.
+
+        The fields can be given as options, and many contracts can be created from a
+        file with the fields client_id, name, signed, total_amount and due_amount:
+        $ python -m epic contract create --file contracts.csv
+        2 records created, 0 errors.
     """
     from epic.cli.auth_cli import user_auth
 
-    client_id = get_input("Enter client ID for the new contract", int)
+    if file is not None:
+        return create_contracts_batch(file, user_auth)
+    client_id = get_input("Enter client ID for the new contract", int, value=client_id)
 
     try:
         client = Client.get(Client.id == client_id)
         if client.sales_contact.id == user_auth.id:
-            name = get_input("Enter contract name", str)
-            signed = get_input("Is the contract signed? (True/False)", "status")
-            total_amount = get_input("Enter total amount", float)
-            due_amount = get_input("Enter due amount", float)
+            name = get_input("Enter contract name", str, value=name)
+            signed = get_input(
+                "Is the contract signed? (True/False)", "status", value=signed
+            )
+            total_amount = get_input("Enter total amount", float, value=total_amount)
+            due_amount = get_input("Enter due amount", float, value=due_amount)
             contract = Contract.create(
                 name=name,
                 client=client,
@@ -55,7 +98,7 @@ def create_contract():
             )
             typer.echo(f"Contract {contract.name} created successfully.")
             if signed is True:
-                sentry_sdk.capture_message(f"Contract {contract.name} is signed")
+                telemetry.capture_message(f"Contract {contract.name} is signed")
         else:
             typer.echo(f"Client {client.name} does not belong to you.")
     except DoesNotExist:
@@ -63,7 +106,11 @@ def create_contract():
 
 
 @app.command("list")
-def list_contracts():
+def list_contracts(
+    limit: Optional[int] = typer.Option(None, min=1, help=LIMIT_HELP),
+    after: Optional[str] = typer.Option(None, help=AFTER_HELP),
+    sort: str = typer.Option("id", help=f"Sort field: {', '.join(SORT_FIELDS)}."),
+):
     """Get a list of all contracts
 
     Args:
@@ -81,16 +128,28 @@ def list_contracts():
     Contract ID: 1, Name: Contract 1, Client ID: 1, Signed: True
     Contract ID: 2, Name: Contract 2, Client ID: 2, Signed: False
     ...
+
+    Pages are given with --limit, the next one with the --after cursor displayed at
+    the end of a page:
+    $ python -m epic contract list --limit 50 --after WzUwLCA1MF0
     """
-    contracts = Contract.select()
+    contracts = paginate(
+        Contract.select(Contract, Client).join(Client), SORT_FIELDS, sort, limit, after
+    )
     for contract in contracts:
         typer.echo(
             f"Contract ID: {contract.id}, Name: {contract.name}, Client ID: {contract.client.id}, Signed: {contract.signed}"
         )
+    echo_next_page(contracts)
 
 
 @app.command("delete")
-def delete_contract():
+def delete_contract(
+    contract_id: Optional[int] = typer.Option(
+        None, "--id", help="ID of the contract."
+    ),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Deletes a contract.
 
     Args:
@@ -108,10 +167,15 @@ def delete_contract():
         $ python -m epic contract delete
         Enter contract ID to delete: 1
         Contract 1 deleted successfully.
+
+        Many contracts can be deleted from a file with an id field:
+        $ python -m epic contract delete --file contracts.csv
     """
     from epic.cli.auth_cli import user_auth
 
-    contract_id = get_input("Enter contract ID to delete", int)
+    if file is not None:
+        return delete_contracts_batch(file, user_auth)
+    contract_id = get_input("Enter contract ID to delete", int, value=contract_id)
     try:
         contract = Contract.get(Contract.id == contract_id)
 
@@ -128,7 +192,16 @@ def delete_contract():
 
 
 @app.command("update")
-def update_contract():
+def update_contract(
+    contract_id: Optional[int] = typer.Option(
+        None, "--id", help="ID of the contract."
+    ),
+    name: Optional[str] = typer.Option(None, help="New name of the contract."),
+    signed: Optional[str] = typer.Option(None, help="Signed status (True/False)."),
+    total_amount: Optional[float] = typer.Option(None, help="New total amount."),
+    due_amount: Optional[float] = typer.Option(None, help="New due amount."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """
     Updates an existing contract.
 
@@ -152,10 +225,18 @@ def update_contract():
         Enter new total amount: 1000
         Enter new due amount: 500
         Contract Contract 1 Updated updated successfully.
+
+        When the ID is given as an option, the fields which are not given keep their
+        value. Many contracts can be updated from a file with an id field:
+        $ python -m epic contract update --id 1 --signed True
+        $ python -m epic contract update --file contracts.csv
     """
     from epic.cli.auth_cli import user_auth
 
-    contract_id = get_input("Enter contract ID to update", int)
+    if file is not None:
+        return update_contracts_batch(file, user_auth)
+    interactive = contract_id is None
+    contract_id = get_input("Enter contract ID to update", int, value=contract_id)
     try:
         contract = Contract.get(Contract.id == contract_id)
         status = contract.signed
@@ -172,23 +253,52 @@ def update_contract():
             return None
     except DoesNotExist:
         typer.echo(f"Contract with ID {contract_id} does not exist.")
-
-    name = get_input("Enter new name or press 'Enter'", str, default=contract.name)
-    signed = get_input("Is the contract signed? (True/False)", "status")
+        return None
+
+    name = get_input(
+        "Enter new name or press 'Enter'",
+        str,
+        value=name,
+        interactive=interactive,
+        default=contract.name,
+    )
+    signed = get_input(
+        "Is the contract signed? (True/False)",
+        "status",
+        value=signed,
+        interactive=interactive,
+        default=contract.signed,
+    )
     total_amount = get_input(
-        "Enter new total amount", float, default=contract.total_amount
+        "Enter new total amount",
+        float,
+        value=total_amount,
+        interactive=interactive,
+        default=contract.total_amount,
+    )
+    due_amount = get_input(
+        "Enter new due amount:",
+        float,
+        value=due_amount,
+        interactive=interactive,
+        default=contract.due_amount,
     )
-    due_amount = get_input("Enter new due amount:", float, default=contract.due_amount)
-
-    contract.name = name
-    contract.signed = signed
-    contract.total_amount = total_amount
-    contract.due_amount = due_amount
 
-    contract.save()
+    changed = save_changes(
+        contract,
+        {
+            "name": name,
+            "signed": signed,
+            "total_amount": total_amount,
+            "due_amount": due_amount,
+        },
+    )
+    if not changed:
+        typer.echo(f"Contract {contract.name} is unchanged.")
+        return None
     typer.echo(f"Contract {contract.name} updated successfully.")
     if signed is True and status is False:
-        sentry_sdk.capture_message(f"Contract {contract.name} is signed")
+        telemetry.capture_message(f"Contract {contract.name} is signed")
 
 
 @app.command("read")
@@ -210,16 +320,108 @@ def my_contracts():
     """
     from epic.cli.auth_cli import user_auth
 
-    clients = (
-        user_auth.clients
-    )  # Access events through the relationship defined in models
-    for client in clients:
-        if client.sales_contact.id == user_auth.id:
-            contracts = client.contracts
-            for contract in contracts:
-                typer.echo(
-                    f"Contract ID: {contract.id}, Name: {contract.name}, Client ID: {client.id}, Signed: {contract.signed}"
-                )
+    contracts = (
+        Contract.select(Contract, Client)
+        .join(Client)
+        .where(Client.sales_contact == user_auth.id)
+    )
+    for contract in contracts:
+        typer.echo(
+            f"Contract ID: {contract.id}, Name: {contract.name}, Client ID: {contract.client.id}, Signed: {contract.signed}"
+        )
+
+
+def get_contract(contract_id: int, user) -> Contract:
+    """Return the contract if the user can manage it, raise ValueError otherwise"""
+    contract = (
+        Contract.select(Contract, Client)
+        .join(Client)
+        .where(Contract.id == contract_id)
+        .get_or_none()
+    )
+    if contract is None:
+        raise ValueError(f"Contract with ID {contract_id} does not exist.")
+    if contract.client.sales_contact_id != user.id and user.role.name not in [
+        "admin",
+        "super_admin",
+    ]:
+        raise ValueError(f"Contract {contract.name} does not belong to you.")
+    return contract
+
+
+def create_contracts_batch(file: str, user_auth):
+    """Create the contracts of a batch file for the clients of the user"""
+    rows, errors = validate_records(file, CREATE_FIELDS)
+    count, create_errors = create_contracts(rows, user_auth)
+    report_batch("created", count, errors + create_errors)
+
+
+def create_contracts(rows: list, user_auth):
+    """
+    Create validated contracts for the clients of the user.
+
+    Returns:
+        tuple: The number of created contracts and the list of (row number, error).
+    """
+    errors = []
+    client_ids = {record["client_id"] for _, record in rows}
+    own_clients = {
+        client_id
+        for (client_id,) in Client.select(Client.id)
+        .where(Client.id.in_(client_ids) & (Client.sales_contact == user_auth.id))
+        .tuples()
+    }
+    valid_rows = []
+    for number, record in rows:
+        if record["client_id"] in own_clients:
+            record["client"] = record.pop("client_id")
+            valid_rows.append((number, record))
+        else:
+            errors.append(
+                (number, f"Client {record['client_id']} does not belong to you.")
+            )
+    count, insert_errors = insert_batch(Contract, valid_rows)
+    failed = {number for number, _ in insert_errors}
+    for number, record in valid_rows:
+        if record["signed"] is True and number not in failed:
+            telemetry.capture_message(f"Contract {record['name']} is signed")
+    return count, errors + insert_errors
+
+
+def update_contracts_batch(file: str, user_auth):
+    """Update the contracts of a batch file, only the given fields are changed"""
+    rows, errors = validate_records(file, UPDATE_FIELDS, required=["id"])
+    count, update_errors = update_contracts(rows, user_auth)
+    report_batch("updated", count, errors + update_errors)
+
+
+def update_contracts(rows: list, user_auth):
+    """Update validated contracts, only the given fields are changed"""
+
+    def update_row(record):
+        contract = get_contract(record.pop("id"), user_auth)
+        newly_signed = record.get("signed") is True and contract.signed is False
+        save_changes(contract, record)
+        if newly_signed:
+            telemetry.capture_message(f"Contract {contract.name} is signed")
+
+    return apply_batch(Contract, rows, update_row)
+
+
+def delete_contracts_batch(file: str, user_auth):
+    """Delete the contracts of a batch file"""
+    rows, errors = validate_records(file, {"id": int})
+    count, delete_errors = delete_contracts(rows, user_auth)
+    report_batch("deleted", count, errors + delete_errors)
+
+
+def delete_contracts(rows: list, user_auth):
+    """Delete contracts given by id"""
+
+    def delete_row(record):
+        get_contract(record["id"], user_auth).delete_instance()
+
+    return apply_batch(Contract, rows, delete_row)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,59 @@
 import typer
-from epic.models.models import Event, Contract, User, Role
-from peewee import DoesNotExist
+from typing import Optional
+from epic.models.models import Event, Contract, Client, User, Role
+from peewee import DoesNotExist, JOIN
 from epic.cli.auth_cli import check_auth
-from epic.utils import get_input
+from epic.scheduling import (
+    auto_assign,
+    check_availability,
+    conflicts_message,
+    find_conflicts,
+)
+from epic.utils import (
+    get_input,
+    validate_records,
+    apply_batch,
+    insert_batch,
+    save_changes,
+    report_batch,
+    paginate,
+    echo_next_page,
+    LIMIT_HELP,
+    AFTER_HELP,
+)
 
 
 app = typer.Typer(callback=check_auth)
 
+EVENT_FIELDS = {
+    "name": str,
+    "date_start": "date",
+    "date_end": "date",
+    "location": str,
+    "attendees": int,
+    "notes": str,
+}
+
+CREATE_FIELDS = {"contract_id": int, **EVENT_FIELDS}
+
+UPDATE_FIELDS = {"id": int, "support_contact_id": int, **EVENT_FIELDS}
+
+SORT_FIELDS = {"id": Event.id, "name": Event.name, "date_start": Event.date_start}
+
+FILE_HELP = "NDJSON or CSV file of records ('-' reads the standard input)."
+
 
 @app.command("create")
-def create_event():
+def create_event(
+    contract_id: Optional[int] = typer.Option(None, help="ID of the contract."),
+    name: Optional[str] = typer.Option(None, help="Name of the event."),
+    date_start: Optional[str] = typer.Option(None, help="Start date (YYYY-MM-DD)."),
+    date_end: Optional[str] = typer.Option(None, help="End date (YYYY-MM-DD)."),
+    location: Optional[str] = typer.Option(None, help="Location of the event."),
+    attendees: Optional[int] = typer.Option(None, help="Number of attendees."),
+    notes: Optional[str] = typer.Option(None, help="Notes about the event."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Create a new event
 
     This function prompts the user to enter the event's name, contract ID, support contact ID, start date, end date, location, number of attendees, and notes, and then creates a new event with the provided information.
@@ -35,10 +79,18 @@ def create_event():
         Enter number of attendees: 100
         Enter notes: Annual meeting of the company
         Event Annual Meeting created successfully.
+
+        The fields can be given as options, and many events can be created from a file
+        with the fields contract_id, name, date_start, date_end, location, attendees
+        and notes:
+        $ python -m epic event create --file events.csv
+        2 records created, 0 errors.
     """
     from epic.cli.auth_cli import user_auth
 
-    contract_id = get_input("Enter contract ID", int)
+    if file is not None:
+        return create_events_batch(file, user_auth)
+    contract_id = get_input("Enter contract ID", int, value=contract_id)
     try:
         contract = Contract.get(Contract.id == contract_id)
         if contract.client.sales_contact.id == user_auth.id or user_auth.role.name in [
@@ -54,13 +106,13 @@ def create_event():
     except Contract.DoesNotExist:
         typer.echo(f"Contract with ID {contract_id} does not exist.")
         return None
-    name = get_input("Enter event name", str)
+    name = get_input("Enter event name", str, value=name)
 
-    date_start = get_input("Enter start date (YYYY-MM-DD)", "date")
-    date_end = get_input("Enter end date (YYYY-MM-DD)", "date")
-    location = get_input("Enter location", str)
-    attendees = get_input("Enter number of attendees", int)
-    notes = get_input("Enter notes", str)
+    date_start = get_input("Enter start date (YYYY-MM-DD)", "date", value=date_start)
+    date_end = get_input("Enter end date (YYYY-MM-DD)", "date", value=date_end)
+    location = get_input("Enter location", str, value=location)
+    attendees = get_input("Enter number of attendees", int, value=attendees)
+    notes = get_input("Enter notes", str, value=notes)
 
     try:
         event = Event.create(
@@ -78,7 +130,11 @@ def create_event():
 
 
 @app.command("list")
-def list_events():
+def list_events(
+    limit: Optional[int] = typer.Option(None, min=1, help=LIMIT_HELP),
+    after: Optional[str] = typer.Option(None, help=AFTER_HELP),
+    sort: str = typer.Option("id", help=f"Sort field: {', '.join(SORT_FIELDS)}."),
+):
     """
     Lists all events in the database.
 
@@ -96,16 +152,33 @@ def list_events():
         $ python -m epic event list
         Event ID: 1, Name: Annual Meeting, Contract ID: 1, Location: New York
         Event ID: 2, Name: Customer Conference, Contract ID: 2, Location: San Francisco
+
+        Pages are given with --limit, the next one with the --after cursor displayed
+        at the end of a page:
+        $ python -m epic event list --sort date_start --limit 50
     """
-    events = Event.select()
+    events = paginate(
+        Event.select(Event, Contract, User)
+        .join(Contract)
+        .switch(Event)
+        .join(User, JOIN.LEFT_OUTER, on=Event.support_contact),
+        SORT_FIELDS,
+        sort,
+        limit,
+        after,
+    )
     for event in events:
         typer.echo(
             f"Event ID: {event.id}, Name: {event.name}, Contract ID: {event.contract.id}, Support Contact ID: {event.support_contact.id if event.support_contact else 'None'}, Start Date: {event.date_start}, End Date: {event.date_end}, Location: {event.location}, Attendees: {event.attendees}, Notes: {event.notes}"
         )
+    echo_next_page(events)
 
 
 @app.command("delete")
-def delete_event():
+def delete_event(
+    event_id: Optional[int] = typer.Option(None, "--id", help="ID of the event."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Deletes an event based on the given event ID.
 
     Args:
@@ -122,15 +195,19 @@ def delete_event():
         Enter event ID to delete: 1
         Event Annual Meeting deleted successfully.
 
+        Many events can be deleted from a file with an id field:
+        $ python -m epic event delete --file events.csv
     """
     from epic.cli.auth_cli import user_auth
 
-    event_id = get_input("Enter event ID to delete", int)
+    if file is not None:
+        return delete_events_batch(file, user_auth)
+    event_id = get_input("Enter event ID to delete", int, value=event_id)
     try:
         event = Event.get(Event.id == event_id)
         if (
-            user_auth.id == event.support_contact.id
-            or user_auth.id == event.contract.client.sales_contact.id
+            user_auth.id == event.support_contact_id
+            or user_auth.id == event.contract.client.sales_contact_id
             or user_auth.role.name in ["admin", "super_admin"]
         ):
             event.delete_instance()
@@ -142,7 +219,22 @@ def delete_event():
 
 
 @app.command("update")
-def update_event():
+def update_event(
+    event_id: Optional[int] = typer.Option(None, "--id", help="ID of the event."),
+    support_contact_id: Optional[int] = typer.Option(
+        None, help="ID of the support contact (administrators only)."
+    ),
+    name: Optional[str] = typer.Option(None, help="New name of the event."),
+    date_start: Optional[str] = typer.Option(None, help="New start date."),
+    date_end: Optional[str] = typer.Option(None, help="New end date."),
+    location: Optional[str] = typer.Option(None, help="New location."),
+    attendees: Optional[int] = typer.Option(None, help="New number of attendees."),
+    notes: Optional[str] = typer.Option(None, help="New notes."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+    allow_conflicts: bool = typer.Option(
+        False, help="Assign the support contact even if they have overlapping events."
+    ),
+):
     """
     Update an existing event.
 
@@ -170,25 +262,38 @@ def update_event():
         Enter new number of attendees or press 'Enter': 150
         Enter new notes or press 'Enter': Annual meeting of the company
         Event Annual Meeting 2023 updated successfully.
+
+        When the ID is given as an option, the fields which are not given keep their
+        value. Many events can be updated from a file with an id field:
+        $ python -m epic event update --id 1 --location "New York"
+        $ python -m epic event update --file events.csv
+
+        A support contact is not assigned, and the dates of an assigned event are not
+        changed, when the support contact has overlapping events, unless
+        --allow-conflicts is given.
     """
     from epic.cli.auth_cli import user_auth
 
-    event_id = get_input("Enter event ID to update", int)
+    if file is not None:
+        return update_events_batch(file, user_auth, allow_conflicts)
+    interactive = event_id is None
+    event_id = get_input("Enter event ID to update", int, value=event_id)
+    # the new support contact is saved with the other fields, once both are checked
+    support_contact = None
     try:
         event = Event.get(Event.id == event_id)
         if user_auth.role.name in [
             "admin",
             "super_admin",
-        ]:
-            support_contact_id = get_input("Enter support contact ID to update", int)
+        ] and (interactive or support_contact_id is not None):
+            support_contact_id = get_input(
+                "Enter support contact ID to update", int, value=support_contact_id
+            )
             try:
                 support = Role.get(Role.name == "support")
                 support_contact = User.get(
                     (User.id == support_contact_id) & (User.role == support)
                 )
-                event.support_contact = support_contact
-                event.save()
-                typer.echo(f"Support contact of {event.name} added successfully.")
             except DoesNotExist:
                 typer.echo(
                     f"Support contact with ID '{support_contact_id}' does not exist."
@@ -208,35 +313,76 @@ def update_event():
             "super_admin",
         ]
     ):
-        name = get_input("Enter new name or press 'Enter':", str, default=event.name)
+        name = get_input(
+            "Enter new name or press 'Enter':",
+            str,
+            value=name,
+            interactive=interactive,
+            default=event.name,
+        )
         date_start = get_input(
-            "Enter new start date or press 'Enter'", "date", default=event.date_start
+            "Enter new start date or press 'Enter'",
+            "date",
+            value=date_start,
+            interactive=interactive,
+            default=event.date_start,
         )
         date_end = get_input(
-            "Enter new end date or press 'Enter'", "date", default=event.date_end
+            "Enter new end date or press 'Enter'",
+            "date",
+            value=date_end,
+            interactive=interactive,
+            default=event.date_end,
         )
         location = get_input(
-            "Enter new location or press 'Enter'", str, default=event.location
+            "Enter new location or press 'Enter'",
+            str,
+            value=location,
+            interactive=interactive,
+            default=event.location,
         )
         attendees = get_input(
             "Enter new number of attendees or press 'Enter'",
             int,
+            value=attendees,
+            interactive=interactive,
             default=event.attendees,
         )
-        notes = get_input("Enter new notes or press 'Enter'", str, default=event.notes)
-
-        try:
-            event.name = name
-            event.date_start = date_start
-            event.date_end = date_end
-            event.location = location
-            event.attendees = attendees
-            event.notes = notes
+        notes = get_input(
+            "Enter new notes or press 'Enter'",
+            str,
+            value=notes,
+            interactive=interactive,
+            default=event.notes,
+        )
 
-            event.save()
+        values = {
+            "name": name,
+            "date_start": date_start,
+            "date_end": date_end,
+            "location": location,
+            "attendees": attendees,
+            "notes": notes,
+        }
+        conflicts = []
+        if support_contact is not None:
+            values["support_contact"] = support_contact
+            conflicts = check_availability(
+                event, support_contact.id, date_start, date_end
+            )
+        elif (date_start, date_end) != (event.date_start, event.date_end):
+            conflicts = check_availability(
+                event, event.support_contact_id, date_start, date_end
+            )
+        if not report_conflicts(conflicts, allow_conflicts):
+            return None
+        changed = save_changes(event, values)
+        if support_contact is not None:
+            typer.echo(f"Support contact of {event.name} added successfully.")
+        if changed:
             typer.echo(f"Event {event.name} updated successfully.")
-        except DoesNotExist:
-            typer.echo(f"Support contact with ID {support_contact_id} does not exist.")
+        else:
+            typer.echo(f"Event {event.name} is unchanged.")
     else:
         typer.echo(f"Contract {event.name} does not belong to you.")
         return None
@@ -263,22 +409,31 @@ def my_events():
         Event ID: 2, Name: Customer Conference
     """
     from epic.cli.auth_cli import user_auth
+    from epic.counters import get_upcoming_events
 
     if user_auth.role.name == "support":
         events = (
-            user_auth.events
-        )  # Access events through the relationship defined in models
+            Event.select(Event, Contract)
+            .join(Contract)
+            .where(Event.support_contact == user_auth.id)
+        )
         for event in events:
             typer.echo(
                 f"Event ID: {event.id}, Name: {event.name}, Contract ID: {event.contract.id}, Location: {event.location}"
             )
+        count, since = get_upcoming_events(user_auth.id)
+        typer.echo(f"{count} events ending on or after {since}.")
     elif user_auth.role.name == "sales":
-        events = Event.select()
+        events = (
+            Event.select(Event, Contract)
+            .join(Contract)
+            .join(Client)
+            .where(Client.sales_contact == user_auth.id)
+        )
         for event in events:
-            if event.contract.client.sales_contact == user_auth:
-                typer.echo(
-                    f"Event ID: {event.id}, Name: {event.name}, Contract ID: {event.contract.id}, Location: {event.location}"
-                )
+            typer.echo(
+                f"Event ID: {event.id}, Name: {event.name}, Contract ID: {event.contract.id}, Location: {event.location}"
+            )
     elif user_auth.role.name in ["admin", "super_admin"]:
         events = Event.select().where(Event.support_contact.is_null())
         for event in events:
@@ -288,5 +443,228 @@ def my_events():
         typer.echo("User not allowed to view events.")
 
 
+def report_conflicts(conflicts: list, allow_conflicts: bool) -> bool:
+    """
+    Print the overlapping events of an assignment. Return False if the change is
+    refused.
+    """
+    if not conflicts:
+        return True
+    typer.echo(conflicts_message(conflicts))
+    if not allow_conflicts:
+        typer.echo("Change refused, use --allow-conflicts to force it.")
+        return False
+    typer.echo("Warning: assigned despite the overlapping events.")
+    return True
+
+
+@app.command("conflicts")
+def list_conflicts(
+    support_contact_id: Optional[int] = typer.Option(
+        None, help="Only the events of this support contact."
+    ),
+    since: Optional[str] = typer.Option(
+        None, help="Only the events ending on or after this date (YYYY-MM-DD)."
+    ),
+):
+    """
+    List the events overlapping another event of their support contact. The
+    administrators see every support contact, the other users their own events.
+
+    Example:
+        $ python -m epic event conflicts --since 2024-01-01
+        Support contact 12: event 45 (2024-03-01 - 2024-03-02) overlaps event 78
+        (2024-03-02 - 2024-03-02)
+        1 conflicts.
+    """
+    from epic.cli.auth_cli import user_auth
+
+    if since is not None:
+        since = get_input("Enter the first day", "date", value=since)
+    if not is_admin(user_auth):
+        support_contact_id = user_auth.id
+    count = 0
+    for contact, first, second in find_conflicts(support_contact_id, since):
+        count += 1
+        typer.echo(
+            f"Support contact {contact}: event {first[0]} ({first[1]} - {first[2]}) "
+            f"overlaps event {second[0]} ({second[1]} - {second[2]})"
+        )
+    typer.echo(f"{count} conflicts.")
+
+
+@app.command("assign")
+def assign_events(
+    auto: bool = typer.Option(
+        False, help="Assign every unassigned event to a support contact."
+    ),
+    since: Optional[str] = typer.Option(
+        None, help="Only the events ending on or after this date (YYYY-MM-DD)."
+    ),
+    dry_run: bool = typer.Option(
+        False, help="Display the assignments without saving them."
+    ),
+):
+    """
+    Assign the events without support contact to the support users (administrators
+    only). Each event goes to the support user with the fewest events who has no
+    overlapping event; the events nobody is available for stay unassigned.
+
+    Example:
+        $ python -m epic event assign --auto --since 2024-01-01
+        Event 45 assigned to support contact 12.
+        1 events assigned, 0 left unassigned.
+    """
+    from epic.cli.auth_cli import user_auth
+
+    if not is_admin(user_auth):
+        typer.echo("Only administrators can assign the support contacts.")
+        raise typer.Exit(code=1)
+    if not auto:
+        typer.echo("Use --auto to assign the events automatically.")
+        raise typer.Exit(code=1)
+    if since is not None:
+        since = get_input("Enter the first day", "date", value=since)
+    assignments, unassigned = auto_assign(since, dry_run=dry_run)
+    for event_id, contact in assignments.items():
+        typer.echo(f"Event {event_id} assigned to support contact {contact}.")
+    for event_id in unassigned:
+        typer.echo(f"Event {event_id}: no support contact available.")
+    summary = f"{len(assignments)} events assigned, {len(unassigned)} left unassigned."
+    if dry_run:
+        summary += " Nothing was saved (dry run)."
+    typer.echo(summary)
+
+
+def is_admin(user) -> bool:
+    """Return True if the user is an administrator"""
+    return user.role.name in ["admin", "super_admin"]
+
+
+def get_event(event_id: int, user) -> Event:
+    """Return the event if the user can manage it, raise ValueError otherwise"""
+    event = (
+        Event.select(Event, Contract, Client)
+        .join(Contract)
+        .join(Client)
+        .where(Event.id == event_id)
+        .get_or_none()
+    )
+    if event is None:
+        raise ValueError(f"Event with ID {event_id} does not exist.")
+    if (
+        event.support_contact_id != user.id
+        and event.contract.client.sales_contact_id != user.id
+        and not is_admin(user)
+    ):
+        raise ValueError(f"Event {event.name} does not belong to you.")
+    return event
+
+
+def create_events_batch(file: str, user_auth):
+    """Create the events of a batch file for the signed contracts of the user"""
+    rows, errors = validate_records(file, CREATE_FIELDS)
+    count, create_errors = create_events(rows, user_auth)
+    report_batch("created", count, errors + create_errors)
+
+
+def create_events(rows: list, user_auth):
+    """
+    Create validated events for the signed contracts of the user.
+
+    Returns:
+        tuple: The number of created events and the list of (row number, error).
+    """
+    errors = []
+    contract_ids = {record["contract_id"] for _, record in rows}
+    query = (
+        Contract.select(Contract.id)
+        .join(Client)
+        .where(Contract.id.in_(contract_ids) & (Contract.signed == True))  # noqa: E712
+    )
+    if not is_admin(user_auth):
+        query = query.where(Client.sales_contact == user_auth.id)
+    allowed_contracts = {contract_id for (contract_id,) in query.tuples()}
+    valid_rows = []
+    for number, record in rows:
+        if record["contract_id"] in allowed_contracts:
+            record["contract"] = record.pop("contract_id")
+            valid_rows.append((number, record))
+        else:
+            errors.append(
+                (
+                    number,
+                    f"Contract {record['contract_id']} does not exist, is not signed "
+                    "or does not belong to you.",
+                )
+            )
+    count, insert_errors = insert_batch(Event, valid_rows)
+    return count, errors + insert_errors
+
+
+def update_events_batch(file: str, user_auth, allow_conflicts: bool = False):
+    """Update the events of a batch file, only the given fields are changed"""
+    rows, errors = validate_records(file, UPDATE_FIELDS, required=["id"])
+    count, update_errors = update_events(rows, user_auth, allow_conflicts)
+    report_batch("updated", count, errors + update_errors)
+
+
+def update_events(rows: list, user_auth, allow_conflicts: bool = False):
+    """
+    Update validated events, only the given fields are changed. An event is
+    rejected when its support contact has overlapping events, unless
+    allow_conflicts.
+    """
+    support = Role.get(Role.name == "support")
+
+    def update_row(record):
+        event = get_event(record.pop("id"), user_auth)
+        if "support_contact_id" in record:
+            support_contact_id = record.pop("support_contact_id")
+            if not is_admin(user_auth):
+                raise ValueError("Only administrators can change the support contact.")
+            if (
+                not User.select()
+                .where((User.id == support_contact_id) & (User.role == support))
+                .exists()
+            ):
+                raise ValueError(
+                    f"Support contact with ID '{support_contact_id}' does not exist."
+                )
+            record["support_contact"] = support_contact_id
+        if not allow_conflicts and record.keys() & {
+            "support_contact",
+            "date_start",
+            "date_end",
+        }:
+            conflicts = check_availability(
+                event,
+                record.get("support_contact", event.support_contact_id),
+                record.get("date_start", event.date_start),
+                record.get("date_end", event.date_end),
+            )
+            if conflicts:
+                raise ValueError(conflicts_message(conflicts))
+        save_changes(event, record)
+
+    return apply_batch(Event, rows, update_row)
+
+
+def delete_events_batch(file: str, user_auth):
+    """Delete the events of a batch file"""
+    rows, errors = validate_records(file, {"id": int})
+    count, delete_errors = delete_events(rows, user_auth)
+    report_batch("deleted", count, errors + delete_errors)
+
+
+def delete_events(rows: list, user_auth):
+    """Delete events given by id"""
+
+    def delete_row(record):
+        get_event(record["id"], user_auth).delete_instance()
+
+    return apply_batch(Event, rows, delete_row)
+
+
 if __name__ == "__main__":
     app()
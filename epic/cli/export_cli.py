@@ -0,0 +1,204 @@
+import csv
+import json
+import sys
+import typer
+from enum import Enum
+from peewee import DateField
+from epic.columnar import write_columnar
+from epic.models.models import Client, Contract, Event, User, Role
+from epic.cli.auth_cli import check_auth, check_permissions
+
+
+app = typer.Typer(callback=check_auth)
+
+
+class ExportFormat(str, Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+    columnar = "columnar"
+
+
+OUTPUT_HELP = "File to write ('-' writes to the standard output)."
+ALL_HELP = "Export every record (requires the list permission)."
+BATCH_HELP = "Number of rows per row group of the columnar format."
+
+
+def export_columns(model):
+    """Return the exported fields of a model, foreign keys by id, never passwords"""
+    return [field for field in model._meta.sorted_fields if field.name != "password"]
+
+
+def select_columns(model):
+    """
+    Return the selected columns of an export. The dates are exported as stored:
+    parsing them into date objects only to format them again dominates the export
+    time.
+    """
+    return [
+        field.coerce(False) if isinstance(field, DateField) else field
+        for field in export_columns(model)
+    ]
+
+
+def write_csv(stream, columns: list, rows):
+    writer = csv.writer(stream)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_ndjson(stream, columns: list, rows):
+    count = 0
+    for row in rows:
+        stream.write(json.dumps(dict(zip(columns, row)), default=str) + "\n")
+        count += 1
+    return count
+
+
+def export_query(
+    model, query, output: str, export_format: ExportFormat, batch_size: int
+):
+    """
+    Stream the rows of a query to the output. The rows are fetched as tuples with a
+    server-side iterator, so no model instances are built and the memory usage does
+    not depend on the number of rows.
+    """
+    columns = [field.column_name for field in export_columns(model)]
+    rows = query.tuples().iterator()
+    binary = export_format == ExportFormat.columnar
+    if output == "-":
+        stream = sys.stdout.buffer if binary else sys.stdout
+        count = write_rows(stream, columns, rows, export_format, batch_size)
+        stream.flush()
+    else:
+        mode, newline = ("wb", None) if binary else ("w", "")
+        with open(output, mode, newline=newline) as stream:
+            count = write_rows(stream, columns, rows, export_format, batch_size)
+    typer.echo(f"{count} rows exported.", err=True)
+
+
+def write_rows(stream, columns, rows, export_format: ExportFormat, batch_size: int):
+    if export_format == ExportFormat.csv:
+        return write_csv(stream, columns, rows)
+    if export_format == ExportFormat.ndjson:
+        return write_ndjson(stream, columns, rows)
+    return write_columnar(stream, columns, rows, row_group_size=batch_size)
+
+
+def check_list_permission(entity: str, all_records: bool):
+    """Exporting every record requires the permission to list them"""
+    from epic.cli.auth_cli import user_auth
+
+    if all_records:
+        check_permissions(user_auth, f"{entity}-list")
+    return user_auth
+
+
+@app.command("clients")
+def export_clients(
+    output: str = typer.Option("-", "--output", "-o", help=OUTPUT_HELP),
+    export_format: ExportFormat = typer.Option(ExportFormat.csv, "--format"),
+    all_records: bool = typer.Option(False, "--all", help=ALL_HELP),
+    batch_size: int = typer.Option(10000, min=1, help=BATCH_HELP),
+):
+    """
+    Export the clients of the user, or every client with --all.
+
+    Example:
+        epic export clients --format ndjson -o clients.ndjson
+    """
+    user_auth = check_list_permission("client", all_records)
+    query = Client.select(*select_columns(Client)).order_by(Client.id)
+    if not all_records:
+        query = query.where(Client.sales_contact == user_auth.id)
+    export_query(Client, query, output, export_format, batch_size)
+
+
+@app.command("contracts")
+def export_contracts(
+    output: str = typer.Option("-", "--output", "-o", help=OUTPUT_HELP),
+    export_format: ExportFormat = typer.Option(ExportFormat.csv, "--format"),
+    all_records: bool = typer.Option(False, "--all", help=ALL_HELP),
+    batch_size: int = typer.Option(10000, min=1, help=BATCH_HELP),
+):
+    """
+    Export the contracts of the clients of the user, or every contract with --all.
+
+    Example:
+        epic export contracts --all --format columnar -o contracts.col
+    """
+    user_auth = check_list_permission("contract", all_records)
+    query = Contract.select(*select_columns(Contract)).order_by(Contract.id)
+    if not all_records:
+        query = query.join(Client).where(Client.sales_contact == user_auth.id)
+    export_query(Contract, query, output, export_format, batch_size)
+
+
+@app.command("events")
+def export_events(
+    output: str = typer.Option("-", "--output", "-o", help=OUTPUT_HELP),
+    export_format: ExportFormat = typer.Option(ExportFormat.csv, "--format"),
+    all_records: bool = typer.Option(False, "--all", help=ALL_HELP),
+    batch_size: int = typer.Option(10000, min=1, help=BATCH_HELP),
+):
+    """
+    Export the events shown by `event read`: the events of a support contact, the
+    events of the clients of a sales contact, the events without support for an
+    administrator. Every event is exported with --all.
+
+    Example:
+        epic export events --all --format columnar -o events.col
+    """
+    user_auth = check_list_permission("event", all_records)
+    query = Event.select(*select_columns(Event)).order_by(Event.id)
+    if not all_records:
+        role = user_auth.role.name
+        if role == "support":
+            query = query.where(Event.support_contact == user_auth.id)
+        elif role == "sales":
+            query = (
+                query.join(Contract)
+                .join(Client)
+                .where(Client.sales_contact == user_auth.id)
+            )
+        elif role in ["admin", "super_admin"]:
+            query = query.where(Event.support_contact.is_null())
+        else:
+            typer.echo("User not allowed to view events.")
+            return
+    export_query(Event, query, output, export_format, batch_size)
+
+
+@app.command("users")
+def export_users(
+    output: str = typer.Option("-", "--output", "-o", help=OUTPUT_HELP),
+    export_format: ExportFormat = typer.Option(ExportFormat.csv, "--format"),
+    batch_size: int = typer.Option(10000, min=1, help=BATCH_HELP),
+):
+    """
+    Export the users, without their password.
+
+    Example:
+        epic export users -o users.csv
+    """
+    query = User.select(*select_columns(User)).order_by(User.id)
+    export_query(User, query, output, export_format, batch_size)
+
+
+@app.command("roles")
+def export_roles(
+    output: str = typer.Option("-", "--output", "-o", help=OUTPUT_HELP),
+    export_format: ExportFormat = typer.Option(ExportFormat.csv, "--format"),
+    batch_size: int = typer.Option(10000, min=1, help=BATCH_HELP),
+):
+    """
+    Export the roles.
+
+    Example:
+        epic export roles --format ndjson
+    """
+    query = Role.select(*select_columns(Role)).order_by(Role.id)
+    export_query(Role, query, output, export_format, batch_size)
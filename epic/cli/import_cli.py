@@ -0,0 +1,297 @@
+import itertools
+import json
+import os
+import time
+import typer
+from peewee import chunked
+from epic.models.models import Client, Contract, Event, User, Role
+from epic.cli.auth_cli import check_auth
+from epic.utils import insert_batch, read_records, validate_record
+
+
+app = typer.Typer(callback=check_auth)
+
+FILE_HELP = "NDJSON or CSV file to import ('-' reads the standard input)."
+CHUNK_HELP = "Number of rows inserted per transaction."
+RESUME_HELP = "Resume from the checkpoint of a previous import of the file."
+
+
+class ImportReport:
+    """Count the rows of an import and display its errors as they occur"""
+
+    def __init__(self):
+        self.imported = 0
+        self.errors = 0
+        self.start = time.perf_counter()
+
+    def error(self, number: int, message: str):
+        self.errors += 1
+        typer.echo(f"Row {number}: {message}")
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.imported / elapsed if elapsed else 0
+        typer.echo(
+            f"{self.imported} rows imported, {self.errors} errors "
+            f"in {elapsed:.2f}s ({rate:.0f} rows/s)."
+        )
+
+
+def checkpoint_path(path: str):
+    return f"{path}.checkpoint"
+
+
+def read_checkpoint(path: str):
+    """Return the number of rows already processed by a previous import"""
+    try:
+        with open(checkpoint_path(path)) as checkpoint_file:
+            return json.load(checkpoint_file)["rows"]
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path: str, rows: int):
+    with open(checkpoint_path(path), "w") as checkpoint_file:
+        json.dump({"rows": rows}, checkpoint_file)
+
+
+def parse(path: str, skip: int):
+    """Yield the (row number, record) pairs of the file after the skipped rows"""
+    return itertools.islice(enumerate(read_records(path), start=1), skip, None)
+
+
+def validate(rows, fields: dict, required: list, report: ImportReport):
+    """Yield the validated rows, report the invalid ones"""
+    for number, record in rows:
+        try:
+            yield number, validate_record(record, fields, required)
+        except ValueError as e:
+            report.error(number, str(e))
+
+
+def resolve(rows, lookups: dict, report: ImportReport):
+    """
+    Replace the foreign keys given by natural key (email, id) with the ids found in
+    the in-memory lookup tables, report the rows referencing unknown records.
+
+    Args:
+        rows: The (row number, validated record) pairs.
+        lookups (dict): The name of each foreign key column of the file and the
+            (lookup table, model field) pair resolving it.
+        report (ImportReport): The report of the import.
+    """
+    for number, record in rows:
+        try:
+            for column, (table, field) in lookups.items():
+                if column not in record:
+                    continue
+                key = record.pop(column)
+                if key not in table:
+                    raise ValueError(f"{column}: {key} does not exist or is not yours.")
+                record[field] = table[key]
+            yield number, record
+        except ValueError as e:
+            report.error(number, str(e))
+
+
+def with_defaults(rows, defaults: dict):
+    """Fill the missing fields of the rows with default values"""
+    for number, record in rows:
+        yield number, {**defaults, **record}
+
+
+def load(model, rows, path: str, chunk_size: int, report: ImportReport):
+    """Insert the rows by chunks, each one in a transaction followed by a checkpoint"""
+    for chunk in chunked(rows, chunk_size):
+        count, errors = insert_batch(model, chunk, batch_size=chunk_size)
+        report.imported += count
+        for number, message in errors:
+            report.error(number, message)
+        if path != "-":
+            write_checkpoint(path, chunk[-1][0])
+
+
+def run_import(
+    model,
+    path: str,
+    fields: dict,
+    lookups: dict,
+    chunk_size: int,
+    resume: bool,
+    required: list = None,
+    defaults: dict = None,
+):
+    """
+    Stream a file through the import pipeline: parse, validate, resolve the foreign
+    keys and insert by chunks. Only one chunk is held in memory, and a checkpoint is
+    written after each committed chunk so that an interrupted import can be resumed.
+    """
+    report = ImportReport()
+    skip = read_checkpoint(path) if resume and path != "-" else 0
+    if skip:
+        typer.echo(f"Resuming after row {skip}.")
+    rows = parse(path, skip)
+    rows = validate(rows, fields, required, report)
+    rows = resolve(rows, lookups, report)
+    if defaults:
+        rows = with_defaults(rows, defaults)
+    load(model, rows, path, chunk_size, report)
+    if path != "-" and os.path.exists(checkpoint_path(path)):
+        os.remove(checkpoint_path(path))
+    report.summary()
+    return report
+
+
+def is_admin(user) -> bool:
+    """Return True if the user is an administrator"""
+    return user.role.name in ["admin", "super_admin"]
+
+
+def users_by_email(role_name: str = None):
+    """Return the lookup table of the user ids by email"""
+    query = User.select(User.email, User.id)
+    if role_name:
+        query = query.join(Role).where(Role.name == role_name)
+    return dict(query.tuples())
+
+
+@app.command("clients")
+def import_clients(
+    file: str = typer.Argument(..., help=FILE_HELP),
+    chunk_size: int = typer.Option(1000, min=1, help=CHUNK_HELP),
+    resume: bool = typer.Option(False, help=RESUME_HELP),
+):
+    """
+    Import clients from a file. The optional sales_contact column holds the email of
+    the sales contact, the importing user by default.
+
+    Args:
+        file (str): The NDJSON or CSV file of the clients.
+        chunk_size (int): The number of clients inserted per transaction.
+        resume (bool): Resume from the checkpoint of a previous import.
+
+    Example:
+        epic import clients clients.csv --chunk-size 5000
+    """
+    from epic.cli.auth_cli import user_auth
+
+    if is_admin(user_auth):
+        sales_contacts = users_by_email("sales")
+    else:
+        sales_contacts = {user_auth.email: user_auth.id}
+    run_import(
+        Client,
+        file,
+        {
+            "name": str,
+            "email": "email",
+            "phone": "phone",
+            "company": str,
+            "sales_contact": "email",
+        },
+        {"sales_contact": (sales_contacts, "sales_contact")},
+        chunk_size,
+        resume,
+        required=["name", "email", "phone", "company"],
+        defaults={"sales_contact": user_auth.id},
+    )
+
+
+@app.command("contracts")
+def import_contracts(
+    file: str = typer.Argument(..., help=FILE_HELP),
+    chunk_size: int = typer.Option(1000, min=1, help=CHUNK_HELP),
+    resume: bool = typer.Option(False, help=RESUME_HELP),
+):
+    """
+    Import contracts from a file. The client column holds the email of the client.
+
+    Args:
+        file (str): The NDJSON or CSV file of the contracts.
+        chunk_size (int): The number of contracts inserted per transaction.
+        resume (bool): Resume from the checkpoint of a previous import.
+
+    Example:
+        epic import contracts contracts.ndjson --resume
+    """
+    from epic.cli.auth_cli import user_auth
+
+    query = Client.select(Client.email, Client.id)
+    if not is_admin(user_auth):
+        query = query.where(Client.sales_contact == user_auth.id)
+    run_import(
+        Contract,
+        file,
+        {
+            "name": str,
+            "client": "email",
+            "total_amount": float,
+            "due_amount": float,
+            "signed": "status",
+        },
+        {"client": (dict(query.tuples()), "client")},
+        chunk_size,
+        resume,
+    )
+
+
+@app.command("events")
+def import_events(
+    file: str = typer.Argument(..., help=FILE_HELP),
+    chunk_size: int = typer.Option(1000, min=1, help=CHUNK_HELP),
+    resume: bool = typer.Option(False, help=RESUME_HELP),
+):
+    """
+    Import events from a file. The contract_id column references a signed contract,
+    the optional support_contact column holds the email of the support contact and
+    can only be set by an administrator.
+
+    Args:
+        file (str): The NDJSON or CSV file of the events.
+        chunk_size (int): The number of events inserted per transaction.
+        resume (bool): Resume from the checkpoint of a previous import.
+
+    Example:
+        epic import events events.csv
+    """
+    from epic.cli.auth_cli import user_auth
+
+    query = (
+        Contract.select(Contract.id)
+        .join(Client)
+        .where(Contract.signed == True)  # noqa: E712
+    )
+    supports = {}
+    if is_admin(user_auth):
+        supports = users_by_email("support")
+    else:
+        query = query.where(Client.sales_contact == user_auth.id)
+    run_import(
+        Event,
+        file,
+        {
+            "name": str,
+            "contract_id": int,
+            "support_contact": "email",
+            "date_start": "date",
+            "date_end": "date",
+            "location": str,
+            "attendees": int,
+            "notes": str,
+        },
+        {
+            "contract_id": ({id: id for (id,) in query.tuples()}, "contract"),
+            "support_contact": (supports, "support_contact"),
+        },
+        chunk_size,
+        resume,
+        required=[
+            "name",
+            "contract_id",
+            "date_start",
+            "date_end",
+            "location",
+            "attendees",
+            "notes",
+        ],
+    )
@@ -8,17 +8,27 @@ from epic.models.models import (
     db,
     RolePermission,
     Permission,
+    invalidate_sessions,
+    hash_password,
+    PERMISSION_MODELS,
+    PERMISSION_ACTIONS,
+    PERMISSION_NAMES,
 )
-import peewee
+import time
+from typing import Optional
+from peewee import fn
 from datetime import datetime
-import sentry_sdk
+from epic import telemetry
+from epic.synthetic import EMAIL_DOMAIN, SCALES, generate
+from epic.search import create_search_index
+from epic.counters import create_counters
 
 
 app = typer.Typer()
 roles_data = ["admin", "sales", "support", "super_admin"]
 
-models_for_permissions = ["user", "contract", "client", "role", "event"]
-permissions = ["create", "read", "list", "update", "delete"]
+models_for_permissions = PERMISSION_MODELS
+permissions = PERMISSION_ACTIONS
 roles_perms = [
     {"role": 1, "permission": 1},  # admin can create user
     {"role": 4, "permission": 1},  # super_admin can create user
@@ -104,21 +114,13 @@ roles_perms = [
 
 def create_permissions():
     "create crud permissions for each models"
-    models_permissions = []
-    # construct a dict for each model with crud permissions
-    for model in models_for_permissions:
-        model_permissions = [
-            {"name": f"{model}-{permission}"} for permission in permissions
-        ]
-        models_permissions.extend(model_permissions)
-    models_permissions.append({"name": "user-password"})
-    print(models_permissions)
-
-    with db.atomic():
-        Permission.insert_many(models_permissions).execute()
-    # associate roles with permissions
+    # the crud permissions of each model followed by the special ones
+    models_permissions = [{"name": name} for name in PERMISSION_NAMES]
     with db.atomic():
-        RolePermission.insert_many(roles_perms).execute()
+        Permission.insert_many(models_permissions).on_conflict_ignore().execute()
+        # associate roles with permissions
+        RolePermission.insert_many(roles_perms).on_conflict_ignore().execute()
+    invalidate_sessions()
 
 
 def create_tables():
@@ -131,9 +133,34 @@ def create_tables():
 
     # Create tables if they don't already exist
     db.create_tables(
-        [User, Client, Contract, Event, Role, Permission],
+        [User, Client, Contract, Event, Role, Permission, RolePermission],
         safe=True,
     )
+    create_search_index(db)
+    create_counters(db)
+
+
+def upgrade_database():
+    """
+    Upgrade an existing database to the current schema.
+
+    Missing tables and indexes are created. Duplicated role permissions are removed
+    first so that the unique (role, permission) index can be added.
+    """
+    with db.atomic():
+        if RolePermission.table_exists():
+            first_ids = RolePermission.select(fn.MIN(RolePermission.id)).group_by(
+                RolePermission.role, RolePermission.permission
+            )
+            RolePermission.delete().where(
+                RolePermission.id.not_in(first_ids)
+            ).execute()
+        db.create_tables(
+            [User, Client, Contract, Event, Role, Permission, RolePermission],
+            safe=True,
+        )
+        create_search_index(db)
+        create_counters(db)
 
 
 def initialize_roles():
@@ -142,142 +169,193 @@ def initialize_roles():
 
     This function creates the default roles (admin, sales, and support) if they do not already exist.
     """
+    Role.insert_many([{"name": name} for name in roles_data]).on_conflict_ignore().execute()
 
-    for role_name in roles_data:
-        try:
-            Role.create(name=role_name)
-        except peewee.IntegrityError:
-            # Role already exists, ignore the error
-            pass
 
+# demo data of a new project, the users log in with the password "password"
+DEMO_USERS = [
+    ("admin", "super_admin"),
+    ("ana", "admin"),
+    ("tom", "admin"),
+    ("bob", "sales"),
+    ("pam", "sales"),
+    ("max", "support"),
+    ("val", "support"),
+]
 
-@app.command("initialize")
-def initialize():
+DEMO_CLIENTS = [
+    {
+        "name": "John Doe",
+        "email": "john.doe@company1.com",
+        "phone": "123-456-7890",
+        "company": "Company1",
+        "sales_contact": "bob",
+    },
+    {
+        "name": "Jane Smith",
+        "email": "jane.smith@company2.com",
+        "phone": "987-654-3210",
+        "company": "Company2",
+        "sales_contact": "pam",
+    },
+]
+
+DEMO_CONTRACTS = [
+    ("Contract1 for John Doe", "john.doe@company1.com", 5000.0, 2500.0, True),
+    ("Contract2 for John Doe", "john.doe@company1.com", 8000.0, 4000.0, False),
+    ("Contract1 for Jane Smith", "jane.smith@company2.com", 6000.0, 3000.0, True),
+    ("Contract2 for Jane Smith", "jane.smith@company2.com", 9000.0, 4500.0, False),
+]
+
+# name, contract, support contact, date, location, attendees
+DEMO_EVENTS = [
+    ("Event1 for Contract1", "Contract1 for John Doe", "max", datetime(2023, 1, 1), "Venue1", 100),
+    ("Event2 for Contract1", "Contract1 for John Doe", None, datetime(2023, 2, 1), "Venue2", 150),
+    ("Event1 for Contract1", "Contract1 for Jane Smith", "max", datetime(2023, 3, 1), "Venue3", 120),
+    ("Event2 for Contract1", "Contract1 for Jane Smith", None, datetime(2023, 4, 1), "Venue4", 200),
+]  # fmt: skip
+
+
+def create_demo_users():
+    """Insert the demo users which do not exist"""
+    emails = {name: f"{name}@epic.com" for name, _ in DEMO_USERS}
+    existing = {
+        email
+        for email, in User.select(User.email)
+        .where(User.email.in_(list(emails.values())))
+        .tuples()
+    }
+    missing = [(name, role) for name, role in DEMO_USERS if emails[name] not in existing]
+    if not missing:
+        return
+    roles = dict(Role.select(Role.name, Role.id).tuples())
+    # the demo users share their well-known password, it is hashed once
+    password_hash = hash_password("password")
+    User.insert_many(
+        {"name": name, "email": emails[name], "password": password_hash, "role": roles[role]}
+        for name, role in missing
+    ).execute()
+
+
+def create_demo_records():
     """
-    Initialize the database
+    Insert the demo clients with their contracts and events, unless the clients
+    exist: the contracts and events have no unique key telling if they exist.
     """
-    with db:
-        if db.is_closed() is True:
-            db.connect()
-        create_tables()
-        initialize_roles()
-        sales = Role.get(Role.name == "sales")
-        support = Role.get(Role.name == "support")
-        admin = Role.get(Role.name == "admin")
-        User.create_superuser("admin", "admin@epic.com", "password")
-
-        RolePermission.create_table()
-        create_permissions()
-
-        # Create users
-        User.create(name="ana", email="ana@epic.com", password="password", role=admin)
-        User.create(name="tom", email="tom@epic.com", password="password", role=admin)
-        User.create(name="bob", email="bob@epic.com", password="password", role=sales)
-        User.create(name="pam", email="pam@epic.com", password="password", role=sales)
-        User.create(name="max", email="max@epic.com", password="password", role=support)
-        User.create(name="val", email="val@epic.com", password="password", role=support)
-
-        # Create clients
-        client1 = Client.create(
-            name="John Doe",
-            email="john.doe@company1.com",
-            phone="123-456-7890",
-            company="Company1",
-            sales_contact=User.get(
-                User.name == "bob"
-            ),  # Assuming "bob" is the sales user
-        )
+    client_emails = [client["email"] for client in DEMO_CLIENTS]
+    if Client.select().where(Client.email.in_(client_emails)).exists():
+        return
+    users = dict(
+        User.select(User.name, User.id)
+        .where(User.email.in_([f"{name}@epic.com" for name, _ in DEMO_USERS]))
+        .tuples()
+    )
+    Client.insert_many(
+        {**client, "sales_contact": users[client["sales_contact"]]}
+        for client in DEMO_CLIENTS
+    ).execute()
+    clients = dict(
+        Client.select(Client.email, Client.id).where(Client.email.in_(client_emails)).tuples()
+    )
+    Contract.insert_many(
+        {
+            "name": name,
+            "client": clients[client],
+            "total_amount": total_amount,
+            "due_amount": due_amount,
+            "signed": signed,
+        }
+        for name, client, total_amount, due_amount, signed in DEMO_CONTRACTS
+    ).execute()
+    contracts = dict(
+        Contract.select(Contract.name, Contract.id)
+        .where(Contract.client.in_(list(clients.values())))
+        .tuples()
+    )
+    Event.insert_many(
+        {
+            "name": name,
+            "contract": contracts[contract],
+            "support_contact": users.get(support_contact),
+            "date_start": date,
+            "date_end": date,
+            "location": location,
+            "attendees": attendees,
+            "notes": "Lorem ipsum dolor sit amet.",
+        }
+        for name, contract, support_contact, date, location, attendees in DEMO_EVENTS
+    ).execute()
 
-        client2 = Client.create(
-            name="Jane Smith",
-            email="jane.smith@company2.com",
-            phone="987-654-3210",
-            company="Company2",
-            sales_contact=User.get(
-                User.name == "pam"
-            ),  # Assuming "pam" is the sales user
-        )
 
-        # Create contracts for client1
-        contract1_client1 = Contract.create(
-            name="Contract1 for John Doe",
-            client=client1,
-            total_amount=5000.0,
-            due_amount=2500.0,
-            signed=True,
+def parse_scale(value: str) -> int:
+    """Return the number of events of a scale: a number or 10k, 100k, 1m"""
+    if value.lower() in SCALES:
+        return SCALES[value.lower()]
+    try:
+        events = int(value)
+    except ValueError:
+        events = -1
+    if events < 0:
+        raise typer.BadParameter(
+            f"{value} is not a number of events or one of {', '.join(SCALES)}."
         )
+    return events
 
-        contract2_client1 = Contract.create(
-            name="Contract2 for John Doe",
-            client=client1,
-            total_amount=8000.0,
-            due_amount=4000.0,
-            signed=False,
-        )
 
-        # Create events for contract1_client1
-        event1_contract1_client1 = Event.create(
-            name="Event1 for Contract1",
-            contract=contract1_client1,
-            support_contact=User.get(
-                User.name == "max"
-            ),  # Assuming "max" is the support user
-            date_start=datetime(2023, 1, 1),
-            date_end=datetime(2023, 1, 1),
-            location="Venue1",
-            attendees=100,
-            notes="Lorem ipsum dolor sit amet.",
-        )
+@app.command("initialize")
+def initialize(
+    scale: Optional[str] = typer.Option(
+        None,
+        help="Also seed synthetic data for load tests: a number of events or 10k, "
+        "100k, 1m.",
+    ),
+):
+    """
+    Initialize the database: tables, roles, permissions and demo data.
 
-        event2_contract1_client1 = Event.create(
-            name="Event2 for Contract1",
-            contract=contract1_client1,
-            date_start=datetime(2023, 2, 1),
-            date_end=datetime(2023, 2, 1),
-            location="Venue2",
-            attendees=150,
-            notes="Lorem ipsum dolor sit amet.",
-        )
+    The initialization runs in a single transaction and can be run again: what
+    already exists is kept. With --scale, synthetic users, clients, contracts and
+    events are generated in bulk (see epic/synthetic.py), unless they exist.
 
-        # Create contracts for client2
-        contract1_client2 = Contract.create(
-            name="Contract1 for Jane Smith",
-            client=client2,
-            total_amount=6000.0,
-            due_amount=3000.0,
-            signed=True,
-        )
+    Example:
+        $ python -m epic init initialize --scale 100k
+    """
+    events = parse_scale(scale) if scale is not None else None
+    start = time.perf_counter()
+    with db:
+        with db.atomic():
+            create_tables()
+            initialize_roles()
+            create_permissions()
+            create_demo_users()
+            create_demo_records()
+            if events is not None:
+                seed_synthetic_data(events)
+    typer.echo(
+        f"Project initialized successfully. ({time.perf_counter() - start:.2f}s)"
+    )
+    telemetry.capture_message("Project initialized successfully.")
 
-        contract2_client2 = Contract.create(
-            name="Contract2 for Jane Smith",
-            client=client2,
-            total_amount=9000.0,
-            due_amount=4500.0,
-            signed=False,
-        )
 
-        # Create events for contract1_client2
-        event1_contract1_client2 = Event.create(
-            name="Event1 for Contract1",
-            contract=contract1_client2,
-            support_contact=User.get(
-                User.name == "max"
-            ),  # Assuming "max" is the support user
-            date_start=datetime(2023, 3, 1),
-            date_end=datetime(2023, 3, 1),
-            location="Venue3",
-            attendees=120,
-            notes="Lorem ipsum dolor sit amet.",
-        )
+def seed_synthetic_data(events: int):
+    """Generate the synthetic data, unless it exists"""
+    if User.select().where(User.email.endswith(f"@{EMAIL_DOMAIN}")).exists():
+        typer.echo("Synthetic data already seeded, skipped.")
+        return
+    start = time.perf_counter()
+    counts = generate(events)
+    typer.echo(
+        f"Seeded {counts['users']} users, {counts['clients']} clients, "
+        f"{counts['contracts']} contracts and {counts['events']} events in "
+        f"{time.perf_counter() - start:.2f}s."
+    )
 
-        event2_contract1_client2 = Event.create(
-            name="Event2 for Contract1",
-            contract=contract1_client2,
-            date_start=datetime(2023, 4, 1),
-            date_end=datetime(2023, 4, 1),
-            location="Venue4",
-            attendees=200,
-            notes="Lorem ipsum dolor sit amet.",
-        )
-        typer.echo("Project initialized successfully.")
-        sentry_sdk.capture_message("Project initialized successfully.")
+
+@app.command("upgrade")
+def upgrade():
+    """
+    Upgrade an existing database (missing tables and indexes)
+    """
+    with db:
+        upgrade_database()
+        typer.echo("Database upgraded successfully.")
@@ -0,0 +1,65 @@
+import typer
+from datetime import date
+from typing import Optional
+from epic.cli.auth_cli import check_admin
+from epic.models.models import Client
+from epic.utils import get_input
+
+
+app = typer.Typer(callback=check_admin)
+
+
+@app.command("recount")
+def recount(
+    since: Optional[str] = typer.Option(
+        None, help="First day of the upcoming events (YYYY-MM-DD), today by default."
+    ),
+):
+    """
+    Compute again the counters of the clients, open contracts and upcoming events
+    in a single transaction. Run it daily so that the events which ended are no
+    longer upcoming.
+
+    Example:
+        $ python -m epic maintenance recount
+        Counters recomputed, upcoming events since 2024-03-01.
+    """
+    from epic import counters
+
+    if since is None:
+        since = date.today()
+    else:
+        since = get_input("Enter the first day", "date", value=since)
+    try:
+        counters.recount(Client._meta.database, since)
+    except RuntimeError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+    typer.echo(f"Counters recomputed, upcoming events since {since}.")
+
+
+@app.command("check")
+def check():
+    """
+    Compare the counters with the clients, contracts and events.
+
+    Example:
+        $ python -m epic maintenance check
+        clients of 3: 12 counted, 13 actual
+        1 wrong counters, run 'maintenance recount' to fix them.
+    """
+    from epic import counters
+
+    try:
+        errors = counters.check_counters(Client._meta.database)
+    except RuntimeError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+    for name, row_id, stored, actual in errors:
+        typer.echo(f"{name} of {row_id}: {stored} counted, {actual} actual")
+    if errors:
+        typer.echo(
+            f"{len(errors)} wrong counters, run 'maintenance recount' to fix them."
+        )
+        raise typer.Exit(code=1)
+    typer.echo("The counters are consistent.")
@@ -0,0 +1,92 @@
+import typer
+from epic.cli.auth_cli import check_admin
+from epic import reports
+from epic.models.models import Contract
+
+app = typer.Typer(callback=check_admin)
+
+
+@app.command("outstanding")
+def outstanding():
+    """
+    Display the amount still due on the contracts of each sales contact.
+
+    Example:
+        $ python -m epic report outstanding
+        Sales contact ID: 3, Name: Sales User, Due amount: 1500.00
+    """
+    for user_id, name, due in reports.outstanding_by_sales_contact():
+        typer.echo(f"Sales contact ID: {user_id}, Name: {name}, Due amount: {due:.2f}")
+
+
+@app.command("clients")
+def clients():
+    """
+    Display the value of the signed and unsigned contracts of each client.
+
+    Example:
+        $ python -m epic report clients
+        Client ID: 1, Name: ACME, Contracts: 3, Signed: 2000.00, Unsigned: 500.00,
+        Due: 700.00
+    """
+    for client_id, name, count, signed, unsigned, due in (
+        reports.contract_value_by_client()
+    ):
+        typer.echo(
+            f"Client ID: {client_id}, Name: {name}, Contracts: {count}, "
+            f"Signed: {signed:.2f}, Unsigned: {unsigned:.2f}, Due: {due:.2f}"
+        )
+
+
+@app.command("events")
+def events():
+    """
+    Display the number of events starting in each month.
+
+    Example:
+        $ python -m epic report events
+        2024-03: 12 events
+    """
+    for month, count in reports.events_per_month():
+        typer.echo(f"{month}: {count} events")
+
+
+@app.command("dashboard")
+def dashboard():
+    """
+    Display the totals of the contracts and the number of events.
+
+    Example:
+        $ python -m epic report dashboard
+        Contracts: 3, Signed: 2000.00, Unsigned: 500.00, Due: 700.00, Events: 12
+    """
+    totals = reports.dashboard()
+    typer.echo(
+        f"Contracts: {totals['contracts']}, Signed: {totals['signed_amount']:.2f}, "
+        f"Unsigned: {totals['unsigned_amount']:.2f}, Due: {totals['due_amount']:.2f}, "
+        f"Events: {totals['events']}"
+    )
+
+
+@app.command("summaries")
+def summaries(drop: bool = typer.Option(False, help="Drop the summary tables.")):
+    """
+    Enable the summary tables of the reports (SQLite only), or compute them again.
+    They are kept up to date on every change of the contracts and events, so that
+    the reports do not scan them.
+
+    Example:
+        $ python -m epic report summaries
+        Summary tables enabled.
+    """
+    database = Contract._meta.database
+    if drop:
+        reports.drop_summaries(database)
+        typer.echo("Summary tables dropped.")
+        return
+    try:
+        reports.create_summaries(database)
+    except RuntimeError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+    typer.echo("Summary tables enabled.")
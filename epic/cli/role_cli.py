@@ -1,15 +1,33 @@
-from epic.models.models import Role
+from epic.models.models import Role, invalidate_sessions
 import typer
+from typing import Optional
 from peewee import DoesNotExist
 from epic.cli.auth_cli import check_auth
-from epic.utils import get_input
+from epic.utils import (
+    get_input,
+    validate_records,
+    apply_batch,
+    insert_batch,
+    report_batch,
+    paginate,
+    echo_next_page,
+    LIMIT_HELP,
+    AFTER_HELP,
+)
 
 
 app = typer.Typer(callback=check_auth)
 
+SORT_FIELDS = {"id": Role.id, "name": Role.name}
+
+FILE_HELP = "NDJSON or CSV file of records ('-' reads the standard input)."
+
 
 @app.command("create")
-def create_role():
+def create_role(
+    name: Optional[str] = typer.Option(None, help="Name of the role."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Creates a new role.
 
     This function prompts the user to enter the name of the role to create, and then creates a new role with the provided name.
@@ -27,10 +45,17 @@ def create_role():
         To create a new role with the name "manager", you can run the following command:
         $ python -m epic user create-role
         Enter role name: manager
-        Role manager created successfully."""
+        Role manager created successfully.
+
+        Many roles can be created from a file with a name field:
+        $ python -m epic role create --file roles.csv"""
     # function_name = inspect.currentframe().f_code.co_name
     # if user_info["role"] in method_allowed[filename + "." + function_name]:
-    name = get_input("Enter name", str)
+    if file is not None:
+        rows, errors = validate_records(file, {"name": str})
+        count, insert_errors = insert_batch(Role, rows)
+        return report_batch("created", count, errors + insert_errors)
+    name = get_input("Enter name", str, value=name)
     role = Role.create(name=name)
     typer.echo(f"Role {role.name} created successfully.")
     # else:
@@ -38,7 +63,11 @@ def create_role():
 
 
 @app.command("list")
-def list_roles():
+def list_roles(
+    limit: Optional[int] = typer.Option(None, min=1, help=LIMIT_HELP),
+    after: Optional[str] = typer.Option(None, help=AFTER_HELP),
+    sort: str = typer.Option("id", help=f"Sort field: {', '.join(SORT_FIELDS)}."),
+):
     """Get a list of all roles in the system.
 
     Args:
@@ -56,13 +85,17 @@ def list_roles():
         Role ID: 1, Name: admin
         Role ID: 2, Name: support
         ..."""
-    roles = Role.select()
+    roles = paginate(Role.select(), SORT_FIELDS, sort, limit, after)
     for role in roles:
         typer.echo(f"Role ID: {role.id}, Name: {role.name}")
+    echo_next_page(roles)
 
 
 @app.command("delete")
-def delete_role():
+def delete_role(
+    role_id: Optional[int] = typer.Option(None, "--id", help="ID of the role."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Deletes a role from the system.
 
     Args:
@@ -77,16 +110,41 @@ def delete_role():
     Example:
         To delete a role with the ID of 1, you can run the following command:
         $ python -m epic user delete-role 1
-        Role with ID 1 deleted successfully."""
+        Role with ID 1 deleted successfully.
 
-    role_id = get_input("Enter role ID to delete role", int)
+        Many roles can be deleted from a file with an id field:
+        $ python -m epic role delete --file roles.csv"""
+
+    if file is not None:
+        return delete_roles_batch(file)
+    role_id = get_input("Enter role ID to delete role", int, value=role_id)
     try:
         role = Role.get(Role.id == role_id)
         role.delete_instance()
+        invalidate_sessions()
         typer.echo("Role deleted successfully.")
     except DoesNotExist:
         typer.echo(f"Role with ID {role_id} does not exist.")
 
 
+def delete_roles_batch(file: str):
+    """Delete the roles of a batch file"""
+    rows, errors = validate_records(file, {"id": int})
+    count, delete_errors = delete_roles(rows)
+    report_batch("deleted", count, errors + delete_errors)
+
+
+def delete_roles(rows: list):
+    """Delete roles given by id"""
+
+    def delete_row(record):
+        if Role.delete().where(Role.id == record["id"]).execute() == 0:
+            raise ValueError(f"Role with ID {record['id']} does not exist.")
+
+    count, delete_errors = apply_batch(Role, rows, delete_row)
+    invalidate_sessions()
+    return count, delete_errors
+
+
 if __name__ == "__main__":
     pass
@@ -0,0 +1,34 @@
+import typer
+
+
+app = typer.Typer()
+
+
+@app.callback(invoke_without_command=True)
+def search(
+    query: str = typer.Argument(..., help="Words to search."),
+    limit: int = typer.Option(20, min=1, help="Maximum number of results."),
+):
+    """
+    Search the clients (name, email, company), contracts (name) and events (name,
+    location, notes) you can read. Every word must match the start of a word, the
+    most relevant results are listed first.
+
+    Example:
+        $ python -m epic search "acme paris"
+        Client ID: 12, Name: ACME
+        Event ID: 340, Name: ACME launch party
+    """
+    from epic.cli.auth_cli import get_user_auth
+    from epic.search import search as search_documents
+
+    user_auth = get_user_auth()
+    try:
+        results = search_documents(query, user_auth, limit)
+    except RuntimeError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+    if not results:
+        typer.echo(f"No results for '{query}'.")
+    for kind, row_id, title in results:
+        typer.echo(f"{kind.capitalize()} ID: {row_id}, Name: {title}")
@@ -0,0 +1,30 @@
+import asyncio
+import typer
+
+
+app = typer.Typer()
+
+
+@app.callback(invoke_without_command=True)
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Address to listen on."),
+    port: int = typer.Option(8000, help="Port to listen on."),
+    workers: int = typer.Option(8, min=1, help="Threads running the queries."),
+):
+    """
+    Serve the CRM as a JSON API (see epic/api.py for the routes). The requests are
+    authenticated with the token of `epic auth login` as a bearer token.
+
+    Example:
+        epic serve --port 8000
+        curl -H "Authorization: Bearer $(cat jwt_token.txt)" localhost:8000/clients
+    """
+    from epic.api import serve as serve_api
+
+    def ready(server):
+        typer.echo(f"Serving the API on http://{host}:{port}")
+
+    try:
+        asyncio.run(serve_api(host, port, workers, ready))
+    except KeyboardInterrupt:
+        pass
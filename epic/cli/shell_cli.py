@@ -0,0 +1,212 @@
+import os
+import shlex
+import time
+import click
+import typer
+from epic.models.models import (
+    Client,
+    Contract,
+    Event,
+    Role,
+    User,
+    db,
+    _sessions_invalidated_after,
+)
+from epic.cli import auth_cli
+from epic import profiling
+
+
+app = typer.Typer()
+
+HISTORY_FILE = os.path.expanduser("~/.epic_history")
+
+# The session is authenticated again after this delay, to notice an expired token
+SESSION_REFRESH = 60
+
+# entity of the first word of a command -> model completed after --id
+ENTITIES = {
+    "client": Client,
+    "contract": Contract,
+    "event": Event,
+    "user": User,
+    "role": Role,
+}
+
+
+class ShellSession:
+    """
+    Authenticated user of the shell, kept in memory with its permissions. It is
+    read again from the token when the token file changes (login, logout), when
+    the sessions are invalidated or after SESSION_REFRESH seconds.
+    """
+
+    def __init__(self):
+        self.user = None
+        self.loaded_at = 0.0
+        self.token_mtime = None
+
+    def _token_mtime(self):
+        try:
+            return os.path.getmtime(auth_cli.SESSION_FILE)
+        except FileNotFoundError:
+            return None
+
+    def __call__(self):
+        token_mtime = self._token_mtime()
+        if (
+            self.user is None
+            or token_mtime != self.token_mtime
+            or time.time() - self.loaded_at > SESSION_REFRESH
+            or _sessions_invalidated_after(self.loaded_at)
+        ):
+            self.user = User.is_auth()
+            self.loaded_at = time.time()
+            self.token_mtime = token_mtime
+        return self.user
+
+
+def run_line(group: click.Group, line: str) -> int:
+    """
+    Run a command line of the shell with the commands of the application.
+
+    Returns:
+        int: The exit code of the command.
+    """
+    try:
+        args = shlex.split(line)
+    except ValueError as e:
+        typer.echo(f"Invalid command: {e}")
+        return 2
+    if not args:
+        return 0
+    if args[0] == "shell":
+        typer.echo("Already in the shell.")
+        return 2
+    try:
+        if profiling.ENABLED:
+            # the peak memory would be the one of the shell since it started
+            with profiling.CommandProfiler(profiling.command_name(args), memory=False):
+                result = group.main(args, prog_name="epic", standalone_mode=False)
+        else:
+            result = group.main(args, prog_name="epic", standalone_mode=False)
+        return result if isinstance(result, int) else 0
+    except click.exceptions.Abort:
+        typer.echo("Aborted!")
+        return 1
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        from epic import telemetry
+
+        telemetry.capture_exception(e)
+        typer.echo(f"Error: {e}")
+        return 1
+
+
+class Completer:
+    """Complete the command names, their options and the IDs given after --id"""
+
+    def __init__(self, group: click.Group):
+        self.group = group
+        self.matches = []
+
+    def candidates(self, words: list, text: str):
+        ctx = click.Context(self.group)
+        if len(words) <= 1:
+            return [name for name in self.group.list_commands(ctx) if name.startswith(text)]
+        if words[-2] == "--id" and words[0] in ENTITIES:
+            model = ENTITIES[words[0]]
+            query = (
+                model.select(model.id)
+                .where(model.id.cast("TEXT").startswith(text))
+                .order_by(model.id)
+                .limit(50)
+            )
+            return [str(model_id) for (model_id,) in query.tuples()]
+        command = self.group.get_command(ctx, words[0])
+        if len(words) == 2 and isinstance(command, click.Group):
+            return [name for name in command.list_commands(ctx) if name.startswith(text)]
+        if isinstance(command, click.Group):
+            command = command.get_command(ctx, words[1])
+        if command is None:
+            return []
+        options = [name for param in command.params for name in param.opts]
+        return [name for name in options if name.startswith(text)]
+
+    def complete(self, text: str, state: int):
+        if state == 0:
+            import readline
+
+            line = readline.get_line_buffer()[: readline.get_endidx()]
+            words = line.split()
+            if not line or line[-1].isspace():
+                words.append("")
+            try:
+                self.matches = self.candidates(words, text)
+            except Exception:
+                self.matches = []
+        return self.matches[state] if state < len(self.matches) else None
+
+
+def setup_readline(group: click.Group):
+    """Enable the command history and the tab completion, when readline exists"""
+    try:
+        import readline
+    except ImportError:
+        return None
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+    readline.set_completer(Completer(group).complete)
+    readline.set_completer_delims(" \t")
+    readline.parse_and_bind("tab: complete")
+    return readline
+
+
+@app.callback(invoke_without_command=True)
+def shell():
+    """
+    Interactive shell running the commands of the application. The modules, the
+    database connection and the authenticated session are kept between commands.
+
+    Example:
+        epic shell
+        epic> client list --limit 10
+        epic> event update --id 12 --support-contact-id 5
+        epic> exit
+    """
+    from epic.main import app as main_app
+
+    group = typer.main.get_command(main_app)
+    db.connect(reuse_if_open=True)
+    auth_cli.session_provider = ShellSession()
+    readline = setup_readline(group)
+    typer.echo("Epic Events shell. Type 'help' for the commands, 'exit' to quit.")
+    try:
+        while True:
+            try:
+                line = input("epic> ")
+            except EOFError:
+                typer.echo()
+                break
+            except KeyboardInterrupt:
+                typer.echo()
+                continue
+            if line.strip() in ["exit", "quit"]:
+                break
+            if line.strip() == "help":
+                line = "--help"
+            run_line(group, line)
+    finally:
+        auth_cli.session_provider = None
+        if readline is not None:
+            try:
+                readline.write_history_file(HISTORY_FILE)
+            except OSError:
+                pass
+        if not db.is_closed():
+            db.close()
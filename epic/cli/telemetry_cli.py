@@ -0,0 +1,50 @@
+import typer
+from epic import telemetry
+
+
+app = typer.Typer()
+
+
+@app.command("flush")
+def flush(
+    timeout: float = typer.Option(2.0, help="Network timeout in seconds."),
+):
+    """
+    Sends the spooled telemetry events to sentry.
+
+    Args:
+        timeout (float): The network timeout in seconds.
+
+    Returns:
+        None
+
+    Example:
+        To send the spooled events, you can run the following command:
+        $ python -m epic telemetry flush
+        3 telemetry events sent.
+    """
+    try:
+        sent = telemetry.flush(timeout=timeout)
+        typer.echo(f"{sent} telemetry events sent.")
+    except ConnectionError as e:
+        typer.echo(str(e))
+
+
+@app.command("status")
+def status():
+    """
+    Displays the number of spooled telemetry events.
+
+    Returns:
+        None
+
+    Example:
+        $ python -m epic telemetry status
+        3 telemetry events pending.
+    """
+    events = telemetry.pending_events()
+    typer.echo(f"{len(events)} telemetry events pending.")
+
+
+if __name__ == "__main__":
+    app()
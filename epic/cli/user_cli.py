@@ -1,12 +1,33 @@
-from epic.models.models import User, Role
+from epic.models.models import User, Role, invalidate_sessions, hash_passwords
 import typer
+from typing import Optional
 from peewee import DoesNotExist
 from epic.cli.auth_cli import check_auth
-from epic.utils import get_input, display_list
-import sentry_sdk
+from epic.utils import (
+    get_input,
+    display_list,
+    validate_records,
+    apply_batch,
+    insert_batch,
+    save_changes,
+    report_batch,
+    paginate,
+    echo_next_page,
+    LIMIT_HELP,
+    AFTER_HELP,
+)
+from epic import telemetry
 
 app = typer.Typer(callback=check_auth)
 
+UPDATE_FIELDS = {"id": int, "name": str, "email": "email", "role_name": "role_name"}
+
+SORT_FIELDS = {"id": User.id, "name": User.name, "email": User.email}
+
+USER_FIELDS = {"name": str, "email": "email", "password": str, "role_name": "role_name"}
+
+FILE_HELP = "NDJSON or CSV file of records ('-' reads the standard input)."
+
 
 method_allowed = {
     "user_cli.create_user": ["admin", "super_admin"],
@@ -37,7 +58,13 @@ method_allowed = {
 
 
 @app.command("create")
-def create_user():
+def create_user(
+    name: Optional[str] = typer.Option(None, help="Name of the user."),
+    email: Optional[str] = typer.Option(None, help="Email of the user."),
+    password: Optional[str] = typer.Option(None, help="Password of the user."),
+    role_name: Optional[str] = typer.Option(None, help="Role of the user."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Create a new user
 
     This function prompts the user to enter their name, email, password, and role name, and then creates a new user with the provided information.
@@ -58,23 +85,34 @@ def create_user():
         Enter email: <EMAIL>
         Enter password: password
         Enter role name: admin
-        User John Doe created successfully."""
-    name = get_input("Enter name", str)
-    email = get_input("Enter email", "email")
-    password = get_input("Enter password", str, hide_input=True)
-    role_name = get_input("Enter role name", "role_name")
+        User John Doe created successfully.
+
+        The fields can be given as options, and many users can be created from a file
+        with the fields name, email, password and role_name:
+        $ python -m epic user create --file users.csv
+        2 records created, 0 errors."""
+    if file is not None:
+        return create_users_batch(file)
+    name = get_input("Enter name", str, value=name)
+    email = get_input("Enter email", "email", value=email)
+    password = get_input("Enter password", str, value=password, hide_input=True)
+    role_name = get_input("Enter role name", "role_name", value=role_name)
     try:
         role = Role.get(Role.name == role_name)
 
         user = User.create(name=name, email=email, password=password, role=role)
         typer.echo(f"User {user.name} created successfully.")
-        sentry_sdk.capture_message(f"User {user.name} created successfully.")
+        telemetry.capture_message(f"User {user.name} created successfully.")
     except DoesNotExist:
         typer.echo(f"Role '{role_name}' does not exist.")
 
 
 @app.command("list")
-def list_users():
+def list_users(
+    limit: Optional[int] = typer.Option(None, min=1, help=LIMIT_HELP),
+    after: Optional[str] = typer.Option(None, help=AFTER_HELP),
+    sort: str = typer.Option("id", help=f"Sort field: {', '.join(SORT_FIELDS)}."),
+):
     """Get a list of all users in the system
 
     Args:
@@ -91,17 +129,26 @@ def list_users():
     $ python -m epic user list
     User ID: 1, Name: John Doe, Email: <EMAIL>, Role: admin
     User ID: 2, Name: Jane Doe, Email: <EMAIL>, Role: user
-    ..."""
-    users = User.select()
+    ...
+
+    Pages are given with --limit, the next one with the --after cursor displayed at
+    the end of a page:
+    $ python -m epic user list --sort email --limit 20
+    """
+    users = paginate(User.select(User, Role).join(Role), SORT_FIELDS, sort, limit, after)
     users_data = [
         {"ID": user.id, "Name": user.name, "Email": user.email, "Role": user.role.name}
         for user in users
     ]
     display_list("Users", users_data)
+    echo_next_page(users)
 
 
 @app.command("delete")
-def delete_user():
+def delete_user(
+    user_id: Optional[int] = typer.Option(None, "--id", help="ID of the user."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Deletes a user from the system.
 
     Args:
@@ -117,19 +164,31 @@ def delete_user():
         To delete a user with the ID of 1, you can run the following command:
         $ python -m epic user delete
         1
-        User John Doe deleted successfully."""
+        User John Doe deleted successfully.
+
+        Many users can be deleted from a file with an id field:
+        $ python -m epic user delete --file users.csv"""
 
-    user_id = get_input("Enter user ID to delete", int)
+    if file is not None:
+        return delete_users_batch(file)
+    user_id = get_input("Enter user ID to delete", int, value=user_id)
     try:
         user = User.get(User.id == user_id)
         user.delete_instance()
+        invalidate_sessions()
         typer.echo(f"User {user.name} deleted successfully.")
     except DoesNotExist:
         typer.echo(f"User with ID '{user_id}' does not exist.")
 
 
 @app.command("update")
-def update_user():
+def update_user(
+    user_id: Optional[int] = typer.Option(None, "--id", help="ID of the user."),
+    name: Optional[str] = typer.Option(None, help="New name of the user."),
+    email: Optional[str] = typer.Option(None, help="New email of the user."),
+    role_name: Optional[str] = typer.Option(None, help="New role of the user."),
+    file: Optional[str] = typer.Option(None, help=FILE_HELP),
+):
     """Updates an existing user.
 
     This function prompts the user to enter the ID of the user to update, their new name, email, password, and role name, and then updates the user with the provided information.
@@ -155,9 +214,17 @@ def update_user():
         password
         Enter new role name or press 'Enter':
         admin
-        User John Doe updated successfully."""
+        User John Doe updated successfully.
 
-    user_id = get_input("Enter user ID to update", int)
+        When the ID is given as an option, the fields which are not given keep their
+        value. Many users can be updated from a file with an id field:
+        $ python -m epic user update --id 1 --role-name sales
+        $ python -m epic user update --file users.csv"""
+
+    if file is not None:
+        return update_users_batch(file)
+    interactive = user_id is None
+    user_id = get_input("Enter user ID to update", int, value=user_id)
     try:
         user = User.get(User.id == user_id)
         typer.echo(
@@ -165,23 +232,41 @@ def update_user():
         )
     except DoesNotExist:
         typer.echo(f"User with ID {user_id} does not exist.")
-    name = get_input("Enter new name or press 'Enter'", str, default=user.name)
-    email = get_input("Enter email", "email", default=user.email)
-    role_name = get_input("Enter role name", "role_name", default=user.role.name)
+        return None
+    name = get_input(
+        "Enter new name or press 'Enter'",
+        str,
+        value=name,
+        interactive=interactive,
+        default=user.name,
+    )
+    email = get_input(
+        "Enter email", "email", value=email, interactive=interactive, default=user.email
+    )
+    role_name = get_input(
+        "Enter role name",
+        "role_name",
+        value=role_name,
+        interactive=interactive,
+        default=user.role.name,
+    )
     try:
         role = Role.get(Role.name == role_name)
-        user.name = name
-        user.email = email
-        user.role = role
-        user.save()
+        if not save_changes(user, {"name": name, "email": email, "role": role}):
+            typer.echo(f"User {user.name} is unchanged.")
+            return None
+        invalidate_sessions()
         typer.echo(f"User {user.name} updated successfully.")
-        sentry_sdk.capture_message(f"User {user.name} updated successfully.")
+        telemetry.capture_message(f"User {user.name} updated successfully.")
     except DoesNotExist:
         typer.echo(f"Role '{role_name}' does not exist.")
 
 
 @app.command("password")
-def update_password():
+def update_password(
+    user_id: Optional[int] = typer.Option(None, "--id", help="ID of the user."),
+    password: Optional[str] = typer.Option(None, help="New password."),
+):
     """Updates the password of a user.
 
     Args:
@@ -202,12 +287,14 @@ def update_password():
         Password for user John Doe updated successfully."""
     from epic.cli.auth_cli import user_auth
 
-    user_id = get_input("Enter user ID to update password", int)
+    user_id = get_input("Enter user ID to update password", int, value=user_id)
     if user_id == int(user_auth.id) or user_auth.role.name in [
         "admin",
         "super_admin",
     ]:
-        new_password = get_input("Enter new password", str, hide_input=True)
+        new_password = get_input(
+            "Enter new password", str, value=password, hide_input=True
+        )
         try:
             user = User.get(User.id == user_id)
             user.password = new_password
@@ -220,5 +307,91 @@ def update_password():
         typer.echo("You do not have permission to update this user password.")
 
 
+def get_roles(names) -> dict:
+    """Return the ids of the roles by name"""
+    query = Role.select(Role.name, Role.id).where(Role.name.in_(list(names)))
+    return dict(query.tuples())
+
+
+def create_users_batch(file: str):
+    """Create the users of a batch file"""
+    rows, errors = validate_records(file, USER_FIELDS)
+    count, create_errors = create_users(rows)
+    report_batch("created", count, errors + create_errors)
+
+
+def create_users(rows: list):
+    """
+    Create validated users.
+
+    Returns:
+        tuple: The number of created users and the list of (row number, error).
+    """
+    errors = []
+    roles = get_roles({record["role_name"] for _, record in rows})
+    valid_rows = []
+    for number, record in rows:
+        role_name = record.pop("role_name")
+        if role_name not in roles:
+            errors.append((number, f"Role '{role_name}' does not exist."))
+            continue
+        record["role"] = roles[role_name]
+        valid_rows.append((number, record))
+    hashes = hash_passwords([record["password"] for _, record in valid_rows])
+    for (_, record), password_hash in zip(valid_rows, hashes):
+        record["password"] = password_hash
+    count, insert_errors = insert_batch(User, valid_rows)
+    return count, errors + insert_errors
+
+
+def update_users_batch(file: str):
+    """Update the users of a batch file, only the given fields are changed"""
+    rows, errors = validate_records(file, UPDATE_FIELDS, required=["id"])
+    count, update_errors = update_users(rows)
+    report_batch("updated", count, errors + update_errors)
+
+
+def update_users(rows: list):
+    """Update validated users, only the given fields are changed"""
+    roles = get_roles({record["role_name"] for _, record in rows if "role_name" in record})
+
+    def update_row(record):
+        user_id = record.pop("id")
+        if "role_name" in record:
+            role_name = record.pop("role_name")
+            if role_name not in roles:
+                raise ValueError(f"Role '{role_name}' does not exist.")
+            record["role"] = roles[role_name]
+        if not record:
+            if not User.select().where(User.id == user_id).exists():
+                raise ValueError(f"User with ID {user_id} does not exist.")
+            return
+        if User.update(record).where(User.id == user_id).execute() == 0:
+            raise ValueError(f"User with ID {user_id} does not exist.")
+
+    count, update_errors = apply_batch(User, rows, update_row)
+    invalidate_sessions()
+    return count, update_errors
+
+
+def delete_users_batch(file: str):
+    """Delete the users of a batch file"""
+    rows, errors = validate_records(file, {"id": int})
+    count, delete_errors = delete_users(rows)
+    report_batch("deleted", count, errors + delete_errors)
+
+
+def delete_users(rows: list):
+    """Delete users given by id"""
+
+    def delete_row(record):
+        if User.delete().where(User.id == record["id"]).execute() == 0:
+            raise ValueError(f"User with ID {record['id']} does not exist.")
+
+    count, delete_errors = apply_batch(User, rows, delete_row)
+    invalidate_sessions()
+    return count, delete_errors
+
+
 if __name__ == "__main__":
     pass
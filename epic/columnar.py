@@ -0,0 +1,94 @@
+"""
+Minimal columnar file format for the exports.
+
+The file starts with a header listing the columns, followed by row groups. Each row
+group stores its columns one after the other, each column being a zlib-compressed
+JSON array, so that a reader can decode only the columns it needs. A row group with
+no rows marks the end of the file.
+
+Layout (lengths are unsigned 32-bit big-endian integers):
+    MAGIC, header length, header (JSON)
+    for each row group: row count, then for each column: block length, block
+    row count 0
+"""
+import json
+import struct
+import zlib
+
+MAGIC = b"EPICCOL1"
+
+_LENGTH = struct.Struct(">I")
+
+
+def _write_block(stream, data: bytes):
+    stream.write(_LENGTH.pack(len(data)))
+    stream.write(data)
+
+
+def _read_block(stream) -> bytes:
+    (length,) = _LENGTH.unpack(stream.read(_LENGTH.size))
+    return stream.read(length)
+
+
+def write_columnar(stream, columns: list, rows, row_group_size: int = 10000):
+    """
+    Write rows to a binary stream, holding at most one row group in memory.
+
+    Args:
+        stream: The binary stream.
+        columns (list): The names of the columns.
+        rows: Iterable of tuples ordered like the columns.
+        row_group_size (int): The number of rows per row group.
+
+    Returns:
+        int: The number of rows written.
+    """
+    stream.write(MAGIC)
+    _write_block(stream, json.dumps({"columns": columns}).encode())
+    count = 0
+    group = []
+    for row in rows:
+        group.append(row)
+        if len(group) == row_group_size:
+            count += _write_row_group(stream, group)
+            group = []
+    if group:
+        count += _write_row_group(stream, group)
+    stream.write(_LENGTH.pack(0))
+    return count
+
+
+def _write_row_group(stream, group: list):
+    stream.write(_LENGTH.pack(len(group)))
+    for values in zip(*group):
+        data = json.dumps(values, default=str, separators=(",", ":")).encode()
+        _write_block(stream, zlib.compress(data))
+    return len(group)
+
+
+def read_columnar(stream, columns: list = None):
+    """
+    Read the rows of a columnar file as dicts.
+
+    Args:
+        stream: The binary stream.
+        columns (list): The columns to decode, all of them by default.
+
+    Raises:
+        ValueError: If the stream is not a columnar file.
+    """
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a columnar file.")
+    names = json.loads(_read_block(stream))["columns"]
+    selected = names if columns is None else columns
+    while True:
+        (count,) = _LENGTH.unpack(stream.read(_LENGTH.size))
+        if not count:
+            return
+        group = {}
+        for name in names:
+            block = _read_block(stream)
+            if name in selected:
+                group[name] = json.loads(zlib.decompress(block))
+        for index in range(count):
+            yield {name: group[name][index] for name in selected}
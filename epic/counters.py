@@ -0,0 +1,226 @@
+"""
+Materialized counters: the clients of each sales contact, the open contracts (due
+amount left) of each client and the upcoming events of each support contact.
+
+On SQLite the counters are kept in UserCounter and ClientCounter by triggers, in the
+transaction of the write, whatever the write path (save, insert_many, bulk update,
+delete). The events of a support contact are counted when they end on or after
+CounterState.events_since, the day of the last recount: run `epic maintenance
+recount` daily to move it to the current day. On PostgreSQL, or before the tables
+are created by `epic init upgrade`, the counts are computed by GROUP BY queries,
+the events from the current day.
+"""
+from datetime import date
+
+from peewee import JOIN, chunked, fn
+
+from epic.models.models import (
+    Client,
+    ClientCounter,
+    Contract,
+    CounterState,
+    Event,
+    UserCounter,
+)
+from epic.reports import table_triggers
+from epic.search import is_postgresql
+
+COUNTER_MODELS = [UserCounter, ClientCounter, CounterState]
+
+# counter -> (counter field, counted foreign key, condition of the counted rows)
+COUNTERS = {
+    "clients": (UserCounter.clients, Client.sales_contact, lambda since: True),
+    "open_contracts": (
+        ClientCounter.open_contracts,
+        Contract.client,
+        lambda since: Contract.due_amount > 0,
+    ),
+    "upcoming_events": (
+        UserCounter.upcoming_events,
+        Event.support_contact,
+        lambda since: Event.support_contact.is_null(False) & (Event.date_end >= since),
+    ),
+}
+
+# counter -> (columns updating it, SQL condition of a counted row)
+TRIGGER_CONDITIONS = {
+    "clients": ("sales_contact_id", "1"),
+    "open_contracts": ("client_id, due_amount", "{row}.due_amount > 0"),
+    "upcoming_events": (
+        "support_contact_id, date_end",
+        "{row}.support_contact_id IS NOT NULL AND {row}.date_end >= "
+        "(SELECT events_since FROM counterstate)",
+    ),
+}
+
+
+def counter_triggers() -> list:
+    """Return the statements creating the triggers maintaining the counters"""
+    statements = []
+    for name, (counter, foreign_key, _) in COUNTERS.items():
+        columns, condition = TRIGGER_CONDITIONS[name]
+        table = counter.model._meta.table_name
+        key = counter.model._meta.primary_key.column_name
+
+        def change(row, sign):
+            return (
+                f"INSERT INTO {table} ({key}, {name}) "
+                f"SELECT {row}.{foreign_key.column_name}, {sign}1 "
+                f"WHERE {condition.format(row=row)} "
+                f"ON CONFLICT ({key}) DO UPDATE SET {name} = {name} + excluded.{name};"
+            )
+
+        statements += table_triggers(
+            foreign_key.model._meta.table_name, columns, change, name=f"{name}_counter"
+        )
+    return statements
+
+
+def create_counters(database):
+    """
+    Create the counter tables and their triggers if they do not exist (SQLite
+    only). The counters of the existing rows are computed when the tables are
+    created.
+    """
+    if is_postgresql(database):
+        return
+    with database.bind_ctx(COUNTER_MODELS):
+        created = not UserCounter.table_exists()
+        with database.atomic():
+            database.create_tables(COUNTER_MODELS, safe=True)
+            for statement in counter_triggers():
+                database.execute_sql(statement)
+            if created:
+                recount(database)
+
+
+def count_query(name: str, since: date):
+    """Return the query of the (ID, count) of the rows counted by a counter"""
+    _, foreign_key, condition = COUNTERS[name]
+    return (
+        foreign_key.model.select(foreign_key, fn.COUNT(foreign_key.model.id))
+        .where(condition(since))
+        .group_by(foreign_key)
+    )
+
+
+def recount(database, since: date = None, batch_size: int = 500):
+    """
+    Compute again every counter from the clients, contracts and events.
+
+    Args:
+        since (date): The first day of the upcoming events, the current day by
+            default.
+
+    Raises:
+        RuntimeError: If the counter tables do not exist, see check_enabled.
+    """
+    check_enabled(database)
+    since = since or date.today()
+    rows = {UserCounter: {}, ClientCounter: {}}
+    with database.bind_ctx(COUNTER_MODELS):
+        with database.atomic():
+            for name, (counter, _, _) in COUNTERS.items():
+                key = counter.model._meta.primary_key.name
+                for row_id, count in count_query(name, since).tuples():
+                    rows[counter.model].setdefault(row_id, {key: row_id})[name] = count
+            CounterState.delete().execute()
+            CounterState.create(events_since=since)
+            for model, model_rows in rows.items():
+                model.delete().execute()
+                for chunk in chunked(model_rows.values(), batch_size):
+                    model.insert_many(chunk).execute()
+
+
+def check_counters(database) -> list:
+    """
+    Compare the counters with the clients, contracts and events.
+
+    Returns:
+        list: The (counter, ID, stored count, actual count) of the wrong counters.
+
+    Raises:
+        RuntimeError: If the counter tables do not exist, see check_enabled.
+    """
+    check_enabled(database)
+    with database.bind_ctx(COUNTER_MODELS):
+        since = CounterState.select(CounterState.events_since).scalar()
+        errors = []
+        for name, (counter, _, _) in COUNTERS.items():
+            key = counter.model._meta.primary_key
+            stored = dict(
+                counter.model.select(key, counter).where(counter != 0).tuples()
+            )
+            actual = dict(count_query(name, since).tuples())
+            for row_id in sorted(stored.keys() | actual.keys()):
+                if stored.get(row_id, 0) != actual.get(row_id, 0):
+                    errors.append(
+                        (name, row_id, stored.get(row_id, 0), actual.get(row_id, 0))
+                    )
+    return errors
+
+
+def counters_enabled(database) -> bool:
+    """Return True if the counter tables exist"""
+    if is_postgresql(database):
+        return False
+    with database.bind_ctx(COUNTER_MODELS):
+        return UserCounter.table_exists()
+
+
+def check_enabled(database):
+    """
+    Check that the counter tables can be used.
+
+    Raises:
+        RuntimeError: If the database is a PostgreSQL database, or if the counter
+            tables were not created by `epic init upgrade`.
+    """
+    if is_postgresql(database):
+        raise RuntimeError("The counters are only supported on SQLite.")
+    if not counters_enabled(database):
+        raise RuntimeError("The counters are not enabled, run `epic init upgrade`.")
+
+
+def get_counts(name: str, row_ids: list) -> dict:
+    """
+    Return the value of a counter for the rows, by ID.
+
+    Args:
+        name (str): clients or upcoming_events (by user ID), open_contracts (by
+            client ID).
+        row_ids (list): The IDs of the rows.
+    """
+    counter, foreign_key, _ = COUNTERS[name]
+    database = foreign_key.model._meta.database
+    if not counters_enabled(database):
+        query = count_query(name, date.today()).where(foreign_key.in_(row_ids))
+        return dict(query.tuples())
+    key = counter.model._meta.primary_key
+    with database.bind_ctx(COUNTER_MODELS):
+        query = counter.model.select(key, counter).where(key.in_(row_ids))
+        return dict(query.tuples())
+
+
+def get_count(name: str, row_id: int) -> int:
+    """Return the value of a counter for a row, see get_counts"""
+    return get_counts(name, [row_id]).get(row_id, 0)
+
+
+def get_upcoming_events(user_id: int):
+    """
+    Return the number of events of a support contact ending on or after a day, and
+    the day: the day of the last recount when the counters exist, else today.
+    """
+    database = Event._meta.database
+    if not counters_enabled(database):
+        since = date.today()
+        return get_counts("upcoming_events", [user_id]).get(user_id, 0), since
+    with database.bind_ctx(COUNTER_MODELS):
+        since, count = (
+            CounterState.select(CounterState.events_since, UserCounter.upcoming_events)
+            .join(UserCounter, JOIN.LEFT_OUTER, on=(UserCounter.user_id == user_id))
+            .tuples()
+            .get()
+        )
+    return count or 0, since
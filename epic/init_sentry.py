@@ -1,8 +1,15 @@
 import sentry_sdk
 from sentry_sdk.integrations.argv import ArgvIntegration
 
-sentry_sdk.init(
-    "https://09a98f0d850dee8f63c4f96cca2d32d1@o4506476129681408.ingest.sentry.io/4506476133351424",
-    integrations=[ArgvIntegration()],
-    enable_tracing=True,
-)
+
+def init_sentry(dsn: str):
+    """
+    Initialize the sentry sdk. Only called when the spooled telemetry is flushed, so
+    the commands never wait for the network.
+    """
+    sentry_sdk.init(
+        dsn,
+        integrations=[ArgvIntegration()],
+        shutdown_timeout=0,
+    )
+    return sentry_sdk
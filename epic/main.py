@@ -1,40 +1,132 @@
-from epic.cli.user_cli import app as user_app
-from epic.cli.event_cli import app as event_app
-from epic.cli.contract_cli import app as contract_app
-from epic.cli.client_cli import app as client_app
-from epic.cli.auth_cli import app as auth_app
-from epic.cli.initialize_cli import app as init_app
-from epic.cli.role_cli import app as role_app
+import builtins
+import importlib
+import sys
+import time
 import typer
-import logging
-from epic.init_sentry import sentry_sdk
+from typer.core import TyperGroup
+from epic import profiling
 
 
-def main_function():
+# name of the sub-command -> module defining its Typer app
+COMMANDS = {
+    "init": "epic.cli.initialize_cli",
+    "user": "epic.cli.user_cli",
+    "event": "epic.cli.event_cli",
+    "contract": "epic.cli.contract_cli",
+    "client": "epic.cli.client_cli",
+    "auth": "epic.cli.auth_cli",
+    "role": "epic.cli.role_cli",
+    "telemetry": "epic.cli.telemetry_cli",
+    "import": "epic.cli.import_cli",
+    "export": "epic.cli.export_cli",
+    "shell": "epic.cli.shell_cli",
+    "serve": "epic.cli.serve_cli",
+    "search": "epic.cli.search_cli",
+    "report": "epic.cli.report_cli",
+    "maintenance": "epic.cli.maintenance_cli",
+}
+
+
+class LazyGroup(TyperGroup):
     """
-    Main function to launch the application
+    Group importing the module of a sub-command only when it is invoked, so that a
+    command only pays for its own dependencies.
     """
-    try:
-        # result = 1 / 0
 
-        app = typer.Typer()
+    def list_commands(self, ctx):
+        return list(COMMANDS)
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in COMMANDS:
+            return None
+        module = importlib.import_module(COMMANDS[cmd_name])
+        command = typer.main.get_group(module.app)
+        command.name = cmd_name
+        return command
+
+
+class ImportProfiler:
+    """Measure the time spent importing each module (including its own imports)"""
+
+    def __init__(self):
+        self.timings = {}
+        self._import = builtins.__import__
+
+    def __enter__(self):
+        builtins.__import__ = self._timed_import
+        return self
+
+    def __exit__(self, *exc_info):
+        builtins.__import__ = self._import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        start = time.perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            self.timings.setdefault(name, time.perf_counter() - start)
 
-        app.add_typer(init_app, name="init")
-        app.add_typer(user_app, name="user")
-        app.add_typer(event_app, name="event")
-        app.add_typer(contract_app, name="contract")
-        app.add_typer(client_app, name="client")
-        app.add_typer(auth_app, name="auth")
-        app.add_typer(role_app, name="role")
+    def report(self, limit: int = 20):
+        """Print the slowest imports"""
+        typer.echo("\nImport time per module (ms):", err=True)
+        timings = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        for name, duration in timings[:limit]:
+            typer.echo(f"{duration * 1000:10.1f}  {name}", err=True)
 
-        app()
 
-        logger = logging.getLogger("peewee")
-        logger.addHandler(logging.StreamHandler())
-        logger.setLevel(logging.DEBUG)
+app = typer.Typer(cls=LazyGroup)
 
+
+@app.callback()
+def main(
+    startup_profile: bool = typer.Option(
+        False, "--startup-profile", help="Report the import time of each module."
+    ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Report the SQL queries, time and memory of the command (EPIC_PROFILE=1).",
+    ),
+    profile_file: str = typer.Option(
+        None,
+        "--profile-file",
+        help="Append the profile as a JSON line to this file (EPIC_PROFILE_FILE).",
+    ),
+):
+    """
+    Epic Events CRM
+    """
+
+
+def main_function():
+    """
+    Main function to launch the application
+    """
+    profiler = None
+    if "--startup-profile" in sys.argv:
+        profiler = ImportProfiler().__enter__()
+    profiling.configure(sys.argv[1:])
+    try:
+        if profiling.ENABLED:
+            with profiling.CommandProfiler(profiling.command_name(sys.argv[1:])):
+                app()
+        else:
+            app()
     except Exception as e:
-        sentry_sdk.capture_exception(e)
+        from epic import telemetry
+
+        telemetry.capture_exception(e)
+    finally:
+        if profiler is not None:
+            profiler.__exit__(None, None, None)
+            profiler.report()
+        if "epic.telemetry" in sys.modules:
+            from epic import telemetry
+
+            if telemetry.AUTO_FLUSH and telemetry.queue_size():
+                telemetry.flush_in_background()
 
 
 if __name__ == "__main__":
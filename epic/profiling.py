@@ -0,0 +1,166 @@
+"""
+Cost of a command: SQL queries and their time, Python time and peak memory.
+
+Profiling is enabled with the --profile option or EPIC_PROFILE=1. The report is
+printed on stderr, and appended as a JSON line to --profile-file or EPIC_PROFILE_FILE
+when given, to aggregate the profiles of many users.
+"""
+import json
+import os
+import sys
+import time
+
+import typer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ENABLED = os.environ.get("EPIC_PROFILE", "0") == "1"
+
+PROFILE_FILE = os.environ.get("EPIC_PROFILE_FILE")
+
+# number of statements listed in the report
+SLOWEST = 5
+
+
+def configure(argv: list):
+    """
+    Enable the profiling when --profile or --profile-file is given. They are options
+    of the main command: the arguments from the first sub-command on are ignored.
+    """
+    global ENABLED, PROFILE_FILE
+    index = 0
+    while index < len(argv) and argv[index].startswith("-"):
+        arg = argv[index]
+        if arg == "--profile":
+            ENABLED = True
+        elif arg == "--profile-file" and index + 1 < len(argv):
+            PROFILE_FILE = argv[index + 1]
+            index += 1
+        elif arg.startswith("--profile-file="):
+            PROFILE_FILE = arg.split("=", 1)[1]
+        index += 1
+    if PROFILE_FILE:
+        ENABLED = True
+
+
+def command_name(args: list) -> str:
+    """Return the command of the arguments without their options (event list)"""
+    words = []
+    skip = False
+    for arg in args:
+        if skip or arg.startswith("-"):
+            skip = arg == "--profile-file"
+            continue
+        words.append(arg)
+    return " ".join(words[:2])
+
+
+def peak_memory():
+    """Return the peak resident memory of the process in kB, None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class CommandProfiler:
+    """
+    Measure a command. The SQL statements are timed by wrapping
+    Database.execute_sql, which covers every database and connection pool; the time
+    of a statement is its execution up to the first row.
+    """
+
+    def __init__(self, command: str, memory: bool = True):
+        """
+        Args:
+            command (str): The name of the command.
+            memory (bool): Measure the peak memory. It is the peak of the process,
+                meaningless for a command run in a process running others before
+                (the shell).
+        """
+        import peewee
+
+        self.command = command
+        self.memory = memory
+        self.statements = []
+        self._database_class = peewee.Database
+        self._execute_sql = peewee.Database.execute_sql
+
+    def __enter__(self):
+        profiler = self
+        execute_sql = self._execute_sql
+
+        def timed_execute_sql(database, sql, params=None, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return execute_sql(database, sql, params, *args, **kwargs)
+            finally:
+                profiler.statements.append((time.perf_counter() - start, sql))
+
+        self._database_class.execute_sql = timed_execute_sql
+        self.start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wall_time = time.perf_counter() - self.start
+        self.cpu_time = time.process_time() - self.cpu_start
+        self._database_class.execute_sql = self._execute_sql
+        self.peak_memory = peak_memory() if self.memory else None
+        self.profile = self.as_dict()
+        self.report()
+        if PROFILE_FILE:
+            self.write(PROFILE_FILE)
+
+    @property
+    def db_time(self):
+        return sum(duration for duration, _ in self.statements)
+
+    def slowest(self):
+        """Return the slowest (duration, sql) statements"""
+        statements = sorted(self.statements, key=lambda statement: statement[0])
+        return statements[::-1][:SLOWEST]
+
+    def as_dict(self):
+        return {
+            "command": self.command,
+            "timestamp": time.time(),
+            "queries": len(self.statements),
+            "db_ms": round(self.db_time * 1000, 3),
+            "python_ms": round((self.wall_time - self.db_time) * 1000, 3),
+            "cpu_ms": round(self.cpu_time * 1000, 3),
+            "wall_ms": round(self.wall_time * 1000, 3),
+            "peak_memory_kb": self.peak_memory,
+            "slowest": [
+                {"ms": round(duration * 1000, 3), "sql": sql}
+                for duration, sql in self.slowest()
+            ],
+        }
+
+    def report(self):
+        """Print the profile on stderr"""
+        profile = self.profile
+        typer.echo(f"\nProfile of '{self.command}':", err=True)
+        typer.echo(
+            f"  SQL queries: {profile['queries']} ({profile['db_ms']:.1f} ms)", err=True
+        )
+        typer.echo(f"  Python time: {profile['python_ms']:.1f} ms", err=True)
+        typer.echo(f"  Wall time: {profile['wall_ms']:.1f} ms", err=True)
+        if self.peak_memory is not None:
+            typer.echo(f"  Peak memory: {self.peak_memory / 1024:.1f} MB", err=True)
+        if profile["slowest"]:
+            typer.echo("  Slowest queries (ms):", err=True)
+        for statement in profile["slowest"]:
+            typer.echo(f"{statement['ms']:10.2f}  {statement['sql'][:200]}", err=True)
+
+    def write(self, path: str):
+        """Append the profile as a JSON line"""
+        try:
+            with open(path, "a") as profile_file:
+                profile_file.write(json.dumps(self.profile) + "\n")
+        except OSError as e:
+            typer.echo(f"Cannot write the profile to {path}: {e}", err=True)
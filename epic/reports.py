@@ -0,0 +1,283 @@
+"""
+Financial aggregates of the contracts and events.
+
+The reports are computed by the database with GROUP BY queries, the rows are never
+loaded as model instances. On SQLite, summary tables can be enabled: ClientSummary
+holds the totals of the contracts of each client and EventMonthSummary the number of
+events of each month, both maintained by triggers so that every write path (save,
+insert_many, bulk update, delete) keeps them up to date. The reports then read the
+summaries, whose size does not grow with the number of contracts and events.
+"""
+from peewee import Case, fn
+
+from epic.models.models import (
+    Client,
+    ClientSummary,
+    Contract,
+    Event,
+    EventMonthSummary,
+    User,
+)
+from epic.search import is_postgresql
+
+SUMMARY_MODELS = [ClientSummary, EventMonthSummary]
+
+# summary column -> SQL expression of a contract row, "{row}" is new or old
+CLIENT_TOTALS = {
+    "contracts": "1",
+    "signed_amount": "CASE WHEN {row}.signed THEN {row}.total_amount ELSE 0 END",
+    "unsigned_amount": "CASE WHEN {row}.signed THEN 0 ELSE {row}.total_amount END",
+    "due_amount": "{row}.due_amount",
+}
+
+
+def upsert_sql(table: str, key: str, key_value: str, totals: dict, sign: str) -> str:
+    """Return the statement adding (sign "+") or removing (sign "-") a row's totals"""
+    columns = ", ".join(totals)
+    values = ", ".join(f"{sign}({expression})" for expression in totals.values())
+    updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in totals)
+    return (
+        f"INSERT INTO {table} ({key}, {columns}) VALUES ({key_value}, {values}) "
+        f"ON CONFLICT ({key}) DO UPDATE SET {updates};"
+    )
+
+
+def table_triggers(table: str, columns: str, change, name: str = "summary") -> list:
+    """
+    Return the statements creating the triggers of a table.
+
+    Args:
+        table (str): The summarized table.
+        columns (str): The summarized columns, the updates of the others are ignored.
+        change: Function returning the statement of the change of a row, called with
+            the row (new or old) and the sign.
+        name (str): The name of the triggers, after the name of the table.
+    """
+    prefix = f"CREATE TRIGGER IF NOT EXISTS {table}_{name}"
+    return [
+        f"{prefix}_insert AFTER INSERT ON {table} BEGIN {change('new', '+')} END",
+        f"{prefix}_update AFTER UPDATE OF {columns} ON {table} "
+        f"BEGIN {change('old', '-')} {change('new', '+')} END",
+        f"{prefix}_delete AFTER DELETE ON {table} BEGIN {change('old', '-')} END",
+    ]
+
+
+def summary_triggers() -> list:
+    """Return the statements creating the triggers maintaining the summaries"""
+
+    def contract_change(row, sign):
+        totals = {column: sql.format(row=row) for column, sql in CLIENT_TOTALS.items()}
+        return upsert_sql(
+            ClientSummary._meta.table_name, "client_id", f"{row}.client_id", totals, sign
+        )
+
+    def event_change(row, sign):
+        return upsert_sql(
+            EventMonthSummary._meta.table_name,
+            "month",
+            f"substr({row}.date_start, 1, 7)",
+            {"events": "1"},
+            sign,
+        )
+
+    return table_triggers(
+        Contract._meta.table_name,
+        "client_id, total_amount, due_amount, signed",
+        contract_change,
+    ) + table_triggers(Event._meta.table_name, "date_start", event_change)
+
+
+def create_summaries(database):
+    """
+    Create the summary tables and their triggers, and fill them from the existing
+    contracts and events (SQLite only).
+
+    Raises:
+        RuntimeError: If the database is not a SQLite database.
+    """
+    if is_postgresql(database):
+        raise RuntimeError("The summary tables are only supported on SQLite.")
+    with database.bind_ctx(SUMMARY_MODELS):
+        with database.atomic():
+            database.create_tables(SUMMARY_MODELS, safe=True)
+            for statement in summary_triggers():
+                database.execute_sql(statement)
+            rebuild_summaries(database)
+
+
+def rebuild_summaries(database):
+    """Compute again the summaries from the contracts and events"""
+    with database.bind_ctx(SUMMARY_MODELS):
+        with database.atomic():
+            ClientSummary.delete().execute()
+            EventMonthSummary.delete().execute()
+            ClientSummary.insert_from(
+                client_totals(),
+                [
+                    ClientSummary.client_id,
+                    ClientSummary.contracts,
+                    ClientSummary.signed_amount,
+                    ClientSummary.unsigned_amount,
+                    ClientSummary.due_amount,
+                ],
+            ).execute()
+            month = event_month(database)
+            EventMonthSummary.insert_from(
+                Event.select(month, fn.COUNT(Event.id)).group_by(month),
+                [EventMonthSummary.month, EventMonthSummary.events],
+            ).execute()
+
+
+def drop_summaries(database):
+    """Drop the summary tables and their triggers"""
+    for table in [Contract._meta.table_name, Event._meta.table_name]:
+        for action in ["insert", "update", "delete"]:
+            database.execute_sql(f"DROP TRIGGER IF EXISTS {table}_summary_{action}")
+    with database.bind_ctx(SUMMARY_MODELS):
+        database.drop_tables(SUMMARY_MODELS, safe=True)
+
+
+def summaries_enabled(database) -> bool:
+    """Return True if the summary tables exist"""
+    if is_postgresql(database):
+        return False
+    with database.bind_ctx(SUMMARY_MODELS):
+        return ClientSummary.table_exists()
+
+
+def event_month(database):
+    """Return the YYYY-MM of the start date of an event"""
+    if is_postgresql(database):
+        return fn.to_char(Event.date_start, "YYYY-MM")
+    return fn.substr(Event.date_start, 1, 7)
+
+
+def contract_totals() -> list:
+    """
+    Return the aggregates of the contracts: their number, signed amount, unsigned
+    amount and due amount.
+    """
+    return [
+        fn.COUNT(Contract.id),
+        fn.SUM(Case(None, [(Contract.signed, Contract.total_amount)], 0)),
+        fn.SUM(Case(None, [(Contract.signed, 0)], Contract.total_amount)),
+        fn.SUM(Contract.due_amount),
+    ]
+
+
+def client_totals():
+    """Return the query of the client ID and contract_totals of each client"""
+    return Contract.select(Contract.client, *contract_totals()).group_by(
+        Contract.client
+    )
+
+
+def outstanding_by_sales_contact() -> list:
+    """
+    Return the (user ID, name, due amount) of the sales contacts, the largest due
+    amount first.
+    """
+    database = Contract._meta.database
+    with database.bind_ctx(SUMMARY_MODELS):
+        if summaries_enabled(database):
+            due = fn.SUM(ClientSummary.due_amount)
+            query = (
+                User.select(User.id, User.name, due)
+                .join(Client, on=Client.sales_contact == User.id)
+                .join(ClientSummary, on=ClientSummary.client_id == Client.id)
+            )
+        else:
+            due = fn.SUM(Contract.due_amount)
+            query = (
+                User.select(User.id, User.name, due)
+                .join(Client, on=Client.sales_contact == User.id)
+                .join(Contract)
+            )
+        return list(
+            query.group_by(User.id, User.name)
+            .order_by(due.desc(), User.id)
+            .tuples()
+        )
+
+
+def contract_value_by_client() -> list:
+    """
+    Return the (client ID, name, contracts, signed amount, unsigned amount, due
+    amount) of the clients having contracts, by client ID.
+    """
+    database = Contract._meta.database
+    with database.bind_ctx(SUMMARY_MODELS):
+        if summaries_enabled(database):
+            query = (
+                ClientSummary.select(
+                    Client.id,
+                    Client.name,
+                    ClientSummary.contracts,
+                    ClientSummary.signed_amount,
+                    ClientSummary.unsigned_amount,
+                    ClientSummary.due_amount,
+                )
+                .join(Client, on=ClientSummary.client_id == Client.id)
+                .where(ClientSummary.contracts > 0)
+            )
+        else:
+            query = (
+                Client.select(Client.id, Client.name, *contract_totals())
+                .join(Contract)
+                .group_by(Client.id, Client.name)
+            )
+        return list(query.order_by(Client.id).tuples())
+
+
+def events_per_month() -> list:
+    """Return the (YYYY-MM, number of events) of the months having events"""
+    database = Event._meta.database
+    with database.bind_ctx(SUMMARY_MODELS):
+        if summaries_enabled(database):
+            query = (
+                EventMonthSummary.select(
+                    EventMonthSummary.month, EventMonthSummary.events
+                )
+                .where(EventMonthSummary.events > 0)
+                .order_by(EventMonthSummary.month)
+            )
+        else:
+            month = event_month(database)
+            query = (
+                Event.select(month, fn.COUNT(Event.id))
+                .group_by(month)
+                .order_by(month)
+            )
+        return list(query.tuples())
+
+
+def dashboard() -> dict:
+    """Return the totals of the contracts and the number of events"""
+    database = Contract._meta.database
+    with database.bind_ctx(SUMMARY_MODELS):
+        if summaries_enabled(database):
+            contracts, signed, unsigned, due = (
+                ClientSummary.select(
+                    fn.SUM(ClientSummary.contracts),
+                    fn.SUM(ClientSummary.signed_amount),
+                    fn.SUM(ClientSummary.unsigned_amount),
+                    fn.SUM(ClientSummary.due_amount),
+                )
+                .tuples()
+                .get()
+            )
+            events = EventMonthSummary.select(
+                fn.SUM(EventMonthSummary.events)
+            ).scalar()
+        else:
+            contracts, signed, unsigned, due = (
+                Contract.select(*contract_totals()).tuples().get()
+            )
+            events = Event.select().count()
+    return {
+        "contracts": contracts or 0,
+        "signed_amount": signed or 0.0,
+        "unsigned_amount": unsigned or 0.0,
+        "due_amount": due or 0.0,
+        "events": events or 0,
+    }
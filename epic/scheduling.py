@@ -0,0 +1,242 @@
+"""
+Availability of the support contacts: an event overlaps another event of its support
+contact when their dates intersect, both days included.
+
+A single assignment is checked with a range query on the (support_contact,
+date_start) index. The conflicts report sweeps the events of each support contact
+in start date order, keeping the events still running in a heap ordered by end
+date, so that it runs in O(n log n) instead of comparing every pair.
+
+The automatic assignment walks the unassigned events in start date order once,
+picking for each the least loaded available support contact from a heap keyed by
+load, and writes the result with one UPDATE per support contact.
+"""
+import heapq
+from bisect import bisect_right
+from datetime import date
+
+from peewee import JOIN, chunked, fn
+
+from epic.models.models import Event, Role, User
+
+
+def overlapping_events(
+    support_contact_id: int, date_start, date_end, exclude_id: int = None
+):
+    """
+    Return the query of the events of a support contact overlapping the dates.
+
+    Args:
+        support_contact_id (int): The ID of the support contact.
+        date_start: The first day of the period.
+        date_end: The last day of the period.
+        exclude_id (int): The ID of the event being changed, never in conflict with
+            itself.
+    """
+    query = Event.select(Event.id, Event.name, Event.date_start, Event.date_end).where(
+        (Event.support_contact == support_contact_id)
+        & (Event.date_start <= date_end)
+        & (Event.date_end >= date_start)
+    )
+    if exclude_id is not None:
+        query = query.where(Event.id != exclude_id)
+    return query.order_by(Event.date_start)
+
+
+def conflicts_message(conflicts: list) -> str:
+    """Describe the events in conflict with an assignment"""
+    events = ", ".join(
+        f"{event.name} (ID {event.id}, {event.date_start} - {event.date_end})"
+        for event in conflicts
+    )
+    return f"The support contact is not available, overlapping events: {events}."
+
+
+def check_availability(event, support_contact_id, date_start, date_end) -> list:
+    """
+    Return the events overlapping the event once it is assigned to the support
+    contact with the dates, an empty list when there is no support contact.
+    """
+    if support_contact_id is None:
+        return []
+    return list(
+        overlapping_events(support_contact_id, date_start, date_end, event.id)
+    )
+
+
+def sweep_conflicts(rows):
+    """
+    Yield the overlapping pairs of events.
+
+    Args:
+        rows: The (support contact ID, event ID, start date, end date) of the events,
+            sorted by support contact and start date.
+
+    Yields:
+        tuple: (support contact ID, (ID, start, end) of the first event, (ID, start,
+            end) of the second event), the first event starting first.
+    """
+    current_contact = None
+    running = []  # (end date, event ID, start date) of the events not ended yet
+    for contact, event_id, start, end in rows:
+        if contact != current_contact:
+            current_contact, running = contact, []
+        while running and running[0][0] < start:
+            heapq.heappop(running)
+        for other_end, other_id, other_start in running:
+            yield contact, (other_id, other_start, other_end), (event_id, start, end)
+        heapq.heappush(running, (end, event_id, start))
+
+
+def find_conflicts(support_contact_id: int = None, since: date = None):
+    """
+    Yield the overlapping pairs of events of the support contacts, see
+    sweep_conflicts. The events are read in a single pass of the (support_contact,
+    date_start) index, the dates are compared as ISO strings without conversion.
+
+    Args:
+        support_contact_id (int): Only the events of this support contact.
+        since (date): Only the events ending on or after this day.
+    """
+    query = Event.select(
+        Event.support_contact,
+        Event.id,
+        Event.date_start.coerce(False),
+        Event.date_end.coerce(False),
+    ).where(Event.support_contact.is_null(False))
+    if support_contact_id is not None:
+        query = query.where(Event.support_contact == support_contact_id)
+    if since is not None:
+        query = query.where(Event.date_end >= since)
+    query = query.order_by(Event.support_contact, Event.date_start)
+    return sweep_conflicts(query.tuples().iterator())
+
+
+class Calendar:
+    """
+    The busy periods of a support contact: its assigned events merged into disjoint
+    periods sorted by start date, and the last day of the events assigned since,
+    which are added in start date order.
+    """
+
+    def __init__(self, periods: list = ()):
+        self.starts, self.ends = [], []
+        for start, end in sorted(periods):
+            if self.ends and start <= self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+        self.last_end = None
+
+    def is_free(self, start, end) -> bool:
+        """Return True if no busy period intersects the dates, both days included"""
+        if self.last_end is not None and self.last_end >= start:
+            return False
+        index = bisect_right(self.starts, end) - 1
+        return index < 0 or self.ends[index] < start
+
+    def add(self, start, end):
+        """Add an event starting on or after the events added before"""
+        self.last_end = end if self.last_end is None else max(self.last_end, end)
+
+
+def plan_assignments(pending, loads: dict, calendars: dict):
+    """
+    Assign each event to the least loaded support contact available on its dates,
+    the lowest ID first on equal loads.
+
+    Args:
+        pending: The (event ID, start date, end date) of the unassigned events,
+            sorted by start date.
+        loads (dict): The number of events of each support contact.
+        calendars (dict): The Calendar of the support contacts having events.
+
+    Returns:
+        tuple: The dict of support contact ID by event ID and the list of the IDs of
+            the events no support contact is available for.
+    """
+    heap = [(load, contact) for contact, load in loads.items()]
+    heapq.heapify(heap)
+    assignments, unassigned = {}, []
+    for event_id, start, end in pending:
+        busy = []
+        while heap:
+            load, contact = heapq.heappop(heap)
+            calendar = calendars.get(contact)
+            if calendar is None or calendar.is_free(start, end):
+                break
+            busy.append((load, contact))
+        else:
+            contact = None
+        if contact is None:
+            unassigned.append(event_id)
+        else:
+            calendar = calendars.setdefault(contact, Calendar())
+            calendar.add(start, end)
+            assignments[event_id] = contact
+            busy.append((load + 1, contact))
+        for item in busy:
+            heapq.heappush(heap, item)
+    return assignments, unassigned
+
+
+def auto_assign(since: date = None, dry_run: bool = False, batch_size: int = 500):
+    """
+    Assign the unassigned events to the support contacts, balancing their number of
+    events without overlapping dates, see plan_assignments.
+
+    Args:
+        since (date): Only the events ending on or after this day, and only these
+            events count in the load of the support contacts.
+        dry_run (bool): Compute the assignments without writing them.
+        batch_size (int): The number of events per UPDATE statement.
+
+    Returns:
+        tuple: The dict of support contact ID by event ID and the list of the IDs of
+            the events left unassigned.
+    """
+    window = Event.date_end >= since if since is not None else True
+    loads = {
+        contact: count
+        for contact, count in User.select(User.id, fn.COUNT(Event.id))
+        .join(Role)
+        .switch(User)
+        .join(
+            Event,
+            JOIN.LEFT_OUTER,
+            on=(Event.support_contact == User.id) & window,
+        )
+        .where(Role.name == "support")
+        .group_by(User.id)
+        .tuples()
+    }
+    periods = {}
+    for contact, start, end in (
+        Event.select(Event.support_contact, Event.date_start, Event.date_end)
+        .where(Event.support_contact.in_(list(loads)) & window)
+        .tuples()
+        .iterator()
+    ):
+        periods.setdefault(contact, []).append((start, end))
+    calendars = {contact: Calendar(dates) for contact, dates in periods.items()}
+    pending = (
+        Event.select(Event.id, Event.date_start, Event.date_end)
+        .where(Event.support_contact.is_null() & window)
+        .order_by(Event.date_start, Event.id)
+        .tuples()
+        .iterator()
+    )
+    assignments, unassigned = plan_assignments(pending, loads, calendars)
+    if dry_run:
+        return assignments, unassigned
+    by_contact = {}
+    for event_id, contact in assignments.items():
+        by_contact.setdefault(contact, []).append(event_id)
+    with Event._meta.database.atomic():
+        for contact, event_ids in by_contact.items():
+            for chunk in chunked(event_ids, batch_size):
+                Event.update(support_contact=contact).where(
+                    Event.id.in_(chunk) & Event.support_contact.is_null()
+                ).execute()
+    return assignments, unassigned
@@ -0,0 +1,222 @@
+"""
+Full-text search over the clients, contracts and events.
+
+On SQLite the documents are kept in the FTS5 table of the search index model,
+maintained by
+triggers on the indexed tables, so every write path (save, insert_many, bulk
+update, delete) keeps it up to date. On PostgreSQL the tables are searched directly
+through GIN expression indexes on their tsvector.
+"""
+import re
+from contextlib import nullcontext
+from functools import lru_cache
+
+import peewee
+from peewee import SQL, Expression, fn
+
+from epic.models.models import Client, Contract, Event, db
+
+# indexed fields by kind of document, the first one is shown in the results
+SEARCH_FIELDS = {
+    "client": ["name", "email", "company"],
+    "contract": ["name"],
+    "event": ["name", "location", "notes"],
+}
+
+SEARCH_MODELS = {"client": Client, "contract": Contract, "event": Event}
+
+# the rowid of a document is id * len(KINDS) + the position of its kind
+KINDS = list(SEARCH_FIELDS)
+
+
+@lru_cache(maxsize=None)
+def search_index_model():
+    """
+    Return the model of the full-text index of the clients, contracts and events on
+    SQLite. The rowid of a document is derived from the kind and the id of the
+    indexed row, the ref column holds the id.
+
+    The model is defined on first use: playhouse.sqlite_ext slows down the start of
+    every command and is useless on PostgreSQL.
+    """
+    from playhouse.sqlite_ext import FTS5Model, RowIDField, SearchField
+
+    class SearchIndex(FTS5Model):
+        rowid = RowIDField()
+        kind = SearchField(unindexed=True)
+        ref = SearchField(unindexed=True)
+        content = SearchField()
+
+        class Meta:
+            database = db
+            options = {"tokenize": "unicode61 remove_diacritics 2", "prefix": "2 3"}
+
+    return SearchIndex
+
+
+def is_postgresql(database) -> bool:
+    """Return True if the database is a PostgreSQL database"""
+    return isinstance(database, peewee.PostgresqlDatabase)
+
+
+def content_sql(fields: list, prefix: str = "") -> str:
+    """Return the SQL expression of the text of a document"""
+    return " || ' ' || ".join(f"coalesce({prefix}{field}, '')" for field in fields)
+
+
+def trigger_sql(kind: str) -> list:
+    """Return the statements creating the triggers indexing a kind of document"""
+    table = SEARCH_MODELS[kind]._meta.table_name
+    fields = SEARCH_FIELDS[kind]
+    position, count = KINDS.index(kind), len(KINDS)
+    insert = (
+        f"INSERT OR REPLACE INTO searchindex (rowid, kind, ref, content) VALUES "
+        f"(new.id * {count} + {position}, '{kind}', new.id, "
+        f"{content_sql(fields, 'new.')});"
+    )
+    delete = f"DELETE FROM searchindex WHERE rowid = old.id * {count} + {position};"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF "
+        f"id, {', '.join(fields)} ON {table} BEGIN {delete} {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} "
+        f"BEGIN {delete} END",
+    ]
+
+
+def create_search_index(database):
+    """
+    Create the search index of the database if it does not exist. The existing rows
+    are indexed when the index is created.
+    """
+    if is_postgresql(database):
+        for kind, model in SEARCH_MODELS.items():
+            table = model._meta.table_name
+            database.execute_sql(
+                f"CREATE INDEX IF NOT EXISTS {table}_search ON {table} USING gin "
+                f"(to_tsvector('simple', {content_sql(SEARCH_FIELDS[kind])}))"
+            )
+        return
+    SearchIndex = search_index_model()
+    with database.bind_ctx([SearchIndex]):
+        created = not SearchIndex.table_exists()
+        with database.atomic():
+            SearchIndex.create_table(safe=True)
+            for kind in KINDS:
+                for statement in trigger_sql(kind):
+                    database.execute_sql(statement)
+            if created:
+                rebuild_search_index(database)
+
+
+def rebuild_search_index(database):
+    """Index again all the clients, contracts and events (SQLite only)"""
+    count = len(KINDS)
+    with database.atomic():
+        database.execute_sql("DELETE FROM searchindex")
+        for position, (kind, fields) in enumerate(SEARCH_FIELDS.items()):
+            table = SEARCH_MODELS[kind]._meta.table_name
+            database.execute_sql(
+                f"INSERT INTO searchindex (rowid, kind, ref, content) "
+                f"SELECT id * {count} + {position}, '{kind}', id, "
+                f"{content_sql(fields)} FROM {table}"
+            )
+
+
+def search_terms(text: str) -> list:
+    """Return the words of a search, punctuation and operators are ignored"""
+    return re.findall(r"\w+", text.lower())
+
+
+def visible(kind: str, query, user):
+    """Restrict a query on a kind of document to the rows the user can read"""
+    if user.role.name in ["admin", "super_admin"]:
+        return query
+    if kind == "client":
+        return query.where(Client.sales_contact == user.id)
+    if kind == "contract":
+        return query.join(Client).where(Client.sales_contact == user.id)
+    return (
+        query.join(Contract)
+        .join(Client)
+        .where((Client.sales_contact == user.id) | (Event.support_contact == user.id))
+    )
+
+
+def document_vector(model, fields: list):
+    """Return the tsvector of the documents of a model, as in its GIN index"""
+    text = fn.coalesce(getattr(model, fields[0]), "")
+    for field in fields[1:]:
+        text = text.concat(" ").concat(fn.coalesce(getattr(model, field), ""))
+    return fn.to_tsvector(SQL("'simple'"), text)
+
+
+def kind_query(kind: str, terms: list, database):
+    """Return the query of the (id, title, score) of the matching documents"""
+    model = SEARCH_MODELS[kind]
+    title = getattr(model, SEARCH_FIELDS[kind][0])
+    if is_postgresql(database):
+        vector = document_vector(model, SEARCH_FIELDS[kind])
+        tsquery = fn.to_tsquery(
+            SQL("'simple'"), " & ".join(f"{term}:*" for term in terms)
+        )
+        return model.select(
+            model.id, title, (-fn.ts_rank(vector, tsquery)).alias("score")
+        ).where(Expression(vector, "@@", tsquery))
+    match = " ".join(f'"{term}"*' for term in terms)
+    SearchIndex = search_index_model()
+    return (
+        SearchIndex.select(model.id, title, SearchIndex.bm25().alias("score"))
+        .join(model, on=(model.id == SearchIndex.ref))
+        .where(SearchIndex.match(match) & (SearchIndex.kind == kind))
+    )
+
+
+def search(text: str, user, limit: int = 20) -> list:
+    """
+    Search the clients, contracts and events the user can read.
+
+    Every word of the text must match the start of a word of the document: "acm
+    corp" finds "ACME Corporation".
+
+    Args:
+        text (str): The searched words.
+        user (User): The authenticated user, only the kinds of documents they have
+            the read permission of and the rows they can read are searched.
+        limit (int): The maximum number of results.
+
+    Returns:
+        list: The (kind, id, title) of the results, the most relevant first.
+
+    Raises:
+        RuntimeError: If the search index of a SQLite database does not exist.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    database = Client._meta.database
+    results = []
+    if is_postgresql(database):
+        bound = nullcontext()
+    else:
+        bound = database.bind_ctx([search_index_model()])
+    with bound:
+        for kind in KINDS:
+            if not user.has_perm(f"{kind}-read"):
+                continue
+            query = visible(kind, kind_query(kind, terms, database), user)
+            try:
+                rows = list(query.order_by(SQL("score")).limit(limit).tuples())
+            except peewee.OperationalError as e:
+                # no query is spent checking the index, it is missing when the
+                # database was not upgraded
+                if "no such table: searchindex" not in str(e):
+                    raise
+                raise RuntimeError(
+                    "The search index does not exist, run `epic init upgrade`."
+                ) from e
+            for row_id, title, score in rows:
+                results.append((score, kind, row_id, title))
+    results.sort(key=lambda result: result[0])
+    return [(kind, row_id, title) for _, kind, row_id, title in results[:limit]]
@@ -0,0 +1,188 @@
+"""
+Reproducible synthetic data: sales and support users, clients, contracts and events
+inserted in bulk, for load tests and benchmarks.
+
+The roles must exist (`epic init initialize`). The synthetic users log in with the
+password "password".
+"""
+import random
+from datetime import date, timedelta
+
+from peewee import chunked, fn
+
+from epic.models.models import Client, Contract, Event, Role, User, hash_password
+
+# number of events of each named scale
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# domain of the emails of the synthetic users, to tell them apart
+EMAIL_DOMAIN = "synthetic.epic"
+
+FIRST_DAY = date(2024, 1, 1)
+
+FIRST_NAMES = [
+    "Alice", "Bruno", "Chloe", "David", "Emma", "Farid", "Gaelle", "Hugo", "Ines",
+    "Jules", "Karim", "Lea", "Marc", "Nina", "Oscar", "Paula", "Quentin", "Rosa",
+    "Samir", "Tess",
+]  # fmt: skip
+LAST_NAMES = [
+    "Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand",
+    "Leroy", "Moreau", "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "David",
+    "Bertrand", "Roux", "Vincent", "Fournier",
+]  # fmt: skip
+COMPANY_WORDS = [
+    "Acme", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay", "Stark", "Wayne",
+    "Tyrell", "Cyberdyne", "Soylent", "Aperture", "Gringotts", "Oceanic", "Wonka",
+]  # fmt: skip
+COMPANY_SUFFIXES = ["Corp", "Events", "Group", "Industries", "Labs", "Partners"]
+EVENT_KINDS = [
+    "Launch party", "Seminar", "Conference", "Gala", "Wedding", "Workshop",
+    "Team building", "Trade show",
+]  # fmt: skip
+CITIES = [
+    "Paris", "Lyon", "Marseille", "Bordeaux", "Lille", "Nantes", "Nice", "Toulouse",
+    "Strasbourg", "Montpellier",
+]  # fmt: skip
+NOTES = [
+    "Catering for all attendees.",
+    "Stage and sound system required.",
+    "Outdoor venue, plan a tent in case of rain.",
+    "Guests arrive by shuttle from the station.",
+    "Dress code: black tie.",
+    "",
+]
+
+
+def dataset_size(events: int) -> dict:
+    """Return the number of rows of each table for a number of events"""
+    return {
+        "sales": max(events // 2000, 5),
+        "support": max(events // 500, 5),
+        "clients": max(events // 50, 1),
+        "contracts": max(events // 5, 1),
+        "events": events,
+    }
+
+
+def insert_rows(model, rows, batch_size: int) -> list:
+    """Insert the rows by batches and return the ids of the new rows"""
+    last_id = model.select(fn.MAX(model.id)).scalar() or 0
+    for batch in chunked(rows, batch_size):
+        model.insert_many(batch).execute()
+    query = model.select(model.id).where(model.id > last_id).order_by(model.id)
+    return [row_id for row_id, in query.tuples()]
+
+
+def generate(events: int, seed: int = 12, batch_size: int = 1000) -> dict:
+    """
+    Insert synthetic users, clients, contracts and events in a transaction.
+
+    The number of users, clients and contracts follows the number of events: 1
+    sales contact per 2000 events, 1 support contact per 500, 1 client per 50 and 1
+    contract per 5. One event in ten has no support contact.
+
+    Args:
+        events (int): The number of events.
+        seed (int): The seed of the random generator, the same seed gives the same
+            data.
+        batch_size (int): The number of rows of each insert.
+
+    Returns:
+        dict: The number of inserted rows of each table.
+    """
+    rng = random.Random(seed)
+    size = dataset_size(events)
+    database = Event._meta.database
+    password = hash_password("password")
+    roles = dict(Role.select(Role.name, Role.id).tuples())
+    with database.atomic():
+        sales_ids = insert_rows(
+            User,
+            (
+                {
+                    "name": f"Sales {i}",
+                    "email": f"sales{i}@{EMAIL_DOMAIN}",
+                    "password": password,
+                    "role": roles["sales"],
+                }
+                for i in range(size["sales"])
+            ),
+            batch_size,
+        )
+        support_ids = insert_rows(
+            User,
+            (
+                {
+                    "name": f"Support {i}",
+                    "email": f"support{i}@{EMAIL_DOMAIN}",
+                    "password": password,
+                    "role": roles["support"],
+                }
+                for i in range(size["support"])
+            ),
+            batch_size,
+        )
+
+        companies = []
+
+        def client_row(i):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            company = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}"
+            companies.append(company)
+            return {
+                "name": f"{first} {last}",
+                "email": f"{first}.{last}.{i}@example.com".lower(),
+                "phone": f"0{rng.randrange(10**9):09d}",
+                "company": company,
+                "sales_contact": rng.choice(sales_ids),
+                "date_created": FIRST_DAY - timedelta(days=rng.randrange(730)),
+            }
+
+        client_ids = insert_rows(
+            Client, (client_row(i) for i in range(size["clients"])), batch_size
+        )
+
+        contract_companies = []
+
+        def contract_row(i):
+            client = rng.randrange(len(client_ids))
+            contract_companies.append(companies[client])
+            total = float(rng.randrange(10, 500) * 100)
+            signed = rng.random() < 0.7
+            return {
+                "name": f"{companies[client]} contract {i}",
+                "client": client_ids[client],
+                "total_amount": total,
+                "due_amount": rng.choice([0.0, total / 2, total]) if signed else total,
+                "signed": signed,
+                "date_created": FIRST_DAY - timedelta(days=rng.randrange(365)),
+            }
+
+        contract_ids = insert_rows(
+            Contract, (contract_row(i) for i in range(size["contracts"])), batch_size
+        )
+
+        def event_row(i):
+            contract = rng.randrange(len(contract_ids))
+            start = FIRST_DAY + timedelta(days=rng.randrange(1460))
+            return {
+                "name": f"{contract_companies[contract]} {rng.choice(EVENT_KINDS)}",
+                "contract": contract_ids[contract],
+                "support_contact": (
+                    rng.choice(support_ids) if rng.random() < 0.9 else None
+                ),
+                "date_start": start,
+                "date_end": start + timedelta(days=rng.randrange(3)),
+                "location": rng.choice(CITIES),
+                "attendees": rng.randrange(10, 500),
+                "notes": rng.choice(NOTES),
+            }
+
+        for batch in chunked((event_row(i) for i in range(events)), batch_size):
+            Event.insert_many(batch).execute()
+    return {
+        "users": len(sales_ids) + len(support_ids),
+        "clients": len(client_ids),
+        "contracts": len(contract_ids),
+        "events": events,
+    }
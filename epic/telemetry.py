@@ -0,0 +1,155 @@
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import traceback
+from urllib.parse import urlparse
+
+# Events are appended to a local queue and only sent to sentry by
+# `epic telemetry flush`, so reporting never adds latency to a command.
+TELEMETRY_QUEUE = os.environ.get("EPIC_TELEMETRY_QUEUE", "telemetry_queue.jsonl")
+
+SENTRY_DSN = os.environ.get(
+    "EPIC_SENTRY_DSN",
+    "https://09a98f0d850dee8f63c4f96cca2d32d1@o4506476129681408.ingest.sentry.io/4506476133351424",
+)
+
+# Fraction of the events kept in the queue
+SAMPLE_RATE = float(os.environ.get("EPIC_TELEMETRY_SAMPLE_RATE", "1.0"))
+
+# New events are dropped once the queue reaches this size (in bytes)
+MAX_QUEUE_SIZE = int(os.environ.get("EPIC_TELEMETRY_MAX_QUEUE_SIZE", "1000000"))
+
+# Flush the queue in a detached process at the end of each command
+AUTO_FLUSH = os.environ.get("EPIC_TELEMETRY_AUTO_FLUSH", "0") == "1"
+
+
+def capture_message(message: str, level: str = "info"):
+    """Spool a message"""
+    spool({"type": "message", "message": message, "level": level})
+
+
+def capture_exception(exception: BaseException):
+    """Spool an exception with its traceback"""
+    spool(
+        {
+            "type": "exception",
+            "message": f"{type(exception).__name__}: {exception}",
+            "level": "error",
+            "traceback": "".join(traceback.format_exception(exception)),
+        }
+    )
+
+
+def spool(event: dict):
+    """
+    Append the event to the queue, unless it is sampled out or the queue is full.
+
+    Returns:
+        bool: True if the event was spooled.
+    """
+    if random.random() >= SAMPLE_RATE:
+        return False
+    event["timestamp"] = time.time()
+    event["argv"] = sys.argv
+    line = json.dumps(event) + "\n"
+    try:
+        if queue_size() + len(line) > MAX_QUEUE_SIZE:
+            return False
+        with open(TELEMETRY_QUEUE, "a") as queue_file:
+            queue_file.write(line)
+    except OSError:
+        # telemetry must never break a command
+        return False
+    return True
+
+
+def queue_size():
+    """Return the size in bytes of the queue"""
+    try:
+        return os.path.getsize(TELEMETRY_QUEUE)
+    except FileNotFoundError:
+        return 0
+
+
+def pending_events():
+    """Return the spooled events, including the ones of an interrupted flush"""
+    events = []
+    for path in [TELEMETRY_QUEUE + ".sending", TELEMETRY_QUEUE]:
+        try:
+            with open(path) as queue_file:
+                events.extend(json.loads(line) for line in queue_file if line.strip())
+        except FileNotFoundError:
+            pass
+    return events
+
+
+def is_reachable(dsn: str, timeout: float):
+    """Return True if a connection to the sentry host can be opened"""
+    url = urlparse(dsn)
+    port = url.port or (443 if url.scheme == "https" else 80)
+    try:
+        with socket.create_connection((url.hostname, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def flush(timeout: float = 2.0):
+    """
+    Send the spooled events to sentry.
+
+    The queue is renamed before sending, so the events spooled meanwhile are kept for
+    the next flush. Nothing is removed when sentry cannot be reached.
+
+    Args:
+        timeout (float): Maximum time in seconds to wait for the connection and the
+            transport.
+
+    Returns:
+        int: The number of events sent.
+
+    Raises:
+        ConnectionError: If sentry cannot be reached.
+    """
+    sending = TELEMETRY_QUEUE + ".sending"
+    if not os.path.exists(sending):
+        try:
+            os.replace(TELEMETRY_QUEUE, sending)
+        except FileNotFoundError:
+            return 0
+    with open(sending) as queue_file:
+        events = [json.loads(line) for line in queue_file if line.strip()]
+    if not events:
+        os.remove(sending)
+        return 0
+    if not is_reachable(SENTRY_DSN, timeout):
+        raise ConnectionError(f"Sentry is unreachable, {len(events)} events kept.")
+
+    from epic.init_sentry import init_sentry
+
+    sentry_sdk = init_sentry(SENTRY_DSN)
+    for event in events:
+        with sentry_sdk.push_scope() as scope:
+            scope.set_extra("argv", event["argv"])
+            scope.set_extra("spooled_at", event["timestamp"])
+            if "traceback" in event:
+                scope.set_extra("traceback", event["traceback"])
+            sentry_sdk.capture_message(event["message"], level=event["level"])
+    sentry_sdk.flush(timeout=timeout)
+    os.remove(sending)
+    return len(events)
+
+
+def flush_in_background():
+    """Flush the queue in a detached process"""
+    subprocess.Popen(
+        [sys.executable, "-m", "epic", "telemetry", "flush"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
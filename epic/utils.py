@@ -2,18 +2,39 @@ import typer
 from rich.console import Console
 from rich.table import Table
 from epic.cli.initialize_cli import roles_data
+import base64
+import csv
+import itertools
+import json
 import re
+import sys
 from datetime import datetime
+from peewee import DoesNotExist, IntegrityError, Model, Tuple, chunked
 
 
-def get_input(prompt: str, input_type, **kwargs):
+def get_input(prompt: str, input_type, value=None, interactive=True, **kwargs):
     """
     Get input using typer.prompt and validate based on input_type.
+
+    Args:
+        value: The value given as a command option. It is validated and returned
+            without prompting. The command exits if it is invalid.
+        interactive (bool): When False and no value is given, the default is returned
+            without prompting.
     """
+    if value is not None:
+        try:
+            return validate_input(str(value), input_type)
+        except ValueError as e:
+            typer.echo(f"Invalid input. {e}")
+            raise typer.Exit(code=1)
+    if not interactive:
+        return kwargs.get("default")
     while True:
         try:
             user_input = typer.prompt(prompt, **kwargs)
-            validated_input = validate_input(user_input, input_type)
+            # the default is returned as is when the user presses 'Enter'
+            validated_input = validate_input(str(user_input), input_type)
             return validated_input
         except ValueError as e:
             typer.echo(f"Invalid input. {e}")
@@ -93,3 +114,260 @@ def display_list(title: str, items: list):
     console = Console()
     print("")
     console.print(table)
+
+
+def read_records(path: str):
+    """
+    Yield the records of a NDJSON or CSV file as dicts. The format is detected from
+    the first line, '-' reads the standard input.
+    """
+    stream = sys.stdin if path == "-" else open(path, newline="")
+    try:
+        lines = (line for line in stream if line.strip())
+        first_line = next(lines, None)
+        if first_line is None:
+            return
+        lines = itertools.chain([first_line], lines)
+        if first_line.lstrip().startswith("{"):
+            for line in lines:
+                yield json.loads(line)
+        else:
+            yield from csv.DictReader(lines)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def validate_record(record: dict, fields: dict, required: list = None):
+    """
+    Validate the fields of a record with validate_input.
+
+    Args:
+        record (dict): The raw record.
+        fields (dict): The name of each accepted field and its input type.
+        required (list): The fields which must be present, all of them by default.
+
+    Returns:
+        dict: The validated values of the fields present in the record.
+
+    Raises:
+        ValueError: If a required field is missing or a value is invalid.
+    """
+    required = fields if required is None else required
+    values = {}
+    for field, input_type in fields.items():
+        value = record.get(field)
+        if value is None or value == "":
+            if field in required:
+                raise ValueError(f"Missing field '{field}'.")
+            continue
+        try:
+            values[field] = validate_input(str(value), input_type)
+        except ValueError as e:
+            raise ValueError(f"{field}: {e}")
+    return values
+
+
+def validate_records(path: str, fields: dict, required: list = None):
+    """
+    Read and validate the records of a batch file.
+
+    Returns:
+        tuple: The list of (row number, validated record) and the list of
+            (row number, error message).
+    """
+    rows, errors = [], []
+    for number, record in enumerate(read_records(path), start=1):
+        try:
+            rows.append((number, validate_record(record, fields, required)))
+        except ValueError as e:
+            errors.append((number, str(e)))
+    return rows, errors
+
+
+def apply_batch(model, rows: list, apply_row):
+    """
+    Apply a function to each validated record in a single transaction. Each record
+    runs in a savepoint: a failing record is reported without aborting the batch.
+
+    Args:
+        model: The model whose database holds the transaction.
+        rows (list): The (row number, record) pairs.
+        apply_row: Function called with each record. It raises ValueError,
+            DoesNotExist or IntegrityError to reject the record.
+
+    Returns:
+        tuple: The number of applied records and the list of (row number, error).
+    """
+    database = model._meta.database
+    count, errors = 0, []
+    with database.atomic():
+        for number, record in rows:
+            try:
+                with database.atomic():
+                    apply_row(record)
+                count += 1
+            except (ValueError, DoesNotExist, IntegrityError) as e:
+                errors.append((number, str(e)))
+    return count, errors
+
+
+def save_changes(instance, values: dict) -> list:
+    """
+    Assign the values which differ from the current ones and save only these fields.
+    Nothing is written when no value changed.
+
+    Args:
+        instance: The model instance to update.
+        values (dict): The new values by field name. Foreign keys take an instance
+            or an id.
+
+    Returns:
+        list: The names of the changed fields.
+    """
+    changed = []
+    for name, value in values.items():
+        field = instance._meta.fields[name]
+        new = value.get_id() if isinstance(value, Model) else value
+        current = instance.__data__.get(name)
+        if new is None or current is None:
+            different = new is not current
+        else:
+            different = field.adapt(new) != field.adapt(current)
+        if different:
+            setattr(instance, name, value)
+            changed.append(name)
+    if changed:
+        instance.save(only=[instance._meta.fields[name] for name in changed])
+    return changed
+
+
+def insert_batch(model, rows: list, batch_size: int = 500):
+    """
+    Insert the validated records with insert_many in a single transaction. If a
+    chunk is rejected by the database, its records are inserted one by one to report
+    the failing ones.
+
+    Returns:
+        tuple: The number of inserted records and the list of (row number, error).
+    """
+    database = model._meta.database
+    count, errors = 0, []
+    with database.atomic():
+        for chunk in chunked(rows, batch_size):
+            try:
+                with database.atomic():
+                    model.insert_many([record for _, record in chunk]).execute()
+                count += len(chunk)
+            except IntegrityError:
+                inserted, chunk_errors = apply_batch(
+                    model, chunk, lambda record: model.insert(record).execute()
+                )
+                count += inserted
+                errors.extend(chunk_errors)
+    return count, errors
+
+
+def report_batch(action: str, count: int, errors: list):
+    """Display the errors of a batch and its summary"""
+    for number, error in sorted(errors):
+        typer.echo(f"Row {number}: {error}")
+    typer.echo(f"{count} records {action}, {len(errors)} errors.")
+
+
+LIMIT_HELP = "Number of records per page, every record by default."
+AFTER_HELP = "Cursor of the page, given at the end of the previous page."
+
+
+class Paginator:
+    """
+    Keyset pagination of a query: the page after a cursor is selected with
+    WHERE (sort, id) > (last sort value, last id) instead of an OFFSET, so that a
+    deep page costs the same as the first one when the sort column is indexed.
+
+    The cursor of the next page is an opaque token holding the sort value and the
+    id of the last row of the page.
+    """
+
+    def __init__(self, query, sort_field, limit: int = None, after: str = None):
+        self.sort_field = sort_field
+        self.limit = limit
+        self.last = None
+        self.count = 0
+        primary_key = query.model._meta.primary_key
+        self.query = query
+        if after is not None:
+            value, last_id = self.decode_cursor(after)
+            if sort_field is primary_key:
+                self.query = self.query.where(primary_key > last_id)
+            else:
+                self.query = self.query.where(
+                    Tuple(sort_field, primary_key) > Tuple(value, last_id)
+                )
+        if sort_field is primary_key:
+            self.query = self.query.order_by(primary_key)
+        else:
+            self.query = self.query.order_by(sort_field, primary_key)
+        if limit is not None:
+            self.query = self.query.limit(limit)
+
+    def __iter__(self):
+        for row in self.query:
+            self.last = row
+            self.count += 1
+            yield row
+
+    @staticmethod
+    def encode_cursor(value, row_id: int) -> str:
+        data = json.dumps([value, row_id], default=str).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        """
+        Raises:
+            ValueError: If the cursor is invalid.
+        """
+        try:
+            data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            value, row_id = json.loads(data)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor.")
+        return value, row_id
+
+    def next_cursor(self):
+        """Return the cursor of the next page, None if the page is the last one"""
+        if self.limit is None or self.count < self.limit:
+            return None
+        return self.encode_cursor(
+            getattr(self.last, self.sort_field.name), self.last.id
+        )
+
+
+def paginate(query, sort_fields: dict, sort: str, limit: int = None, after=None):
+    """
+    Paginate the query of a list command. The command exits if the sort field or the
+    cursor is invalid.
+
+    Args:
+        query: The query of the list.
+        sort_fields (dict): The name of each sortable field and the field.
+        sort (str): The name of the sort field.
+        limit (int): The number of rows of the page, every row by default.
+        after (str): The cursor returned by the previous page.
+    """
+    if sort not in sort_fields:
+        typer.echo(f"Invalid sort field. Choose from: {', '.join(sort_fields)}.")
+        raise typer.Exit(code=1)
+    try:
+        return Paginator(query, sort_fields[sort], limit, after)
+    except ValueError as e:
+        typer.echo(str(e))
+        raise typer.Exit(code=1)
+
+
+def echo_next_page(page: Paginator):
+    """Display the option giving the next page, if any"""
+    cursor = page.next_cursor()
+    if cursor is not None:
+        typer.echo(f"Next page: --after {cursor}")
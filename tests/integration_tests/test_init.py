@@ -19,7 +19,7 @@ def test_initialize(database, monkeypatch):
         None
     """
     monkeypatch.setattr("epic.cli.initialize_cli.db", database)
-    result = runner.invoke(app)
+    result = runner.invoke(app, ["initialize"])
     print("result")
     print(result.output)
     assert User.select().where(User.name == "admin").exists() == True
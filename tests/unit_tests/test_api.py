@@ -0,0 +1,117 @@
+import asyncio
+import json
+from epic.api import dispatch, serve
+from epic.models.models import PERMISSION_BITS, Client, User
+
+ALL_PERMISSIONS = sum(PERMISSION_BITS.values())
+
+
+def headers_of(user_id: int, permissions: int = ALL_PERMISSIONS):
+    token = User.get_by_id(user_id).generate_jwt_token(permissions=permissions)
+    return {"authorization": f"Bearer {token}"}
+
+
+def test_list_clients(setup_database):
+    status, payload = dispatch("GET", "/clients?limit=1&sort=name", headers_of(3))
+
+    assert status == 200
+    assert payload["items"][0]["name"] == "Test Client"
+    assert payload["items"][0]["sales_contact_id"] == 3
+    assert payload["next"] is not None
+
+    status, payload = dispatch("GET", f"/clients?after={payload['next']}", headers_of(3))
+    assert status == 200
+    assert payload == {"items": [], "next": None}
+
+
+def test_read_users_without_password(setup_database):
+    status, payload = dispatch("GET", "/users/4", headers_of(2))
+
+    assert status == 200
+    assert payload == {
+        "id": 4,
+        "name": "Support User",
+        "email": "support@example.com",
+        "role_id": 3,
+    }
+
+
+def test_read_contract_of_another_sales(setup_database):
+    status, payload = dispatch("GET", "/contracts/1", headers_of(4))
+
+    assert status == 404
+    assert payload == {"error": "Contract Test Contract does not belong to you."}
+
+
+def test_create_and_update_clients(setup_database):
+    body = json.dumps(
+        [
+            {"name": "A", "email": "a@example.com", "phone": "1234567890", "company": "C"},
+            {"name": "B", "email": "invalid", "phone": "1234567890", "company": "C"},
+        ]
+    ).encode()
+
+    status, payload = dispatch("POST", "/clients", headers_of(3), body)
+
+    assert status == 200
+    assert payload == {
+        "created": 1,
+        "errors": [{"row": 2, "error": "email: Invalid email address."}],
+    }
+    client = Client.get(Client.email == "a@example.com")
+    assert client.sales_contact_id == 3
+
+    status, payload = dispatch(
+        "PATCH", f"/clients/{client.id}", headers_of(3), b'{"company": "New"}'
+    )
+    assert (status, payload) == (200, {"updated": 1, "errors": []})
+    assert Client.get_by_id(client.id).company == "New"
+
+
+def test_dispatch_errors(setup_database):
+    assert dispatch("GET", "/clients", {})[0] == 401
+    assert dispatch("GET", "/clients", {"authorization": "Bearer nope"})[0] == 401
+    assert dispatch("GET", "/invoices", headers_of(2))[0] == 404
+    assert dispatch("PUT", "/clients/1", headers_of(2))[0] == 405
+    assert dispatch("PATCH", "/roles/1", headers_of(2), b"{}")[0] == 405
+    assert dispatch("POST", "/clients", headers_of(2), b"{oops")[0] == 400
+    status, payload = dispatch("DELETE", "/clients/1", headers_of(3, permissions=0))
+    assert status == 403
+    assert payload["error"] == (
+        "You don't have the permission (client-delete) to do this action"
+    )
+
+
+def test_serve_keep_alive():
+    async def scenario():
+        started = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(
+            serve("127.0.0.1", 0, 2, lambda server: started.set_result(server))
+        )
+        server = await started
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        for _ in range(2):
+            writer.write(b"GET /clients HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            status_line = await reader.readline()
+            headers = {}
+            while (line := await reader.readline()) != b"\r\n":
+                name, _, value = line.decode().partition(":")
+                headers[name.lower()] = value.strip()
+            body = await reader.readexactly(int(headers["content-length"]))
+            responses.append((status_line, headers["connection"], json.loads(body)))
+        writer.close()
+        task.cancel()
+        return responses
+
+    responses = asyncio.run(scenario())
+
+    assert responses == [
+        (
+            b"HTTP/1.1 401 Unauthorized\r\n",
+            "keep-alive",
+            {"error": "Bearer token required."},
+        )
+    ] * 2
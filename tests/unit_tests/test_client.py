@@ -60,16 +60,24 @@ def test_delete_client(
     setup_database,
     monkeypatch,
 ):
-    mock_get_input = Mock(side_effect=[1])
+    # the client 1 has a contract, the client without contracts can be deleted
+    client = Client.create(
+        name="Lonely Client",
+        email="lonely@example.com",
+        phone=1234567890,
+        company="Lonely Company",
+        sales_contact=3,
+    )
+    mock_get_input = Mock(side_effect=[client.id])
     monkeypatch.setattr("epic.cli.client_cli.get_input", mock_get_input)
 
     result = runner.invoke(app, ["delete"])
 
     assert result.exit_code == 0
-    assert "Client deleted successfully." in result.output
+    assert "Client Lonely Client deleted successfully." in result.output
     # Check that the client was deleted from the database
     with pytest.raises(Client.DoesNotExist):
-        Client.get_by_id(1)
+        Client.get_by_id(client.id)
 
 
 def test_list_client(
@@ -84,6 +92,40 @@ def test_list_client(
     assert "Client ID" in result.output
 
 
+def test_list_client_pages(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+):
+    Client.insert_many(
+        [
+            {
+                "name": f"Client {i}",
+                "email": f"client{i}@example.com",
+                "phone": "1234567890",
+                "company": "Company",
+                "sales_contact": 3,
+            }
+            for i in range(2, 5)
+        ]
+    ).execute()
+
+    result = runner.invoke(app, ["list", "--limit", "2", "--sort", "name"])
+    assert result.exit_code == 0
+    assert "Name: Client 2" in result.output
+    assert "Name: Client 3" in result.output
+    cursor = result.output.split("Next page: --after ")[1].strip()
+
+    result = runner.invoke(app, ["list", "--limit", "2", "--after", cursor, "--sort", "name"])
+    assert "Name: Client 4" in result.output
+    assert "Name: Test Client" in result.output
+    assert "Name: Client 3" not in result.output
+
+    result = runner.invoke(app, ["list", "--sort", "phone"])
+    assert result.exit_code == 1
+    assert "Invalid sort field. Choose from: id, name." in result.output
+
+
 def test_read_client(
     mock_is_auth_sales,
     mock_has_perm,
@@ -94,3 +136,125 @@ def test_read_client(
 
     assert result.exit_code == 0
     assert "Client ID:" in result.output
+
+
+def test_list_client_query_count(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+    query_counter,
+):
+    query_counter.count = 0
+    runner.invoke(app, ["list"])
+    queries = query_counter.count
+
+    sales_contact = User.get_by_id(3)
+    for i in range(5):
+        Client.create(
+            name=f"Client {i}",
+            email=f"client{i}@example.com",
+            phone=1234567890,
+            company="Test Company",
+            sales_contact=sales_contact,
+        )
+    query_counter.count = 0
+    result = runner.invoke(app, ["list"])
+
+    assert result.exit_code == 0
+    assert result.output.count("Client ID") == 6
+    assert query_counter.count == queries
+
+
+def test_create_client_options(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+):
+    result = runner.invoke(
+        app,
+        [
+            "create",
+            "--name",
+            "Option Client",
+            "--email",
+            "option@example.com",
+            "--phone",
+            "1234567890",
+            "--company",
+            "Option Company",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "Client Option Client created successfully." in result.output
+
+
+def test_update_client_options(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+    query_counter,
+):
+    result = runner.invoke(app, ["update", "--id", "1", "--company", "New Company"])
+
+    assert result.exit_code == 0
+    client = Client.get_by_id(1)
+    assert client.company == "New Company"
+    assert client.name == "Test Client"
+    # only the changed field and date_updated are written
+    [update] = query_counter.updates()
+    assert update.startswith('UPDATE "client" SET "company" = ?, "date_updated" = ?')
+
+    query_counter.queries.clear()
+    result = runner.invoke(app, ["update", "--id", "1", "--company", "New Company"])
+
+    assert "Client Test Client is unchanged." in result.output
+    assert query_counter.updates() == []
+
+
+def test_create_client_batch(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    batch_file = tmp_path / "clients.csv"
+    batch_file.write_text(
+        "name,email,phone,company\n"
+        "Client A,a@example.com,1234567890,Company A\n"
+        "Client B,not-an-email,1234567890,Company B\n"
+        "Client C,test@example.com,1234567890,Company C\n"
+        "Client D,d@example.com,1234567890,Company D\n"
+    )
+
+    result = runner.invoke(app, ["create", "--file", str(batch_file)])
+
+    assert result.exit_code == 0
+    assert "Row 2: email: Invalid email address." in result.output
+    assert "Row 3:" in result.output
+    assert "2 records created, 2 errors." in result.output
+    assert Client.select().count() == 3
+
+
+def test_delete_client_batch_from_stdin(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+):
+    # the client 1 has a contract, the client without contracts can be deleted
+    client = Client.create(
+        name="Lonely Client",
+        email="lonely@example.com",
+        phone=1234567890,
+        company="Lonely Company",
+        sales_contact=3,
+    )
+
+    result = runner.invoke(
+        app, ["delete", "--file", "-"], input=f'{{"id": {client.id}}}\n{{"id": 42}}\n'
+    )
+
+    assert result.exit_code == 0
+    assert "Row 2: Client with ID 42 does not exist." in result.output
+    assert "1 records deleted, 1 errors." in result.output
+    assert list(Client.select(Client.id).tuples()) == [(1,)]
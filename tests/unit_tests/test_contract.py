@@ -61,7 +61,11 @@ def test_delete_contract(
     setup_database,
     monkeypatch,
 ):
-    mock_get_input = Mock(side_effect=[1])
+    # the contract 1 has an event, the contract without events can be deleted
+    contract = Contract.create(
+        name="Lonely Contract", client=1, total_amount=100, due_amount=100
+    )
+    mock_get_input = Mock(side_effect=[contract.id])
     monkeypatch.setattr("epic.cli.contract_cli.get_input", mock_get_input)
 
     result = runner.invoke(app, ["delete"])
@@ -70,7 +74,7 @@ def test_delete_contract(
     assert "Contract deleted successfully." in result.output
     # Check that the contract was deleted from the database
     with pytest.raises(Contract.DoesNotExist):
-        Contract.get_by_id(1)
+        Contract.get_by_id(contract.id)
 
 
 def test_list_contract(
@@ -95,3 +99,71 @@ def test_read_contract(
 
     assert result.exit_code == 0
     assert "Contract ID:" in result.output
+
+
+def test_list_contract_query_count(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+    query_counter,
+):
+    query_counter.count = 0
+    runner.invoke(app, ["list"])
+    queries = query_counter.count
+
+    client = Client.get_by_id(1)
+    for i in range(5):
+        Contract.create(name=f"Contract {i}", client=client)
+    query_counter.count = 0
+    result = runner.invoke(app, ["list"])
+
+    assert result.exit_code == 0
+    assert result.output.count("Contract ID") == 6
+    assert query_counter.count == queries
+
+
+def test_read_contract_query_count(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+    query_counter,
+):
+    sales_contact = User.get_by_id(3)
+    for i in range(3):
+        client = Client.create(
+            name=f"Client {i}",
+            email=f"client{i}@example.com",
+            phone=1234567890,
+            company="Test Company",
+            sales_contact=sales_contact,
+        )
+        Contract.create(name=f"Contract {i}", client=client)
+    query_counter.count = 0
+    result = runner.invoke(app, ["read"])
+
+    assert result.exit_code == 0
+    assert result.output.count("Contract ID:") == 4
+    # authenticated user lookup + contracts query
+    assert query_counter.count == 2
+
+
+def test_create_contract_batch(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    batch_file = tmp_path / "contracts.ndjson"
+    batch_file.write_text(
+        '{"client_id": 1, "name": "C1", "signed": true, "total_amount": 10, "due_amount": 5}\n'
+        '{"client_id": 2, "name": "C2", "signed": false, "total_amount": 10, "due_amount": 5}\n'
+        '{"client_id": 1, "name": "C3", "signed": "maybe", "total_amount": 10, "due_amount": 5}\n'
+    )
+
+    result = runner.invoke(app, ["create", "--file", str(batch_file)])
+
+    assert result.exit_code == 0
+    assert "Row 2: Client 2 does not belong to you." in result.output
+    assert "Row 3: signed:" in result.output
+    assert "1 records created, 2 errors." in result.output
+    assert Contract.get(Contract.name == "C1").signed is True
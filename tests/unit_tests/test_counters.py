@@ -0,0 +1,119 @@
+from datetime import date
+from typer.testing import CliRunner
+from epic.main import app
+from epic.models.models import Client, Contract, Event, UserCounter
+from epic.counters import (
+    COUNTER_MODELS,
+    check_counters,
+    get_count,
+    get_counts,
+    get_upcoming_events,
+    recount,
+)
+
+runner = CliRunner()
+
+
+def test_counters_follow_writes(setup_database):
+    database = Client._meta.database
+    recount(database, since=date(2020, 1, 1))
+
+    assert get_count("clients", 3) == 1
+    assert get_count("upcoming_events", 4) == 1
+    assert get_counts("open_contracts", [1]) == {}
+
+    client = Client.create(
+        name="Other Client",
+        email="other@example.com",
+        phone="1",
+        company="Other",
+        sales_contact=3,
+    )
+    Contract.insert_many(
+        [
+            {"name": "Open", "client": client.id, "total_amount": 10, "due_amount": 10},
+            {"name": "Paid", "client": client.id, "total_amount": 10, "due_amount": 0},
+        ]
+    ).execute()
+    Event.update(date_end="2019-12-31").where(Event.id == 1).execute()
+
+    assert get_count("clients", 3) == 2
+    assert get_count("open_contracts", client.id) == 1
+    assert get_count("upcoming_events", 4) == 0
+
+    Client.update(sales_contact=2).where(Client.id == client.id).execute()
+    Contract.update(due_amount=0).where(Contract.name == "Open").execute()
+
+    assert get_counts("clients", [2, 3]) == {2: 1, 3: 1}
+    assert get_count("open_contracts", client.id) == 0
+    assert check_counters(database) == []
+
+
+def test_check_counters(setup_database):
+    database = Client._meta.database
+    with database.bind_ctx([UserCounter]):
+        UserCounter.update(clients=5).where(UserCounter.user_id == 3).execute()
+
+    assert check_counters(database) == [("clients", 3, 5, 1)]
+
+    recount(database)
+
+    assert check_counters(database) == []
+
+
+def test_maintenance_commands(mock_is_auth_admin, mock_has_perm, setup_database):
+    result = runner.invoke(app, ["maintenance", "recount", "--since", "2020-01-01"])
+
+    assert result.exit_code == 0
+    assert "upcoming events since 2020-01-01" in result.output
+
+    result = runner.invoke(app, ["maintenance", "check"])
+
+    assert result.exit_code == 0
+    assert "The counters are consistent." in result.output
+
+
+def test_maintenance_without_counter_tables(
+    mock_is_auth_admin, mock_has_perm, setup_database
+):
+    drop_counters(Client._meta.database)
+
+    for command in ["recount", "check"]:
+        result = runner.invoke(app, ["maintenance", command])
+
+        assert result.exit_code == 1
+        assert "The counters are not enabled, run `epic init upgrade`." in result.output
+
+
+def test_read_displays_counters(mock_is_auth_sales, mock_has_perm, setup_database):
+    Contract.update(due_amount=100).execute()
+
+    result = runner.invoke(app, ["client", "read"])
+
+    assert "Open contracts: 1" in result.output
+    assert "1 clients." in result.output
+
+
+def test_read_displays_events_since(mock_is_auth_support, mock_has_perm, setup_database):
+    recount(Client._meta.database, since=date(2020, 1, 1))
+
+    result = runner.invoke(app, ["event", "read"])
+
+    assert "1 events ending on or after 2020-01-01." in result.output
+
+
+def drop_counters(database):
+    with database.bind_ctx(COUNTER_MODELS):
+        database.drop_tables(COUNTER_MODELS)
+    for (trigger,) in database.execute_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%counter%'"
+    ).fetchall():
+        database.execute_sql(f"DROP TRIGGER {trigger}")
+
+
+def test_counts_without_counter_tables(setup_database):
+    drop_counters(Client._meta.database)
+    Event.update(date_end="2999-01-01").execute()
+
+    assert get_counts("clients", [3]) == {3: 1}
+    assert get_upcoming_events(4) == (1, date.today())
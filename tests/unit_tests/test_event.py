@@ -2,6 +2,7 @@ from unittest.mock import Mock
 from typer.testing import CliRunner
 import pytest
 from epic.cli.event_cli import app
+from epic.models.models import Client, Contract, Event, Role, User
 
 runner = CliRunner()
 
@@ -94,3 +95,95 @@ def test_read_event(
 
     assert result.exit_code == 0
     assert "Event ID:" in result.output
+
+
+def test_list_event_query_count(
+    mock_is_auth_support,
+    mock_has_perm,
+    setup_database,
+    query_counter,
+):
+    query_counter.count = 0
+    runner.invoke(app, ["list"])
+    queries = query_counter.count
+
+    contract = Contract.get_by_id(1)
+    support_contact = User.get_by_id(4)
+    for i in range(6):
+        Event.create(
+            name=f"Event {i}",
+            contract=contract,
+            support_contact=support_contact if i % 2 else None,
+            date_start="2021-01-01",
+            date_end="2021-01-01",
+            location="Sample Location",
+            attendees=10,
+            notes="Sample Notes",
+        )
+    query_counter.count = 0
+    result = runner.invoke(app, ["list"])
+
+    assert result.exit_code == 0
+    assert result.output.count("Event ID") == 7
+    assert query_counter.count == queries
+
+
+def test_read_event_sales(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+    query_counter,
+):
+    other_sales = User.create(
+        name="Other Sales",
+        email="other.sales@example.com",
+        password="password",
+        role=Role.get(Role.name == "sales"),
+    )
+    other_client = Client.create(
+        name="Other Client",
+        email="other@example.com",
+        phone=1234567890,
+        company="Other Company",
+        sales_contact=other_sales,
+    )
+    other_contract = Contract.create(name="Other Contract", client=other_client)
+    Event.create(
+        name="Other Event",
+        contract=other_contract,
+        date_start="2021-01-01",
+        date_end="2021-01-01",
+        location="Sample Location",
+        attendees=10,
+        notes="Sample Notes",
+    )
+    query_counter.count = 0
+    result = runner.invoke(app, ["read"])
+
+    assert result.exit_code == 0
+    assert "Name: Test Event" in result.output
+    assert "Other Event" not in result.output
+    # authenticated user and role lookups + events query
+    assert query_counter.count == 3
+
+
+def test_update_event_batch(
+    mock_is_auth_support,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    batch_file = tmp_path / "events.csv"
+    batch_file.write_text(
+        "id,location,attendees\n" "1,New Location,75\n" "2,Elsewhere,10\n"
+    )
+
+    result = runner.invoke(app, ["update", "--file", str(batch_file)])
+
+    assert result.exit_code == 0
+    assert "Row 2: Event with ID 2 does not exist." in result.output
+    assert "1 records updated, 1 errors." in result.output
+    event = Event.get_by_id(1)
+    assert event.location == "New Location"
+    assert event.attendees == 75
+    assert event.name == "Test Event"
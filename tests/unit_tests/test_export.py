@@ -0,0 +1,75 @@
+import io
+import json
+from typer.testing import CliRunner
+from epic.cli.export_cli import app
+from epic.columnar import read_columnar, write_columnar
+
+runner = CliRunner()
+
+
+def test_export_clients_csv_scoped(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+):
+    result = runner.invoke(app, ["clients"])
+
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[0] == (
+        "id,name,email,phone,company,date_created,date_updated,sales_contact_id"
+    )
+    assert lines[1].startswith("1,Test Client,test@example.com,1234567890")
+    assert "1 rows exported." in result.output
+
+
+def test_export_events_admin_scope(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+):
+    result = runner.invoke(app, ["events", "--format", "ndjson"])
+    assert "0 rows exported." in result.output
+
+    result = runner.invoke(app, ["events", "--format", "ndjson", "--all"])
+    assert result.exit_code == 0
+    event = json.loads(result.output.splitlines()[0])
+    assert event["name"] == "Test Event"
+    assert event["support_contact_id"] == 4
+    assert event["date_start"] == "2021-01-01"
+
+
+def test_export_users_without_password(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    output = tmp_path / "users.col"
+
+    result = runner.invoke(
+        app, ["users", "--format", "columnar", "-o", str(output), "--batch-size", "3"]
+    )
+
+    assert result.exit_code == 0
+    with open(output, "rb") as stream:
+        users = list(read_columnar(stream))
+    assert len(users) == 4
+    assert users[3] == {
+        "id": 4,
+        "name": "Support User",
+        "email": "support@example.com",
+        "role_id": 3,
+    }
+
+
+def test_columnar_round_trip_selected_columns():
+    stream = io.BytesIO()
+    rows = ((i, f"name{i}", i * 1.5) for i in range(25))
+
+    assert write_columnar(stream, ["id", "name", "amount"], rows, 10) == 25
+
+    stream.seek(0)
+    values = list(read_columnar(stream, ["amount"]))
+    assert len(values) == 25
+    assert values[24] == {"amount": 36.0}
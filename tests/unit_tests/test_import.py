@@ -0,0 +1,81 @@
+import json
+from typer.testing import CliRunner
+from epic.cli.import_cli import app
+from epic.models.models import Client, Contract, Event
+
+runner = CliRunner()
+
+
+def test_import_clients(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    import_file = tmp_path / "clients.csv"
+    import_file.write_text(
+        "name,email,phone,company,sales_contact\n"
+        "Client A,a@example.com,1234567890,Company A,sales@example.com\n"
+        "Client B,b@example.com,1234567890,Company B,support@example.com\n"
+        "Client C,not-an-email,1234567890,Company C,\n"
+        "Client D,d@example.com,1234567890,Company D,\n"
+    )
+
+    result = runner.invoke(app, ["clients", str(import_file), "--chunk-size", "2"])
+
+    assert result.exit_code == 0
+    assert "Row 2: sales_contact: support@example.com does not exist" in result.output
+    assert "Row 3: email: Invalid email address." in result.output
+    assert "2 rows imported, 2 errors" in result.output
+    assert "rows/s" in result.output
+    assert Client.get(Client.email == "a@example.com").sales_contact.id == 3
+    assert Client.get(Client.email == "d@example.com").sales_contact.id == 2
+    assert not (tmp_path / "clients.csv.checkpoint").exists()
+
+
+def test_import_contracts_sales(
+    mock_is_auth_sales,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    import_file = tmp_path / "contracts.ndjson"
+    rows = [
+        {"name": "C1", "client": "test@example.com", "total_amount": 10,
+         "due_amount": 5, "signed": "true"},
+        {"name": "C2", "client": "other@example.com", "total_amount": 10,
+         "due_amount": 5, "signed": "false"},
+    ]
+    import_file.write_text("\n".join(json.dumps(row) for row in rows))
+
+    result = runner.invoke(app, ["contracts", str(import_file)])
+
+    assert result.exit_code == 0
+    assert "Row 2: client: other@example.com does not exist" in result.output
+    assert "1 rows imported, 1 errors" in result.output
+    assert Contract.get(Contract.name == "C1").client.id == 1
+
+
+def test_import_events_resume(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    import_file = tmp_path / "events.csv"
+    import_file.write_text(
+        "name,contract_id,support_contact,date_start,date_end,location,attendees,notes\n"
+        "E1,1,support@example.com,2024-01-01,2024-01-02,Paris,10,\n"
+        "E2,1,support@example.com,2024-01-01,2024-01-02,Paris,10,note\n"
+        "E3,1,,2024-02-01,2024-02-02,Lyon,20,note\n"
+    )
+    (tmp_path / "events.csv.checkpoint").write_text('{"rows": 1}')
+
+    result = runner.invoke(app, ["events", str(import_file), "--resume"])
+
+    assert result.exit_code == 0
+    assert "Resuming after row 1." in result.output
+    assert "2 rows imported, 0 errors" in result.output
+    assert Event.get(Event.name == "E2").support_contact.id == 4
+    assert Event.get(Event.name == "E3").support_contact is None
+    assert not Event.select().where(Event.name == "E1").exists()
@@ -4,6 +4,7 @@ from epic.cli.initialize_cli import (
     app,
     initialize_roles,
     create_permissions,
+    upgrade_database,
 )
 from epic.models.models import (
     User,
@@ -50,3 +51,54 @@ def test_initialize_permission(database, monkeypatch):
     assert Role.select().count() == 4
     assert Permission.select().count() == 26
     assert RolePermission.select().count() == 79
+
+
+def test_upgrade_database(database, monkeypatch):
+    monkeypatch.setattr("epic.cli.initialize_cli.db", database)
+    create_tables()
+    initialize_roles()
+    create_permissions()
+    database.execute_sql('DROP INDEX "event_date_start"')
+    database.execute_sql('DROP INDEX "event_support_contact_id_date_start"')
+    database.execute_sql('DROP INDEX "rolepermission_role_id_permission_id"')
+    RolePermission.create(role=1, permission=1)
+
+    upgrade_database()
+
+    event_indexes = [index.name for index in database.get_indexes("event")]
+    assert "event_date_start" in event_indexes
+    assert "event_support_contact_id_date_start" in event_indexes
+    role_permission_indexes = {
+        index.name: index.unique for index in database.get_indexes("rolepermission")
+    }
+    assert role_permission_indexes["rolepermission_role_id_permission_id"] is True
+    assert RolePermission.select().count() == 79
+
+
+def test_initialize_is_idempotent(database, monkeypatch):
+    monkeypatch.setattr("epic.cli.initialize_cli.db", database)
+
+    result = runner.invoke(app, ["initialize", "--scale", "100"])
+    assert result.exit_code == 0
+    assert "Seeded 10 users, 2 clients, 20 contracts and 100 events" in result.output
+    counts = [model.select().count() for model in [User, Client, Contract, Event]]
+    assert counts == [17, 4, 24, 104]
+
+    result = runner.invoke(app, ["initialize", "--scale", "100"])
+    assert result.exit_code == 0
+    assert "Synthetic data already seeded, skipped." in result.output
+    assert [model.select().count() for model in [User, Client, Contract, Event]] == (
+        counts
+    )
+    assert Permission.select().count() == 26
+    assert RolePermission.select().count() == 79
+    assert User.authenticate("bob@epic.com", "password")
+
+
+def test_initialize_invalid_scale(database, monkeypatch):
+    monkeypatch.setattr("epic.cli.initialize_cli.db", database)
+
+    result = runner.invoke(app, ["initialize", "--scale", "huge"])
+
+    assert result.exit_code != 0
+    assert "not a number of events" in result.output
@@ -0,0 +1,41 @@
+import sys
+from typer.testing import CliRunner
+from epic.main import app, COMMANDS, ImportProfiler
+
+runner = CliRunner()
+
+
+def test_lazy_group_lists_commands():
+    result = runner.invoke(app, ["--help"])
+
+    assert result.exit_code == 0
+    for name in COMMANDS:
+        assert name in result.output
+
+
+def test_lazy_group_invokes_command(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+):
+    result = runner.invoke(app, ["role", "list"])
+
+    assert result.exit_code == 0
+    assert "Role ID: 1, Name: admin" in result.output
+
+
+def test_lazy_group_unknown_command():
+    result = runner.invoke(app, ["unknown"])
+
+    assert result.exit_code != 0
+    assert "No such command" in result.output
+
+
+def test_import_profiler(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+
+    with ImportProfiler() as profiler:
+        import colorsys  # noqa: F401
+
+    assert "colorsys" in profiler.timings
+    assert profiler.timings["colorsys"] >= 0
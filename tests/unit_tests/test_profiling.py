@@ -0,0 +1,48 @@
+import json
+from epic import profiling
+from epic.models.models import Role
+
+
+def test_command_name():
+    assert profiling.command_name(["--profile", "event", "list", "--limit", "5"]) == (
+        "event list"
+    )
+    assert profiling.command_name(["--profile-file", "p.jsonl", "role", "list"]) == (
+        "role list"
+    )
+
+
+def test_configure(monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLED", False)
+    monkeypatch.setattr(profiling, "PROFILE_FILE", None)
+
+    profiling.configure(["role", "list"])
+    assert profiling.ENABLED is False
+
+    profiling.configure(["client", "list", "--profile"])
+    assert profiling.ENABLED is False
+
+    profiling.configure(["--profile-file=profile.jsonl", "role", "list"])
+    assert profiling.ENABLED is True
+    assert profiling.PROFILE_FILE == "profile.jsonl"
+
+
+def test_command_profiler(setup_database, tmp_path, monkeypatch, capsys):
+    profile_file = tmp_path / "profile.jsonl"
+    monkeypatch.setattr(profiling, "PROFILE_FILE", str(profile_file))
+
+    with profiling.CommandProfiler("role list"):
+        list(Role.select())
+        Role.get_by_id(1)
+
+    report = capsys.readouterr().err
+    assert "Profile of 'role list':" in report
+    assert "SQL queries: 2" in report
+    profile = json.loads(profile_file.read_text())
+    assert profile["command"] == "role list"
+    assert profile["queries"] == 2
+    assert profile["slowest"][0]["sql"].startswith("SELECT")
+    assert profile["wall_ms"] >= profile["db_ms"]
+
+    list(Role.select())
+    assert len(profile_file.read_text().splitlines()) == 1
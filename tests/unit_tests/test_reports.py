@@ -0,0 +1,97 @@
+import pytest
+from typer.testing import CliRunner
+from epic.main import app
+from epic.models.models import Client, Contract, Event
+from epic import reports
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def contracts(setup_database):
+    Contract.insert_many(
+        [
+            {"name": "Unsigned", "client": 1, "total_amount": 500, "due_amount": 500},
+            {"name": "Partly paid", "client": 1, "total_amount": 300, "due_amount": 100},
+        ]
+    ).execute()
+    Contract.update(signed=True).where(Contract.name == "Partly paid").execute()
+
+
+def expected_reports():
+    return (
+        [(3, "Sales User", 600.0)],
+        [(1, "Test Client", 3, 1300.0, 500.0, 600.0)],
+        [("2021-01", 1)],
+        {
+            "contracts": 3,
+            "signed_amount": 1300.0,
+            "unsigned_amount": 500.0,
+            "due_amount": 600.0,
+            "events": 1,
+        },
+    )
+
+
+def current_reports():
+    return (
+        reports.outstanding_by_sales_contact(),
+        reports.contract_value_by_client(),
+        reports.events_per_month(),
+        reports.dashboard(),
+    )
+
+
+def test_reports(contracts):
+    assert current_reports() == expected_reports()
+
+
+def test_summaries_follow_writes(contracts):
+    database = Contract._meta.database
+    reports.create_summaries(database)
+
+    assert reports.summaries_enabled(database)
+    assert current_reports() == expected_reports()
+
+    Contract.get(Contract.name == "Unsigned").delete_instance()
+    Contract.update(due_amount=0).where(Contract.name == "Partly paid").execute()
+    event = Event.get_by_id(1)
+    event.date_start = "2021-02-01"
+    event.save()
+    Client.create(
+        name="Other Client",
+        email="other@example.com",
+        phone="1",
+        company="Other",
+        sales_contact=3,
+    )
+    Contract.create(name="New", client=2, total_amount=50, due_amount=50)
+
+    summarized = current_reports()
+    reports.drop_summaries(database)
+
+    assert not reports.summaries_enabled(database)
+    assert summarized == current_reports()
+    assert summarized[2] == [("2021-02", 1)]
+
+
+def test_report_commands(mock_is_auth_admin, mock_has_perm, contracts):
+    result = runner.invoke(app, ["report", "outstanding"])
+
+    assert result.exit_code == 0
+    assert "Sales contact ID: 3, Name: Sales User, Due amount: 600.00" in result.output
+
+    result = runner.invoke(app, ["report", "summaries"])
+
+    assert "Summary tables enabled." in result.output
+
+    result = runner.invoke(app, ["report", "dashboard"])
+
+    assert "Contracts: 3, Signed: 1300.00, Unsigned: 500.00" in result.output
+
+
+def test_report_not_admin(mock_is_auth_sales, mock_has_perm, setup_database):
+    result = runner.invoke(app, ["report", "dashboard"])
+
+    assert result.exit_code == 1
+    assert "Only administrators" in result.output
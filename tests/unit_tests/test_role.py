@@ -2,6 +2,7 @@ from unittest.mock import Mock
 from typer.testing import CliRunner
 import pytest
 from epic.cli.role_cli import app
+from epic.models.models import Role
 
 runner = CliRunner()
 
@@ -27,7 +28,9 @@ def test_delete_role(
     setup_database,
     monkeypatch,
 ):
-    mock_get_input = Mock(side_effect=[1])
+    # the role 1 has users, the role without users can be deleted
+    role = Role.create(name="guest")
+    mock_get_input = Mock(side_effect=[role.id])
     monkeypatch.setattr("epic.cli.role_cli.get_input", mock_get_input)
 
     result = runner.invoke(app, ["delete"])
@@ -46,3 +49,14 @@ def test_list_role(
 
     assert result.exit_code == 0
     assert "Role ID" in result.output
+
+
+def test_create_role_option(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+):
+    result = runner.invoke(app, ["create", "--name", "manager"])
+
+    assert result.exit_code == 0
+    assert "Role manager created successfully." in result.output
@@ -0,0 +1,190 @@
+from datetime import date
+from typer.testing import CliRunner
+from epic.cli.event_cli import app
+from epic.models.models import Contract, Event, Role, User
+from epic.scheduling import (
+    Calendar,
+    auto_assign,
+    find_conflicts,
+    plan_assignments,
+    sweep_conflicts,
+)
+
+runner = CliRunner()
+
+
+def create_event(name, date_start, date_end, support_contact=None):
+    return Event.create(
+        name=name,
+        contract=Contract.get_by_id(1),
+        support_contact=support_contact,
+        date_start=date_start,
+        date_end=date_end,
+        location="Paris",
+        attendees=10,
+        notes="",
+    )
+
+
+def test_sweep_conflicts():
+    rows = [
+        (1, 10, date(2024, 1, 1), date(2024, 1, 3)),
+        (1, 11, date(2024, 1, 2), date(2024, 1, 2)),
+        (1, 12, date(2024, 1, 3), date(2024, 1, 4)),
+        (1, 13, date(2024, 1, 5), date(2024, 1, 5)),
+        (2, 14, date(2024, 1, 5), date(2024, 1, 5)),
+    ]
+
+    pairs = {(contact, first[0], second[0]) for contact, first, second in sweep_conflicts(rows)}
+
+    assert pairs == {(1, 10, 11), (1, 10, 12)}
+
+
+def test_find_conflicts(setup_database):
+    create_event("Overlapping", "2021-01-01", "2021-01-02", support_contact=4)
+    create_event("Unassigned", "2021-01-01", "2021-01-01")
+
+    conflicts = list(find_conflicts())
+
+    assert [(contact, first[0], second[0]) for contact, first, second in conflicts] == [
+        (4, 1, 2)
+    ]
+    assert list(find_conflicts(since=date(2021, 1, 2))) == []
+
+
+def test_update_event_batch_conflict(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    create_event("Other Event", "2020-12-31", "2021-01-01")
+    batch_file = tmp_path / "events.csv"
+    batch_file.write_text("id,support_contact_id\n2,4\n")
+
+    result = runner.invoke(app, ["update", "--file", str(batch_file)])
+
+    assert "The support contact is not available" in result.output
+    assert "Test Event (ID 1" in result.output
+    assert Event.get_by_id(2).support_contact is None
+
+    result = runner.invoke(
+        app, ["update", "--file", str(batch_file), "--allow-conflicts"]
+    )
+
+    assert "1 records updated" in result.output
+    assert Event.get_by_id(2).support_contact_id == 4
+
+
+def test_update_event_contact_and_dates_conflict(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+):
+    other_support = User.create(
+        name="Other Support",
+        email="other.support@example.com",
+        password="supportpassword",
+        role=Role.get(Role.name == "support"),
+    )
+    create_event("Busy", "2022-01-01", "2022-01-02", support_contact=other_support)
+
+    result = runner.invoke(
+        app,
+        [
+            "update",
+            "--id",
+            "1",
+            "--support-contact-id",
+            str(other_support.id),
+            "--date-start",
+            "2022-01-02",
+            "--date-end",
+            "2022-01-02",
+        ],
+    )
+
+    assert "Change refused" in result.output
+    event = Event.get_by_id(1)
+    assert event.support_contact_id == 4
+    assert str(event.date_start) == "2021-01-01"
+
+
+def test_list_conflicts(mock_is_auth_support, mock_has_perm, setup_database):
+    create_event("Overlapping", "2021-01-01", "2021-01-02", support_contact=4)
+
+    result = runner.invoke(app, ["conflicts"])
+
+    assert result.exit_code == 0
+    assert "Support contact 4: event 1 (2021-01-01 - 2021-01-01)" in result.output
+    assert "1 conflicts." in result.output
+
+
+def test_calendar():
+    calendar = Calendar(
+        [(date(2024, 1, 5), date(2024, 1, 6)), (date(2024, 1, 1), date(2024, 1, 5))]
+    )
+
+    assert not calendar.is_free(date(2024, 1, 6), date(2024, 1, 8))
+    assert calendar.is_free(date(2024, 1, 7), date(2024, 1, 8))
+
+    calendar.add(date(2024, 1, 7), date(2024, 1, 8))
+
+    assert not calendar.is_free(date(2024, 1, 8), date(2024, 1, 9))
+    assert calendar.is_free(date(2024, 1, 9), date(2024, 1, 9))
+
+
+def test_plan_assignments():
+    pending = [
+        (1, date(2024, 1, 1), date(2024, 1, 2)),
+        (2, date(2024, 1, 1), date(2024, 1, 1)),
+        (3, date(2024, 1, 2), date(2024, 1, 2)),
+        (4, date(2024, 1, 3), date(2024, 1, 3)),
+    ]
+    calendars = {20: Calendar([(date(2024, 1, 1), date(2024, 1, 1))])}
+
+    assignments, unassigned = plan_assignments(pending, {10: 0, 20: 0}, calendars)
+
+    assert assignments == {1: 10, 3: 20, 4: 10}
+    assert unassigned == [2]
+
+
+def test_auto_assign(setup_database):
+    second_support = User.create(
+        name="Second Support",
+        email="support2@example.com",
+        password="supportpassword",
+        role=Role.get(Role.name == "support"),
+    )
+    create_event("Overlapping", "2021-01-01", "2021-01-02")
+    create_event("Later", "2021-01-03", "2021-01-03")
+
+    assignments, unassigned = auto_assign(dry_run=True)
+
+    assert assignments == {2: second_support.id, 3: 4}
+    assert unassigned == []
+    assert Event.get_by_id(2).support_contact is None
+
+    auto_assign()
+
+    assert Event.get_by_id(2).support_contact_id == second_support.id
+    assert Event.get_by_id(3).support_contact_id == 4
+
+
+def test_assign_events(mock_is_auth_admin, mock_has_perm, setup_database):
+    create_event("Overlapping", "2021-01-01", "2021-01-02")
+    create_event("Later", "2021-01-03", "2021-01-03")
+
+    result = runner.invoke(app, ["assign", "--auto"])
+
+    assert result.exit_code == 0
+    assert "Event 2: no support contact available." in result.output
+    assert "1 events assigned, 1 left unassigned." in result.output
+    assert Event.get_by_id(3).support_contact_id == 4
+
+
+def test_assign_events_not_admin(mock_is_auth_support, mock_has_perm, setup_database):
+    result = runner.invoke(app, ["assign", "--auto"])
+
+    assert result.exit_code == 1
+    assert "Only administrators" in result.output
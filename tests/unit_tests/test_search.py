@@ -0,0 +1,82 @@
+from typer.testing import CliRunner
+from epic.main import app
+from epic.models.models import Client, Contract, User
+from epic.search import search
+
+runner = CliRunner()
+
+
+def test_search_ranks_kinds(setup_database, mock_has_perm):
+    admin = User.get_by_id(2)
+
+    results = search("test", admin)
+
+    assert {(kind, row_id) for kind, row_id, _ in results} == {
+        ("client", 1),
+        ("contract", 1),
+        ("event", 1),
+    }
+    assert search("sample loc", admin) == [("event", 1, "Test Event")]
+    assert search("test company", admin) == [("client", 1, "Test Client")]
+    assert search("*)", admin) == []
+
+
+def test_search_visibility(setup_database, mock_has_perm):
+    sales = User.get_by_id(3)
+    support = User.get_by_id(4)
+    Client.insert_many(
+        [
+            {
+                "name": "Other Client",
+                "email": "other@example.com",
+                "phone": "1",
+                "company": "Test Company",
+                "sales_contact": 2,
+            }
+        ]
+    ).execute()
+
+    assert [row_id for kind, row_id, _ in search("test company", sales)] == [1]
+    assert search("test", support) == [("event", 1, "Test Event")]
+
+
+def test_search_index_follows_writes(setup_database, mock_has_perm):
+    admin = User.get_by_id(2)
+
+    Contract.update(name="Renamed Deal").where(Contract.id == 1).execute()
+    assert search("deal", admin) == [("contract", 1, "Renamed Deal")]
+    assert ("contract", 1, "Test Contract") not in search("test", admin)
+
+    client = Client.create(
+        name="Lonely Client",
+        email="lonely@example.com",
+        phone="1",
+        company="Nobody",
+        sales_contact=3,
+    )
+    assert search("lonely", admin) == [("client", client.id, "Lonely Client")]
+
+    client.delete_instance()
+    assert search("lonely", admin) == []
+
+
+def test_search_command(mock_is_auth_admin, mock_has_perm, setup_database):
+    result = runner.invoke(app, ["search", "sample"])
+
+    assert result.exit_code == 0
+    assert "Event ID: 1, Name: Test Event" in result.output
+
+    result = runner.invoke(app, ["search", "nothing"])
+
+    assert "No results for 'nothing'." in result.output
+
+
+def test_search_command_without_index(
+    mock_is_auth_admin, mock_has_perm, setup_database
+):
+    Client._meta.database.execute_sql("DROP TABLE searchindex")
+
+    result = runner.invoke(app, ["search", "sample"])
+
+    assert result.exit_code == 1
+    assert "The search index does not exist, run `epic init upgrade`." in result.output
@@ -0,0 +1,62 @@
+import typer
+from typer.testing import CliRunner
+from epic.cli import auth_cli
+from epic.cli.shell_cli import Completer, ShellSession, run_line
+from epic.main import app as main_app
+from epic.models.models import User
+
+runner = CliRunner()
+
+group = typer.main.get_command(main_app)
+
+
+def test_run_line_reuses_session(setup_database, mock_has_perm, monkeypatch, capsys):
+    calls = []
+
+    def mock_is_auth():
+        calls.append(1)
+        return User.get_by_id(2)
+
+    monkeypatch.setattr("epic.cli.auth_cli.User.is_auth", mock_is_auth)
+    monkeypatch.setattr(auth_cli, "session_provider", ShellSession())
+
+    assert run_line(group, "role list") == 0
+    assert run_line(group, "client list --limit 1") == 0
+
+    assert len(calls) == 1
+    assert "Role ID: 1, Name: admin" in capsys.readouterr().out
+
+
+def test_run_line_errors(setup_database, monkeypatch, capsys):
+    monkeypatch.setattr("epic.cli.auth_cli.User.is_auth", lambda: None)
+
+    assert run_line(group, "nope") == 2
+    assert run_line(group, 'client "list') == 2
+    assert run_line(group, "shell") == 2
+    # not authenticated: check_auth exits without leaving the shell
+    assert run_line(group, "role list") == 0
+    assert run_line(group, "") == 0
+    assert "Invalid command: No closing quotation" in capsys.readouterr().out
+
+
+def test_completer(setup_database):
+    completer = Completer(group)
+
+    assert completer.candidates(["cl"], "cl") == ["client"]
+    assert completer.candidates(["client", "li"], "li") == ["list"]
+    assert "--sort" in completer.candidates(["client", "list", "--"], "--")
+    assert completer.candidates(["user", "update", "--id", ""], "") == [
+        "1",
+        "2",
+        "3",
+        "4",
+    ]
+
+
+def test_shell(setup_database, mock_is_auth_admin, mock_has_perm, tmp_path, monkeypatch):
+    monkeypatch.setattr("epic.cli.shell_cli.HISTORY_FILE", str(tmp_path / "history"))
+    result = runner.invoke(main_app, ["shell"], input="role list\nexit\n")
+
+    assert result.exit_code == 0
+    assert "Role ID: 3, Name: support" in result.output
+    assert auth_cli.session_provider is None
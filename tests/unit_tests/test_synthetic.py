@@ -0,0 +1,34 @@
+from epic.models.models import Client, Contract, Event, User
+from epic.synthetic import EMAIL_DOMAIN, dataset_size, generate
+
+
+def test_dataset_size():
+    assert dataset_size(1_000_000) == {
+        "sales": 500,
+        "support": 2000,
+        "clients": 20000,
+        "contracts": 200000,
+        "events": 1_000_000,
+    }
+
+
+def test_generate(setup_database):
+    counts = generate(500, batch_size=100)
+
+    assert counts == {"users": 10, "clients": 10, "contracts": 100, "events": 500}
+    assert User.select().where(User.email.endswith(EMAIL_DOMAIN)).count() == 10
+    assert Client.select().count() == 11
+    assert Contract.select().count() == 101
+    assert Event.select().count() == 501
+    # every event references a contract and a generated support contact, or none
+    assigned = (
+        Event.select()
+        .join(Contract)
+        .switch(Event)
+        .join(User, on=(Event.support_contact == User.id))
+        .where(User.email.endswith(EMAIL_DOMAIN))
+        .count()
+    )
+    unassigned = Event.select().where(Event.support_contact.is_null()).count()
+    assert assigned + unassigned == 500
+    assert User.authenticate(f"sales0@{EMAIL_DOMAIN}", "password")
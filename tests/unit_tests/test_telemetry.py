@@ -0,0 +1,77 @@
+import json
+from unittest.mock import MagicMock
+import pytest
+from typer.testing import CliRunner
+from epic import telemetry
+from epic.cli.telemetry_cli import app
+
+runner = CliRunner()
+
+
+def test_capture_message_spools_event(telemetry_queue):
+    telemetry.capture_message("Contract signed")
+
+    event = json.loads(telemetry_queue.read_text())
+    assert event["type"] == "message"
+    assert event["message"] == "Contract signed"
+    assert event["level"] == "info"
+
+
+def test_capture_exception_spools_traceback(telemetry_queue):
+    try:
+        1 / 0
+    except ZeroDivisionError as e:
+        telemetry.capture_exception(e)
+
+    event = json.loads(telemetry_queue.read_text())
+    assert event["message"] == "ZeroDivisionError: division by zero"
+    assert "Traceback" in event["traceback"]
+
+
+def test_sample_rate(telemetry_queue, monkeypatch):
+    monkeypatch.setattr("epic.telemetry.SAMPLE_RATE", 0.0)
+
+    assert telemetry.spool({"message": "dropped"}) is False
+    assert not telemetry_queue.exists()
+
+
+def test_queue_size_cap(telemetry_queue, monkeypatch):
+    monkeypatch.setattr("epic.telemetry.MAX_QUEUE_SIZE", 300)
+
+    results = [telemetry.spool({"message": "x" * 50}) for _ in range(10)]
+
+    assert results[0] is True
+    assert results[-1] is False
+    assert telemetry.queue_size() <= 300
+
+
+def test_flush_keeps_events_when_unreachable(telemetry_queue, monkeypatch):
+    monkeypatch.setattr("epic.telemetry.is_reachable", lambda dsn, timeout: False)
+    telemetry.capture_message("Contract signed")
+
+    with pytest.raises(ConnectionError):
+        telemetry.flush()
+
+    assert len(telemetry.pending_events()) == 1
+
+
+def test_flush_sends_events(telemetry_queue, monkeypatch):
+    monkeypatch.setattr("epic.telemetry.is_reachable", lambda dsn, timeout: True)
+    sentry_sdk = MagicMock()
+    monkeypatch.setattr("epic.init_sentry.init_sentry", lambda dsn: sentry_sdk)
+    telemetry.capture_message("Contract signed")
+    telemetry.capture_message("User created")
+
+    assert telemetry.flush() == 2
+    assert sentry_sdk.capture_message.call_count == 2
+    sentry_sdk.flush.assert_called_once()
+    assert telemetry.pending_events() == []
+
+
+def test_status_command(telemetry_queue):
+    telemetry.capture_message("Contract signed")
+
+    result = runner.invoke(app, ["status"])
+
+    assert result.exit_code == 0
+    assert "1 telemetry events pending" in result.output
@@ -83,3 +83,66 @@ def test_delete_user(
     # Check that the user was deleted from the database
     with pytest.raises(User.DoesNotExist):
         User.get_by_id(2)
+
+
+def test_list_user_query_count(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+    query_counter,
+):
+    query_counter.count = 0
+    runner.invoke(app, ["list"])
+    queries = query_counter.count
+
+    role = Role.get(Role.name == "support")
+    for i in range(3):
+        User.create(
+            name=f"User {i}",
+            email=f"user{i}@example.com",
+            password="password",
+            role=role,
+        )
+    query_counter.count = 0
+    result = runner.invoke(app, ["list"])
+
+    assert result.exit_code == 0
+    assert query_counter.count == queries
+
+
+def test_create_user_batch(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    batch_file = tmp_path / "users.csv"
+    batch_file.write_text(
+        "name,email,password,role_name\n"
+        "New Sales,new.sales@example.com,secret,sales\n"
+        "Bad Role,bad.role@example.com,secret,manager\n"
+    )
+
+    result = runner.invoke(app, ["create", "--file", str(batch_file)])
+
+    assert result.exit_code == 0
+    assert "Row 2: role_name: Invalid role name." in result.output
+    assert "1 records created, 1 errors." in result.output
+    user = User.get(User.email == "new.sales@example.com")
+    assert user.role.name == "sales"
+    assert bcrypt.checkpw("secret".encode("utf-8"), user.password.encode("utf-8"))
+
+
+def test_update_user_batch_missing_user(
+    mock_is_auth_admin,
+    mock_has_perm,
+    setup_database,
+    tmp_path,
+):
+    batch_file = tmp_path / "users.csv"
+    batch_file.write_text("id\n1\n99\n")
+
+    result = runner.invoke(app, ["update", "--file", str(batch_file)])
+
+    assert "Row 2: User with ID 99 does not exist." in result.output
+    assert "1 records updated, 1 errors." in result.output
@@ -1,6 +1,9 @@
 # test_utils.py
 import pytest
-from epic.utils import get_input, validate_input
+from epic.utils import get_input, validate_input, read_records, validate_record
+from epic.utils import Paginator, save_changes
+from epic.models.models import Role, Event
+from datetime import date
 from typer.testing import CliRunner
 from epic.utils import display_list
 import unittest
@@ -48,3 +51,84 @@ def test_validate_input(mock_roles_data, monkeypatch):
         validate_input("invalid", "phone")
     with pytest.raises(ValueError):
         validate_input("invalid", "role_name")
+
+
+def test_get_input_value(monkeypatch):
+    def fail_prompt(*args, **kwargs):
+        raise AssertionError("prompted")
+
+    monkeypatch.setattr("typer.prompt", fail_prompt)
+
+    assert get_input("Enter your age: ", int, value="42") == 42
+    assert get_input("Enter your name: ", str, interactive=False, default="Bob") == "Bob"
+
+
+def test_read_records(tmp_path):
+    csv_file = tmp_path / "records.csv"
+    csv_file.write_text("name,age\nJohn,42\n\nJane,36\n")
+    ndjson_file = tmp_path / "records.ndjson"
+    ndjson_file.write_text('{"name": "John", "age": 42}\n{"name": "Jane", "age": 36}\n')
+
+    assert list(read_records(str(csv_file))) == [
+        {"name": "John", "age": "42"},
+        {"name": "Jane", "age": "36"},
+    ]
+    assert list(read_records(str(ndjson_file))) == [
+        {"name": "John", "age": 42},
+        {"name": "Jane", "age": 36},
+    ]
+
+
+def test_validate_record():
+    fields = {"name": str, "age": int}
+
+    assert validate_record({"name": "John", "age": "42"}, fields) == {
+        "name": "John",
+        "age": 42,
+    }
+    assert validate_record({"age": 42}, fields, required=[]) == {"age": 42}
+    with pytest.raises(ValueError, match="Missing field 'name'"):
+        validate_record({"age": 42}, fields)
+    with pytest.raises(ValueError, match="age:"):
+        validate_record({"name": "John", "age": "old"}, fields)
+
+
+def test_paginator_keyset(setup_database):
+    Role.insert_many([{"name": name} for name in ["zeta", "beta", "omega"]]).execute()
+    names = []
+    cursor = None
+    while True:
+        page = Paginator(Role.select(), Role.name, limit=2, after=cursor)
+        names.extend(role.name for role in page)
+        cursor = page.next_cursor()
+        if cursor is None:
+            break
+        assert "OFFSET" not in page.query.sql()[0]
+
+    assert names == ["admin", "beta", "omega", "sales", "support", "zeta"]
+
+
+def test_paginator_invalid_cursor(setup_database):
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        Paginator(Role.select(), Role.id, after="not a cursor")
+
+
+def test_save_changes(setup_database, query_counter):
+    event = Event.get_by_id(1)
+    query_counter.count = 0
+
+    changed = save_changes(
+        event, {"name": "Test Event", "date_start": date(2021, 1, 1), "support_contact": 4}
+    )
+    assert changed == []
+    assert query_counter.count == 0
+
+    changed = save_changes(event, {"name": "Renamed Event", "attendees": 10})
+    assert changed == ["name"]
+    assert query_counter.count == 1
+    assert query_counter.updates()[0].startswith('UPDATE "event" SET "name" = ? WHERE')
+    assert Event.get_by_id(1).name == "Renamed Event"
+
+    assert save_changes(event, {"support_contact": None}) == ["support_contact"]
+    assert save_changes(event, {"support_contact": 4}) == ["support_contact"]
+    assert Event.get_by_id(1).support_contact_id == 4